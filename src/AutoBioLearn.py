@@ -1,18 +1,22 @@
 from abc import ABC, abstractmethod
+import os
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing_extensions import deprecated
-from matplotlib import pyplot as plt
+from sklearn.model_selection import GridSearchCV, ParameterGrid, RandomizedSearchCV
 from data_treatment import DataProcessor, DatasetByFile, DatasetByWeb
 
 import pandas as pd
-from decorators import apply_per_grouping, requires_dataset
+from decorators import apply_per_grouping, requires_dataset, track_memory
+from execution import Checkpoint, CostModel, ExecutionBackend, FoldDataCache, FoldTask, HyperparamStore, Job, MemoryMonitor, MetricsCache, ResourceScheduler, ResultsStore, SplitPlan, Tracer
 
-from helpers import XAIHelper, ModelHelper
+from helpers import XAIHelper, ModelHelper, SearchHelper
 
 class AutoBioLearn(ABC):
 
     def __init__(self) -> None:
-        self._models_executed = []
+        self._models_executed = ResultsStore()
+        self._metrics_cache = MetricsCache(self._calculate_metrics_traced)
         self._validations_execution = {}
         validation_object =self._get_validation("split")
         self._validations_execution["split"] = {
@@ -20,33 +24,67 @@ class AutoBioLearn(ABC):
             'num_folds': 0,
             'train_size': 70
         }  
-
+        self._resource_scheduler = ResourceScheduler()
+        self._execution_backend = ExecutionBackend(scheduler=self._resource_scheduler)
+        self._seed = None
+        self._split_plan = None
+        self._fold_cache_max_bytes = 2**30
+        self._search_history = []
+        self._hyperparam_store = None
+        self._hyperparam_warm_start = True
+        self._cost_model = CostModel(path=CostModel.get_default_path())
+        self._task_log = []
+        self._parallel_sections = False
+        self._parallel_sections_workers = None
+        self._split_plan_lock = threading.Lock()
+        self._job = None
+        self._job_lock = threading.Lock()
+        self._tracer = Tracer()
+        self._memory_monitor = MemoryMonitor()
+
+    @track_memory
     def load_dataset(self, data_processor: DataProcessor):
         if not hasattr(self, 'data_processor'):
             self.data_processor = data_processor  
     
-    def load_dataset_by_file(self, file_path: str,target: str,delimiter: str = None, header_size:int=1):
-        dataset= DatasetByFile(file_path=file_path,target=target,delimiter=delimiter, header_size= header_size)
+    @track_memory
+    def load_dataset_by_file(self, file_path: str,target: str,delimiter: str = None, header_size:int=1,
+                             usecols: list[str] = None, sections: list[str] = None, dtype: dict = None, engine: str = None,
+                             cache: bool = None, cache_dir: str = None, optimize_memory: bool = False):
+        """
+        usecols/sections: columns or sections to read (the target is always read), dtype: column types applied while parsing,
+        engine: CSV parser ("pyarrow" when installed and the file has one header row). With cache_dir (or cache=True, the
+        user cache dir) the parsed file is cached on disk, by default nothing is written. optimize_memory: downcasts the columns once read (see get_memory_savings).
+        See DatasetByFile for the formats.
+        """
+        dataset= DatasetByFile(file_path=file_path,target=target,delimiter=delimiter, header_size= header_size,
+                               usecols=usecols, sections=sections, dtype=dtype, engine=engine, cache=cache, cache_dir=cache_dir,
+                               optimize_memory=optimize_memory)
         data_processor = DataProcessor(dataset)
         self.load_dataset(data_processor)
             
+    @track_memory
     def load_dataset_by_web(self, url: str,target: str, header_size:int=1):
         dataset= DatasetByWeb(url= url,target=target, header_size= header_size)
         data_processor = DataProcessor(dataset)
         self.load_dataset(data_processor)  
 
+    @track_memory
     @requires_dataset
     def perform_eda(self, path_to_save_report=None):        
         self.data_processor.dataset.perform_eda(path_to_save_report=path_to_save_report)
 
+    @track_memory
     @requires_dataset
     def plot_heatmap(self, show_values = False, remove_repetead_value = False,fig_size= (0,0), section:str=None):
         self.data_processor.dataset.plot_heatmap(show_values=show_values,remove_repetead_value=remove_repetead_value,fig_size=fig_size,section=section)    
     
+    @track_memory
     @requires_dataset
     def plot_pairplot(self, cols:list[str] = None, height=2.5,section:str = None):
         self.data_processor.dataset.plot_pairplot(cols=cols, height= height,section=section)
 
+    @track_memory
     @requires_dataset
     def encode_categorical(self, cols:list[str] = [], parallel: bool = False):
         def process_column(col):           
@@ -58,47 +96,57 @@ class AutoBioLearn(ABC):
         else:
             self.data_processor.encode_categorical(cols)
 
+    @track_memory
     @requires_dataset
     def drop_cols_na(self, percent=30.0, section: str=None):
         self.data_processor.drop_cols_na(percent,section= section)
 
+    @track_memory
     @requires_dataset   
     def drop_rows_na(self, percent=10.0, section: str=None):
         self.data_processor.drop_rows_na(percent,section= section)
 
+    @track_memory
     @requires_dataset
     @apply_per_grouping
     def show_cols_na(self, section: str=None):
         self.data_processor.show_cols_na(section= section)
     
+    @track_memory
     @requires_dataset
     @apply_per_grouping  
     def show_rows_na(self, section: str=None):       
         self.data_processor.show_rows_na(section= section)
 
+    @track_memory
     @requires_dataset
-    @apply_per_grouping  
+    @apply_per_grouping(parallel_safe=False)  
     def plot_cols_na(self, value="percent", section: str=None):
         self.data_processor.plot_cols_na(value=value,section=section)
 
+    @track_memory
     @requires_dataset
-    @apply_per_grouping  
+    @apply_per_grouping(parallel_safe=False)  
     def plot_rows_na(self, value="percent", section: str=None):
         self.data_processor.plot_rows_na(value=value,section=section)
 
+    @track_memory
     @requires_dataset
     def remove_cols(self, cols:list[str] = []):
         self.data_processor.remove_cols(cols)
 
+    @track_memory
     @requires_dataset
-    @apply_per_grouping 
+    @apply_per_grouping(parallel_safe=False) 
     def remove_duplicates(self, section: str=None):      
         self.data_processor.dataset.remove_duplicates(section= section)
     
+    @track_memory
     @requires_dataset    
     def drop_section(self, sections: list[str]):      
         self.data_processor.dataset.drop_section(sections)
 
+    @track_memory
     @requires_dataset
     def encode_datetime(self, cols:list[str] = [], cols_levels= 0, parallel: bool = False):
         def process_column(col):               
@@ -110,10 +158,24 @@ class AutoBioLearn(ABC):
         else:
             self.data_processor.encode_datetime(cols, cols_levels= cols_levels)
 
+    @track_memory
     @requires_dataset    
     def impute_cols_na(self,method="knn", section: str=None):       
         self.data_processor.dataset.impute_cols_na(method=method, section= section)
 
+    @track_memory
+    @requires_dataset
+    def optimize_memory(self, float_rtol: float = 1e-6, max_category_ratio: float = 0.5)-> pd.DataFrame:
+        """
+        Downcasts the dataset columns to the smallest types holding the same values and returns the bytes saved
+        per column. See Dataset.optimize_memory.
+        """
+        return self.data_processor.dataset.optimize_memory(float_rtol=float_rtol, max_category_ratio=max_category_ratio)
+
+    @requires_dataset
+    def get_memory_savings(self)-> pd.DataFrame:
+        return self.data_processor.dataset.get_memory_savings()
+
     def set_validations(self, validations:list[str]=["split"], params ={}):
         self._validations_execution= {}     
 
@@ -128,27 +190,526 @@ class AutoBioLearn(ABC):
     def _get_validation(self,validation: str):
         return
 
+    def set_execution_backend(self, backend: str = "thread", max_workers: int = None, path: str = None):
+        """
+        backend: "thread", "process", "serial" or "queue". The unit of work is a single (model, repeat, validation, fold) task.
+        queue: tasks are written to path, a directory shared with workers started on any node with
+        `python -m execution <path>` (from src), and their results are read back. max_workers limits the tasks queued at once.
+        """
+        self._execution_backend = ExecutionBackend(backend, max_workers, self._resource_scheduler, path)
+
+    def set_resources(self, cores: int = None, memory_bytes: int = None, threads_per_task: int = None):
+        """
+        Core and memory budget of training, hyperparameter search and SHAP. Every task gets threads_per_task cores
+        (the cores split over the tasks of each stage when None) set as the model n_jobs/thread_count, and tasks
+        are admitted only while their estimated memory fits in memory_bytes (80% of the available memory when None).
+        """
+        self._resource_scheduler = ResourceScheduler(cores, memory_bytes, threads_per_task)
+        self._execution_backend.scheduler = self._resource_scheduler
+
+    def set_parallel_sections(self, parallel: bool = True, max_workers: int = None):
+        """
+        Runs the sections of a multi-header dataset at the same time in execute_models, eval_models and the
+        other per-section methods (plots excepted). Their tasks share the cores and memory of set_resources,
+        max_workers sections run at once (min(sections, cores) when None) and each section output is printed whole.
+        """
+        self._parallel_sections = parallel
+        self._parallel_sections_workers = max_workers
+
+    def set_model_retention(self, model_retention: str = "all", path: str = None):
+        """
+        model_retention: "all", "none", "best" (best scored fold per model and section) or "disk" (models spilled to path).
+        Results already executed are kept only when the policy does not change.
+        """
+        if model_retention != self._models_executed.model_retention or path != self._models_executed.path:
+            self._models_executed = ResultsStore(model_retention, path)
+
+    def set_model_store(self, path: str = None, compress: int = 3, cache_size: int = 8):
+        """
+        Writes every fitted fold model to a compressed artifact in path (a temporary directory when None) as soon as
+        its fold finishes. Models are loaded on demand through an LRU cache of cache_size models.
+        """
+        self._models_executed = ResultsStore("disk", path, compress, cache_size)
+
+    def set_fold_cache(self, max_bytes: int = 2**30):
+        """
+        Memory cap of the per-fold data cache (train/test slices and SMOTE output) shared by the models of a run. 0 disables it.
+        """
+        self._fold_cache_max_bytes = max_bytes
+
+    def set_hyperparam_store(self, path: str = None, enabled: bool = True, warm_start: bool = True):
+        """
+        Persists hyperparameter search results in a SQLite file (hyperparams.sqlite in the user cache dir when path is None).
+        A search already run on the same data, section, model, space, metric and settings is skipped, and with warm_start a
+        search whose data changed starts from the best candidates of the previous one.
+        """
+        self._hyperparam_store = HyperparamStore(path) if enabled else None
+        self._hyperparam_warm_start = warm_start
+
+    def set_cost_model(self, path: str = None, enabled: bool = True):
+        """
+        Persists the task timings of the cost model in a JSON file (cost_model.json in the user cache dir when path is None),
+        so the runtime estimates used to schedule the tasks start from the timings of previous sessions.
+        """
+        self._cost_model = CostModel(path=(path if path is not None else CostModel.get_default_path()) if enabled else None)
+
+    def set_tracing(self, enabled: bool = True):
+        """
+        Records a span for every stage of execute_models, the metrics and perform_shap_analysis (data access, splits,
+        search, fit, predict, SMOTE, metric computation, SHAP) tagged with model, section, repeat and fold.
+        """
+        self._tracer.enabled = enabled
+
+    def get_trace(self)-> pd.DataFrame:
+        return self._tracer.get_spans()
+
+    def export_trace(self, path: str)-> str:
+        """
+        Writes the recorded spans as a Chrome/Perfetto trace JSON (chrome://tracing, ui.perfetto.dev).
+        """
+        return self._tracer.export_chrome_trace(path)
+
+    def clear_trace(self):
+        self._tracer.clear()
+
+    def set_memory_tracking(self, enabled: bool = True, ceiling_bytes: int = None, warn_fraction: float = 0.9, use_tracemalloc: bool = True):
+        """
+        Records the RSS (process and worker processes), peak RSS and tracemalloc deltas of every public method call
+        (get_memory_report). A MemoryCeilingWarning is issued when the RSS reaches warn_fraction of ceiling_bytes.
+        tracemalloc slows allocations down, use_tracemalloc=False keeps only the RSS.
+        """
+        self._memory_monitor = MemoryMonitor(enabled, ceiling_bytes, warn_fraction, use_tracemalloc)
+
+    def get_memory_report(self)-> pd.DataFrame:
+        return self._memory_monitor.get_records()
+
+    def get_memory_usage(self)-> pd.DataFrame:
+        """
+        Bytes held by each structure: original data, working data, sections, cached feature matrices, split plan, metrics cache,
+        results (predictions and indices), models spilled to disk and SHAP arrays.
+        """
+        usage = {}
+        if hasattr(self, "data_processor"):
+            usage.update(self.data_processor.dataset.get_memory_usage())
+        usage["split_plan"] = self._split_plan.get_nbytes() if self._split_plan is not None else 0
+        usage["metrics_cache"] = self._metrics_cache.get_nbytes()
+        usage["results"] = self._models_executed.get_nbytes()
+        usage["model_store_disk"] = self._models_executed.model_store.get_nbytes() if self._models_executed.model_store is not None else 0
+        usage["shap"] = MemoryMonitor.get_nbytes(getattr(self, "_AutoBioLearn__SHAP_analisys", None))
+
+        memory_usage = pd.DataFrame({"structure": list(usage.keys()), "bytes": list(usage.values())})
+        memory_usage["MB"] = memory_usage["bytes"] / 2**20
+        return memory_usage
+
+    def set_seed(self, seed: int = None):
+        """
+        Master seed of the split plan. With None a seed is drawn once and kept by the plan.
+        """
+        self._seed = seed
+
+    def save_split_plan(self, path: str):
+        if self._split_plan is None:
+            raise ValueError("Split plan is not initialized, run execute_models first.")
+        self._split_plan.save(path)
+
+    def load_split_plan(self, path: str):
+        """
+        Loads a plan saved by save_split_plan (.npz). It is reused while validations, repeats and target match.
+        """
+        self._split_plan = SplitPlan.load(path)
+        self._seed = self._split_plan.seed
+
+    def _get_split_plan(self, times_repeats: int, best_params_train_size: float, model_type: str, y,
+                        checkpoint_dir: str = None, x_hash: str = None)-> SplitPlan:
+        """
+        Plan of the run. Without a seed and with a checkpoint_dir, the plan drawn for the same data, validations and
+        repeats is read back from (or saved to) the checkpoint, so the run resumes in another process.
+        """
+        with self._split_plan_lock:
+            seed = self._seed
+            plan_path = None
+            if seed is None and checkpoint_dir is not None:
+                plan_key = SplitPlan.get_fingerprint(self._validations_execution, times_repeats, best_params_train_size, model_type, y, None)
+                plan_path = Checkpoint.get_split_plan_path(checkpoint_dir, plan_key, x_hash)
+                if os.path.exists(plan_path):
+                    self._split_plan = SplitPlan.load(plan_path)
+                    return self._split_plan
+            if seed is None and self._split_plan is not None:
+                seed = self._split_plan.seed
+
+            fingerprint = SplitPlan.get_fingerprint(self._validations_execution, times_repeats, best_params_train_size, model_type, y, seed)
+            if self._split_plan is None or self._split_plan.fingerprint != fingerprint:
+                self._split_plan = SplitPlan.build(self._validations_execution, times_repeats, best_params_train_size, model_type, y, seed)
+            if plan_path is not None:
+                Checkpoint.save_split_plan(plan_path, self._split_plan)
+
+            return self._split_plan
+
     @abstractmethod
-    def execute_models(self, models:list[str]=["xgboost"],  times_repeats:int=10, params={}, section:str=None):
+    def execute_models(self, models:list[str]=["xgboost"],  times_repeats:int=10, params={}, section:str=None, job: Job = None):
+        """
+        job: the Job the tasks are reported to, set by submit_models.
+        """
         return
-      
-    def _add_model_executed(self ,time: int,validation: str, fold: int,                                                         
-                            model_name: str, model,y_pred, y_test, x_test_index, section= None):
-        
-        instance = {"time":time,
-                    "validation":validation,
-                    "fold":fold,                                                        
-                    "model_name":model_name,
-                    "model":model,
-                    "y_pred":y_pred,
-                    "y_test":y_test,
-                    "x_test_index":x_test_index }
-        
-        if section:
-           instance["section"] = section 
 
-        self._models_executed.append(instance)
+    def _submit(self, method, **kwargs)-> Job:
+        """
+        Starts method in a Job, which is passed to it, so calls made meanwhile outside the job are not reported in it.
+        Only one job runs at a time.
+        """
+        def run(job: Job):
+            try:
+                return method(**kwargs, job=job)
+            finally:
+                with self._job_lock:
+                    if self._job is job:
+                        self._job = None
+
+        with self._job_lock:
+            if self._job is not None and not self._job.done():
+                raise RuntimeError("A job is already running, wait for it or cancel it first.")
+            self._job = Job(run, name=method.__name__)
+            job = self._job
+        job.start()
+        return job
+
+    def submit_models(self, models:list[str]=["xgboost"],  times_repeats:int=10, params={}, section:str=None)-> Job:
+        """
+        Runs execute_models in the background and returns its Job: progress(), cancel(), result(), await job
+        and iteration over the searches and folds as they complete. evaluate_models works on the folds done so far.
+        """
+        kwargs = {"models": models, "times_repeats": times_repeats, "params": params}
+        if section is not None:
+            kwargs["section"] = section
+        return self._submit(self.execute_models, **kwargs)
+
+    def _execute_models(self, models:list[str], times_repeats:int, params:dict, section:str, model_type:str, balancing:bool = False,
+                        job: Job = None):
+        with self._tracer.record(section=section), Tracer.span("execute_models"):
+            try:
+                self._run_models(models, times_repeats, params, section, model_type, balancing, job)
+            finally:
+                self._cost_model.save()
+
+    def _run_models(self, models:list[str], times_repeats:int, params:dict, section:str, model_type:str, balancing:bool = False,
+                    job: Job = None):
+        if job is not None and job.cancelled():
+            return
+
+        models_execution = {}
+        incremental = False
+        if "incremental" in params:
+            incremental = params["incremental"]
+
+        if not self.data_processor.dataset.get_has_many_header() and not incremental:
+            self._models_executed.clear()
+            self._search_history = []
+            self._task_log = []
+
+        unique_models = set(models)
+        for model_name in unique_models:
+            models_execution[model_name] = ModelHelper.get_model(model_name, model_type)
+
+        with Tracer.span("get_X"):
+            x = self.data_processor.dataset.get_X(section, copy=False)
+        with Tracer.span("get_Y"):
+            try:
+                y = self.data_processor.dataset.get_Y(section)
+            except:
+                y = self.data_processor.dataset.get_Y()
+
+        params_method = 'quick'
+
+        if "best_params_method" in params:
+            params_method = params["best_params_method"]
+
+        if params_method == 'quick':
+            model_gen =  RandomizedSearchCV
+        elif params_method == 'budget':
+            model_gen = None
+        else:
+            model_gen = GridSearchCV
+
+        budget_best_params = {}
+        for key in ["max_fits", "max_time", "resource", "factor", "n_jobs", "early_stopping_rounds"]:
+            if "best_params_" + key in params:
+                budget_best_params[key] = params["best_params_" + key]
+
+        params_models = {}
+
+        if "params_models" in params:
+            params_models = params["params_models"]
+
+        train_size_best_params = 70
+
+        if "best_params_train_size" in params:
+            train_size_best_params = params["best_params_train_size"]
+
+        fold_best_params = 5
+        if "best_params_n_folds" in params:
+            fold_best_params = params["best_params_n_folds"]
+
+        metric_best_params = None
+        if "best_params_metrics" in params:
+            metric_best_params = params["best_params_metrics"]
+
+        timeout = None
+        if "timeout" in params:
+            timeout = params["timeout"]
+
+        timeout_models = {}
+        if "timeout_models" in params:
+            timeout_models = params["timeout_models"]
+
+        checkpoint_dir = params.get("checkpoint_dir")
+        with Tracer.span("data_hash"):
+            x_hash = SplitPlan.get_data_hash(x)
+            y_hash = SplitPlan.get_data_hash(y)
+        with Tracer.span("split_plan"):
+            split_plan = self._get_split_plan(times_repeats, train_size_best_params, model_type, y, checkpoint_dir, x_hash)
+
+        checkpoint = None
+        if checkpoint_dir is not None:
+            checkpoint = Checkpoint(checkpoint_dir, Checkpoint.get_fingerprint(split_plan, x_hash, model_type))
+
+        cell_configs = {}
+        for model_name in models_execution.keys():
+            model_config = [model_type, section, model_name, ModelHelper.get_model_params(model_name,params_models), params_method, budget_best_params,
+                            train_size_best_params, fold_best_params, metric_best_params, balancing, x_hash,
+                            y_hash, split_plan.seed]
+            for i, validation, fold in split_plan.keys():
+                cell_configs[(model_name, i, validation, fold)] = ResultsStore.get_config(*model_config, split_plan.get_split_hash(i, validation, fold))
+
+        pending_cells = set(cell_configs.keys())
+        if incremental:
+            with Tracer.span("sync_cells"):
+                pending_cells = self._sync_cells(cell_configs, section)
+
+        search_tasks = []
+        best_params = {}
+        for model_name, (model_object, model_params_hidden_verbosity) in models_execution.items():
+            model_params = ModelHelper.get_model_params(model_name,params_models)
+            if not any(cell[0] == model_name for cell in pending_cells):
+                continue
+            best_params[model_name] = {}
+            if bool(model_params):
+                search_task = {"model_name": model_name,
+                               "model_object": model_object,
+                               "model_params_hidden_verbosity": model_params_hidden_verbosity,
+                               "param_grid": model_params,
+                               "param_sel_obj": model_gen,
+                               "num_folds": fold_best_params,
+                               "metric": metric_best_params,
+                               "budget": budget_best_params,
+                               "train_size": train_size_best_params,
+                               "memory": ResourceScheduler.estimate_memory(x, 3 * train_size_best_params / 100),
+                               "timeout": timeout_models.get(model_name, timeout),
+                               "trace": self._tracer.enabled,
+                               "n_fits": self._get_search_fits(model_params, params_method, fold_best_params, budget_best_params)}
+                search_task["cost"] = self._cost_model.predict(model_name, "search", len(split_plan.get_best_params_split()),
+                                                               x.shape[1], search_task["n_fits"])
+                record = checkpoint.load(Checkpoint.get_search_key(search_task, section)) if checkpoint is not None else None
+                if record is None and self._hyperparam_store is not None:
+                    search_task["space_key"] = HyperparamStore.get_space_key(model_type, section, search_task)
+                    search_task["store_key"] = HyperparamStore.get_key(search_task["space_key"], x_hash, y_hash)
+                    record = self._hyperparam_store.load(search_task["store_key"])
+                    if record is None and self._hyperparam_warm_start:
+                        search_task["warm_start"] = self._hyperparam_store.get_warm_start(search_task["space_key"])
+
+                if record is not None:
+                    best_params[model_name] = record["best_params"]
+                    self._add_search_history(model_name, section, record.get("history"))
+                else:
+                    search_tasks.append(search_task)
+
+        if job is not None:
+            job.add_total(len(search_tasks) + len(pending_cells))
+
+        shared = {"x": x, "y": y, "split_plan": split_plan}
+        if self._fold_cache_max_bytes > 0:
+            shared["fold_cache"] = FoldDataCache(self._fold_cache_max_bytes)
+        if self._models_executed.model_store is not None:
+            shared["model_store"] = self._models_executed.model_store
+
+        with self._execution_backend.start(shared) as session:
+            for task, result, ex in session.run(FoldTask.find_best_params, search_tasks):
+                self._log_task("search", task, result, ex, section, len(split_plan.get_best_params_split()), x.shape[1])
+                if ex is None:
+                    self._tracer.add(result.get("spans"), section=section)
+                if ex is not None:
+                    if job is None:
+                        print(ex)
+                    else:
+                        job.add_total(-sum(1 for cell in pending_cells if cell[0] == task["model_name"]))
+                    del best_params[task["model_name"]]
+                else:
+                    best_params[task["model_name"]] = result["best_params"]
+                    self._add_search_history(task["model_name"], section, result["history"])
+                    if checkpoint is not None:
+                        with Tracer.span("checkpoint", model=task["model_name"]):
+                            checkpoint.save_search(Checkpoint.get_search_key(task, section), result["best_params"], result["elapsed"], result["history"])
+                    if self._hyperparam_store is not None:
+                        self._hyperparam_store.save(task["store_key"], task["space_key"], task["model_name"], section,
+                                                    result["best_params"], result["history"], result["elapsed"])
+                self._report_task(job, "search", task, section, ex)
+                if job is not None and job.cancelled():
+                    return
+
+            fold_memory = ResourceScheduler.estimate_memory(x, 6 if balancing else 3)
+            fold_tasks = []
+            for i, validation, fold in split_plan.keys():
+                for model_name, current_params in best_params.items():
+                    if (model_name, i, validation, fold) not in pending_cells:
+                        continue
+                    model_object, model_params_hidden_verbosity = models_execution[model_name]
+                    fold_task = {"model_name": model_name,
+                                 "section": section,
+                                 "model_object": model_object,
+                                 "model_params_hidden_verbosity": model_params_hidden_verbosity,
+                                 "best_params": current_params,
+                                 "time": i,
+                                 "validation": validation,
+                                 "fold": fold,
+                                 "balancing": balancing,
+                                 "model_type": model_type,
+                                 "memory": fold_memory,
+                                 "timeout": timeout_models.get(model_name, timeout),
+                                 "trace": self._tracer.enabled,
+                                 "config": cell_configs[(model_name, i, validation, fold)]}
+                    fold_task["cost"] = self._cost_model.predict(model_name, "fold", len(split_plan.get_split(i, validation, fold)[0]), x.shape[1])
+                    if checkpoint is not None and self._resume_fold_task(checkpoint, fold_task, y):
+                        if job is not None:
+                            job.add_total(-1)
+                        continue
+                    fold_tasks.append(fold_task)
+
+            for task, result, ex in session.run(FoldTask.train_fold, fold_tasks):
+                _, test_index = split_plan.get_split(task["time"], task["validation"], task["fold"])
+                y_test = y.iloc[test_index]
+                self._log_task("fold", task, result, ex, section, len(split_plan.get_split(task["time"], task["validation"], task["fold"])[0]), x.shape[1])
+                score = None
+                if ex is not None:
+                    if job is None:
+                        print(ex)
+                else:
+                    self._tracer.add(result.get("spans"), section=section)
+                    fold_tags = {"model": task["model_name"], "repeat": task["time"], "validation": task["validation"], "fold": task["fold"]}
+                    with Tracer.span("fold_score", **fold_tags):
+                        score = self._get_fold_score(y_test, result["y_pred"])
+                    if checkpoint is not None:
+                        with Tracer.span("checkpoint", **fold_tags):
+                            checkpoint.save_fold(Checkpoint.get_fold_key(task), task, result, test_index, task["best_params"], \
+                                                 self._models_executed.model_store, self._models_executed.model_retention != "none")
+                    with Tracer.span("store_result", **fold_tags):
+                        self._add_model_executed(task["time"], task["validation"], task["fold"], task["model_name"], \
+                                                 result["model"], result["y_pred"], y_test, test_index, section, \
+                                                 y_proba=result["y_proba"], score=score, \
+                                                 config=task["config"])
+                self._report_task(job, "fold", task, section, ex, score)
+                if job is not None and job.cancelled():
+                    break
+
+    @staticmethod
+    def _get_search_fits(model_params: dict, params_method: str, num_folds: int, budget: dict)-> int:
+        if params_method == 'budget':
+            return budget["max_fits"] if "max_fits" in budget else 2 * 27 * num_folds
+        if params_method == 'quick' or not SearchHelper.is_discrete(model_params):
+            return 10 * num_folds
+        return len(ParameterGrid(model_params)) * num_folds
+
+    @staticmethod
+    def _report_task(job: Job, kind: str, task: dict, section: str, ex: Exception, score: float = None):
+        if job is None:
+            return
+        job.report({"kind": kind, "section": section, "model_name": task["model_name"], "time": task.get("time"),
+                    "validation": task.get("validation"), "fold": task.get("fold"), "score": score, "elapsed": task.get("wall_time")}, ex)
+
+    def _log_task(self, kind: str, task: dict, result: dict, ex: Exception, section: str, rows: int, features: int):
+        """
+        Records the status and time of a finished, failed or timed out task, and feeds the cost model with its time.
+        """
+        status = "ok" if ex is None else ("timeout" if isinstance(ex, TimeoutError) else "error")
+        elapsed = result["elapsed"] if result is not None else task.get("wall_time")
+        if status == "ok":
+            self._cost_model.observe(task["model_name"], kind, rows, features, elapsed, task.get("n_fits", 1))
+
+        self._task_log.append({"Model": task["model_name"], "Section": section, "Task": kind,
+                               "Validation": task.get("validation"), "Time_of_execution": task.get("time"), "Fold": task.get("fold"),
+                               "Status": status, "Elapsed": elapsed, "Estimated": task.get("cost"), "Timeout": task.get("timeout"),
+                               "Error": None if ex is None else str(ex)})
+
+    def get_task_log(self, section: str = None)-> pd.DataFrame:
+        """
+        One row per search or fold task executed: status ("ok", "timeout" or "error"), elapsed and estimated seconds.
+        """
+        task_log = pd.DataFrame(self._task_log, columns=["Model", "Section", "Task", "Validation", "Time_of_execution", "Fold",
+                                                         "Status", "Elapsed", "Estimated", "Timeout", "Error"])
+        if section is not None:
+            task_log = task_log[task_log["Section"] == section]
+        if not self.data_processor.dataset.get_has_many_header():
+            task_log = task_log.drop(columns=["Section"])
+        return task_log.reset_index(drop=True)
+
+    def _sync_cells(self, cell_configs: dict, section: str)-> set:
+        """
+        Differential execution: rows of the requested models in section whose cell is no longer requested or whose
+        configuration changed are dropped, and the cells still missing from the executed models are returned.
+        """
+        model_names = set(cell[0] for cell in cell_configs.keys())
+        recorded = self._models_executed.get_configs(section)
+        stale = [cell for cell, config in recorded.items() if cell[0] in model_names and cell_configs.get(cell) != config]
+
+        if len(stale) > 0:
+            self._models_executed.remove_cells(section, stale)
+
+        return set(cell for cell, config in cell_configs.items() if recorded.get(cell) != config)
+
+    def _add_search_history(self, model_name: str, section: str, history: list[dict]):
+        if history is None:
+            return
+        for record in history:
+            self._search_history.append({"Model": model_name, "Section": section, **record})
+
+    def get_search_history(self, section: str = None)-> pd.DataFrame:
+        """
+        Every candidate evaluated by the hyperparameter search with its score and cost (fit_time in seconds and n_fits).
+        """
+        history = pd.DataFrame(self._search_history, columns=["Model", "Section", "params", "round", "resource", "resource_value",
+                                                              "score", "fit_time", "n_fits", "best_iteration"])
+        if section is not None:
+            history = history[history["Section"] == section]
+        if not self.data_processor.dataset.get_has_many_header():
+            history = history.drop(columns=["Section"])
+        return history.reset_index(drop=True)
+
+    def _resume_fold_task(self, checkpoint: Checkpoint, task: dict, y)-> bool:
+        """
+        Adds the checkpointed result of task to the executed models, returns False when the task has no record.
+        """
+        key = Checkpoint.get_fold_key(task)
+        record = checkpoint.load(key)
+        if record is None:
+            return False
+
+        model = None
+        if record["has_model"] and self._models_executed.model_retention != "none":
+            model = checkpoint.load_model(key, self._models_executed.model_store)
+
+        y_test = y.iloc[record["x_test_index"]]
+        self._add_model_executed(record["time"], record["validation"], record["fold"], record["model_name"], \
+                                 model, record["y_pred"], y_test, record["x_test_index"], record["section"], \
+                                 y_proba=record["y_proba"], score=self._get_fold_score(y_test, record["y_pred"]), \
+                                 config=task["config"])
+        return True
+
+    def _add_model_executed(self ,time: int,validation: str, fold: int,                                                         
+                            model_name: str, model,y_pred, y_test, x_test_index, section= None, y_proba= None, score: float= None, config: str= None):
+        self._models_executed.add(time, validation, fold, model_name, model, y_pred, y_test, x_test_index, \
+                                  section=section, y_proba=y_proba, score=score, config=config)
 
+    @abstractmethod
+    def _get_fold_score(self, y_test, y_pred)-> float:
+        return
 
     def _find_best_hyperparams(self, clf_model,
                             X,
@@ -158,47 +719,51 @@ class AutoBioLearn(ABC):
                             num_folds,
                             metric
                           ):  
+        return ModelHelper.find_best_hyperparams(clf_model, X, y, param_grid, param_sel_obj, num_folds, metric)
 
-    # Grid search optimal parameters
-        clf_grid = param_sel_obj(clf_model,
-                                  param_grid,                                  
-                                  cv=num_folds,
-                                  scoring = metric
-                                  )
-
-    # training model
-        clf_grid.fit(X, y)
-        return clf_grid.best_params_
+    @property
+    def _metrics(self)-> pd.DataFrame:
+        metrics = self._metrics_cache.get_metrics(self._models_executed)
+        if not self.data_processor.dataset.get_has_many_header():
+            metrics = metrics.drop(columns=["Section"])
+        return metrics.reset_index(drop=True)
 
+    @track_memory
     def evaluate_models(self, metrics:list[str]=[], section: str = None)-> dict:
-        if not hasattr(self, '_metrics'):
-            self._calculate_metrics()
-
         all_list = {}
 
-        section_metrics = self._metrics
-
-        if section is not None and self.data_processor.dataset.get_has_many_header():
-            section_metrics = self._metrics[self._metrics["Section"] == section]
+        if section is None or not self.data_processor.dataset.get_has_many_header():
+            section = None
 
         for metric in metrics:
-            all_list[metric] = section_metrics[["Model",metric ]].groupby('Model').describe()      
-        
+            all_list[metric] = self._metrics_cache.get_summary(self._models_executed, metric, section)
+
+        section_metrics = self._metrics
+        if section is not None:
+            section_metrics = section_metrics[section_metrics["Section"] == section]
+
         all_list["complete"] = section_metrics[["Model","Validation","Time_of_execution","Fold"]+ metrics]
         return all_list
     
     @abstractmethod
-    def _calculate_metrics(self):
+    def _calculate_metrics(self, table: pd.DataFrame, y_test, y_pred, y_proba)-> pd.DataFrame:
+        """
+        Returns one row of metrics for every row of a ResultsStore table.
+        """
         return
+
+    def _calculate_metrics_traced(self, table: pd.DataFrame, y_test, y_pred, y_proba)-> pd.DataFrame:
+        with self._tracer.record(), Tracer.span("calculate_metrics", rows=len(table)):
+            return self._calculate_metrics(table, y_test, y_pred, y_proba)
     
+    @track_memory
     def plot_metrics(self, metrics:list[str]=[],rot=90, figsize=(12,6), fontsize=20, section: str = None ):
-        if not hasattr(self, '_metrics'):
-            self._calculate_metrics()
+        from matplotlib import pyplot as plt
 
         section_metrics = self._metrics
         
         if section is not None and self.data_processor.dataset.get_has_many_header():
-            section_metrics = self._metrics[self._metrics["Section"] == section]
+            section_metrics = section_metrics[section_metrics["Section"] == section]
 
         for metric in metrics:                
             df2  = pd.DataFrame({col:vals[metric] for col, vals in section_metrics.groupby("Model")})
@@ -218,24 +783,42 @@ class AutoBioLearn(ABC):
             #axes.get_figure().show()
             plt.show()  
 
-    def perform_shap_analysis(self,**kwargs):
+    @track_memory
+    def perform_shap_analysis(self, job: Job = None, **kwargs):
         """
         kwargs use a list to filter by key models to analisys, where each key receives a list of values that will be filtered 
         kwargs params: time, validation, model_name, fold.
         Eg.: fold = [1,2,3]
+        job: the Job the models explained are reported to, set by submit_shap_analysis.
         """
-        models_explained = self._models_executed.copy()
-
-        for key, value in kwargs.items():
-            models_explained = filter(lambda x: x[key] in value, models_explained)      
+        models_explained = [model for model in self._models_executed.get_rows(self._models_executed.mask(**kwargs), load_models=False) \
+                            if self._models_executed.has_model(model["row"])]
         
         self.__SHAP_analisys = []
 
         x : pd.DataFrame = None
         if not self.data_processor.dataset.get_has_many_header():
-            x = self.data_processor.dataset.get_X()
+            x = self.data_processor.dataset.get_X(copy=False)
+
+        scheduler = self._resource_scheduler
+        n_threads = scheduler.get_threads(len(models_explained))
 
         def explain_current_model(model_to_explain, x):
+            x_memory = x if x is not None else self.data_processor.dataset.get_X(model_to_explain.get("section"), copy=False)
+            memory = ResourceScheduler.estimate_memory(x_memory, 4)
+            scheduler.acquire(memory, n_threads)
+            try:
+                with self._tracer.record(model=model_to_explain["model_name"], section=model_to_explain.get("section"),
+                                         repeat=model_to_explain["time"], validation=model_to_explain["validation"],
+                                         fold=model_to_explain["fold"]), Tracer.span("shap_task"):
+                    return explain_model(model_to_explain, x)
+            finally:
+                scheduler.release(memory, n_threads)
+
+        def explain_model(model_to_explain, x):
+            with Tracer.span("load_model"):
+                model = ResourceScheduler.set_threads(self._models_executed.get_model(model_to_explain["row"]), n_threads)
+            model_to_explain = {**model_to_explain, "model": model}
             shap_model_analisys = {"time":model_to_explain["time"],
                                         "validation":model_to_explain["validation"],
                                         "fold":model_to_explain["fold"],
@@ -245,21 +828,26 @@ class AutoBioLearn(ABC):
 
             if "section" in model_to_explain:                
                 shap_model_analisys["section"] = model_to_explain["section"]
-                x = self.data_processor.dataset.get_X(model_to_explain["section"])
+                with Tracer.span("get_X"):
+                    x = self.data_processor.dataset.get_X(model_to_explain["section"], copy=False)
 
             x_to_consolidated = x.iloc[model_to_explain["x_test_index"]]
 
-            explainer_consolidated =  XAIHelper.get_explainer(model=model_to_explain,X=x_to_consolidated)
+            with Tracer.span("explainer", scope="test"):
+                explainer_consolidated =  XAIHelper.get_explainer(model=model_to_explain,X=x_to_consolidated)
 
-            shap_values_consolidated = explainer_consolidated.shap_values(x_to_consolidated)
-            shap_obj_consolidated    = explainer_consolidated(x_to_consolidated)
+            with Tracer.span("shap_values", scope="test"):
+                shap_values_consolidated = explainer_consolidated.shap_values(x_to_consolidated)
+                shap_obj_consolidated    = explainer_consolidated(x_to_consolidated)
             
             expected_value_consolidated = explainer_consolidated.expected_value            
 
-            explainer =   XAIHelper.get_explainer(model=model_to_explain,X=x)
+            with Tracer.span("explainer", scope="all"):
+                explainer =   XAIHelper.get_explainer(model=model_to_explain,X=x)
 
-            shap_values = explainer.shap_values(x)
-            shap_obj    = explainer(x)
+            with Tracer.span("shap_values", scope="all"):
+                shap_values = explainer.shap_values(x)
+                shap_obj    = explainer(x)
 
             expected_value = explainer.expected_value
             shap_model_analisys["shap_obj"]= shap_obj
@@ -272,18 +860,36 @@ class AutoBioLearn(ABC):
             return shap_model_analisys
 
 
-        with ThreadPoolExecutor() as executor:
-            future_to_model = [executor.submit(explain_current_model, models_to_execute, x) for models_to_execute in models_explained]
+        if job is not None:
+            job.add_total(len(models_explained))
+
+        with ThreadPoolExecutor(max_workers=scheduler.get_workers(len(models_explained))) as executor:
+            future_to_model = {executor.submit(explain_current_model, models_to_execute, x): models_to_execute for models_to_execute in models_explained}
 
             for future in as_completed(future_to_model):               
+                error = None
                 try:                   
                     shap_model_analisys = future.result()
                     self.__SHAP_analisys.append(shap_model_analisys)
                 except Exception as e:
-                   print(e)
-                   pass                  
+                   error = e
+                   if job is None:
+                       print(e)
+                self._report_task(job, "shap", future_to_model[future], future_to_model[future].get("section"), error)
+                if job is not None and job.cancelled():
+                    for other in future_to_model:
+                        other.cancel()
+                    break                  
         
-    @apply_per_grouping        
+
+    def submit_shap_analysis(self, **kwargs)-> Job:
+        """
+        Runs perform_shap_analysis in the background and returns its Job (progress, cancel, result, await, iteration).
+        """
+        return self._submit(self.perform_shap_analysis, **kwargs)
+
+    @track_memory
+    @apply_per_grouping(parallel_safe=False)        
     def plot_shap_analysis(self,register=None,graph_type_global="summary",graph_type_local="force",show_all_features =True,class_index: int =0,**kwargs):
         """
         class_index works only lightgbm models, class_index is max value the number of classes in dataset -1.(Eg.: total class = 3, class_index_max=2)
@@ -292,21 +898,18 @@ class AutoBioLearn(ABC):
         Eg.: fold = [1,2,3]
         """       
 
-        models_explained = self.__SHAP_analisys.copy()
-
         kwargs_filtered_models = {key: value for  key, value in kwargs.items() if key not in "graph_params"}
 
-        for key, value in kwargs_filtered_models.items():
-            models_explained = list(filter(lambda x: x[key] in value, models_explained)) 
+        models_explained = ResultsStore.filter_records(self.__SHAP_analisys, **kwargs_filtered_models)
         
         if not self.data_processor.dataset.get_has_many_header():
-            X = self.data_processor.dataset.get_X()
+            X = self.data_processor.dataset.get_X(copy=False)
 
         kwargs_filtered_graph= {key: value for  key, value in kwargs.items() if key in "graph_params"}       
  
         for model_explainable in models_explained:
             if "section" in model_explainable:
-                X = self.data_processor.dataset.get_X(model_explainable["section"])
+                X = self.data_processor.dataset.get_X(model_explainable["section"], copy=False)
                     
             if register is not None:
                 expected_value = model_explainable["expected_value"]
@@ -326,7 +929,8 @@ class AutoBioLearn(ABC):
                
                 XAIHelper.get_chart_type_global(graph_type_global,shap_values,X,kwargs_filtered_graph, show_all_features=show_all_features)
     
-    @apply_per_grouping
+    @track_memory
+    @apply_per_grouping(parallel_safe=False)
     def plot_shap_analysis_consolidated(self,graph_type="summary",show_all_features =True,class_index=0,**kwargs):
         """
         class_index works only lightgbm models, class_index is max value the number of classes in dataset -1.(Eg.: total class = 3, class_index_max=2)
@@ -335,15 +939,12 @@ class AutoBioLearn(ABC):
         Eg.: fold = [1,2,3]
         """       
 
-        models_explained = self.__SHAP_analisys.copy()
-
         kwargs_filtered_models = {key: value for  key, value in kwargs.items() if key not in "graph_params"}
 
-        for key, value in kwargs_filtered_models.items():
-            models_explained = list(filter(lambda x: x[key] in value, models_explained)) 
+        models_explained = ResultsStore.filter_records(self.__SHAP_analisys, **kwargs_filtered_models)
         
         if not self.data_processor.dataset.get_has_many_header():
-            X = self.data_processor.dataset.get_X()
+            X = self.data_processor.dataset.get_X(copy=False)
 
         kwargs_filtered_graph= {key: value for  key, value in kwargs.items() if key in "graph_params"}
                   
@@ -352,7 +953,7 @@ class AutoBioLearn(ABC):
         for model in models:
             print("Model:", model)
             if "section" in kwargs:
-                X = self.data_processor.dataset.get_X(kwargs["section"])
+                X = self.data_processor.dataset.get_X(kwargs["section"], copy=False)
             if model == ModelHelper.const_lightboost():
                 shap_values, X_test = XAIHelper.get_consolidate_shap_values_lightboost(models_explained, model, X, class_index,None)
                 XAIHelper.get_chart_type_global(graph_type,shap_values,X_test,kwargs_filtered_graph, show_all_features=show_all_features)
@@ -364,38 +965,45 @@ class AutoBioLearn(ABC):
                
 #region Deprecated
 
+    @track_memory
     @requires_dataset
     @deprecated("Method will be deprecated, consider using generate_data_report")
     def data_analysis(self, path_to_save_report=None):
         self.data_processor.dataset.perform_eda(path_to_save_report=path_to_save_report)
 
+    @track_memory
     @requires_dataset
     @deprecated("Method will be deprecated, consider using encode_categorical")
     def convert_categorical_to_numerical(self, cols:list[str] = []):
         self.data_processor.encode_categorical(cols)
     
+    @track_memory
     @requires_dataset
     @apply_per_grouping
     @deprecated("Method will be deprecated, consider using show_cols_na")
     def print_cols_na(self, section: str=None):
         self.data_processor.show_cols_na(section= section)
     
+    @track_memory
     @requires_dataset
     @apply_per_grouping
     @deprecated("Method will be deprecated, consider using show_rows_na")  
     def print_rows_na(self, section: str=None):
         self.data_processor.show_rows_na(section= section)
 
+    @track_memory
     @requires_dataset
     @deprecated("Method will be deprecated, consider using encode_numerical")  
     def convert_datetime_to_numerical(self, cols:list[str] = [], cols_levels= 0):
         self.data_processor.encode_datetime(cols, cols_levels= cols_levels)    
 
+    @track_memory
     @deprecated("Method will be deprecated, consider using perform_shap_analysis")  
     def perform_xai_analysis(self,**kwargs):
         self.perform_shap_analysis(**kwargs)
 
-    @apply_per_grouping
+    @track_memory
+    @apply_per_grouping(parallel_safe=False)
     @deprecated("Method will be deprecated, consider using plot_shap_analysis")        
     def plot_xai_analysis(self,index_to_filter=None,consolidated= False,graph_type_global="summary",graph_type_local="force",show_all_features =True,class_index=0,**kwargs):
         self.plot_shap_analysis(index_to_filter, consolidated,graph_type_global,graph_type_local,show_all_features,class_index,**kwargs)
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pandas as pd
+
+
+class BenchmarkHistory(object):
+    """
+    JSON file with the runs of the benchmark suite (environment, configuration and the wall time,
+    peak RSS and throughput of every case), compared run against run to catch regressions.
+    """
+
+    def __init__(self, path: str = "benchmark_history.json"):
+        self.path = path
+
+    def load(self)-> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as file:
+            return json.load(file)
+
+    def append(self, run: dict):
+        runs = self.load()
+        runs.append(run)
+        if os.path.dirname(self.path) != "":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(runs, file, indent=2, default=str)
+        os.replace(temp_path, self.path)
+
+    def get_runs(self)-> pd.DataFrame:
+        """
+        One row per run: index in the history, timestamp, commit, label and configuration.
+        """
+        return pd.DataFrame([{"run": n, "timestamp": run.get("timestamp"), "commit": run.get("environment", {}).get("commit"),
+                              "label": run.get("label"), "config": json.dumps(run.get("config"), sort_keys=True)}
+                             for n, run in enumerate(self.load())])
+
+    def compare(self, baseline: int = -2, current: int = -1, threshold: float = 0.1)-> pd.DataFrame:
+        """
+        Wall time and peak RSS of the cases of two runs (indexes in the history). status is "regression"
+        when the current run is more than threshold (relative) slower or larger, "improvement" when it is
+        that much faster or smaller, "new"/"removed" for cases only one run has.
+        """
+        runs = self.load()
+        if len(runs) < 2:
+            raise ValueError("the history needs two runs to compare")
+        base_run, current_run = runs[baseline], runs[current]
+        if base_run.get("config") != current_run.get("config"):
+            print("Warning: the runs were made with different configurations.")
+
+        rows = []
+        cases = list(base_run["results"].keys()) + [case for case in current_run["results"].keys() if case not in base_run["results"]]
+        for case in cases:
+            base, now = base_run["results"].get(case), current_run["results"].get(case)
+            row = {"case": case}
+            for metric in ["wall_time", "peak_rss"]:
+                row[f"{metric}_baseline"] = base[metric] if base is not None else None
+                row[f"{metric}_current"] = now[metric] if now is not None else None
+                row[f"{metric}_ratio"] = now[metric] / base[metric] if base is not None and now is not None and base[metric] else None
+
+            if base is None or now is None:
+                row["status"] = "new" if base is None else "removed"
+            elif any(row[f"{metric}_ratio"] is not None and row[f"{metric}_ratio"] > 1 + threshold for metric in ["wall_time", "peak_rss"]):
+                row["status"] = "regression"
+            elif any(row[f"{metric}_ratio"] is not None and row[f"{metric}_ratio"] < 1 - threshold for metric in ["wall_time", "peak_rss"]):
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+            rows.append(row)
+        return pd.DataFrame(rows)
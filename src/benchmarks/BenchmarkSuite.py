@@ -0,0 +1,236 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.SyntheticData import SyntheticData
+
+
+class BenchmarkSuite(object):
+    """
+    Times the main paths of the library on a synthetic dataset: import of the library, loading (DatasetByFile,
+    parsed, from its cache and with optimize_memory, whose memory ratio is recorded too), encode_categorical, impute_cols_na, get_X, execute_models per backend,
+    _calculate_metrics and perform_shap_analysis.
+    Every case records its best wall time over repeat runs, the peak RSS of the process while it ran and
+    its throughput (rows, columns or tasks per second).
+    """
+
+    def __init__(self, rows: int = 1000, cols: int = 100, missing_rate: float = 0.05, categorical_share: float = 0.1,
+                 sections: int = 1, task: str = "classification", models: list[str] = ["xgboost", "random_forest"],
+                 backends: list[str] = ["serial", "thread", "process"], times_repeats: int = 2, repeat: int = 1,
+                 impute: bool = True, shap: bool = True, seed: int = 0):
+        self.config = {"rows": rows, "cols": cols, "missing_rate": missing_rate, "categorical_share": categorical_share,
+                       "sections": sections, "task": task, "models": list(models), "backends": list(backends),
+                       "times_repeats": times_repeats, "repeat": repeat, "impute": impute, "shap": shap, "seed": seed}
+
+    @staticmethod
+    def cases()-> list[str]:
+        return ["import", "load", "load_cached", "load_optimized", "encode_categorical", "impute_cols_na", "get_X", "execute_models", "calculate_metrics", "perform_shap_analysis"]
+
+    @staticmethod
+    def _get_rss()-> int:
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss
+        except ImportError:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @staticmethod
+    def measure(func, repeat: int = 1, interval: float = 0.01)-> tuple:
+        """
+        Runs func repeat times and returns (result of the last run, best wall time, peak RSS in bytes).
+        The RSS is sampled every interval seconds while func runs.
+        """
+        peak = [BenchmarkSuite._get_rss()]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(interval):
+                peak[0] = max(peak[0], BenchmarkSuite._get_rss())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        best = None
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = func()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        finally:
+            stop.set()
+            sampler.join()
+        return result, best, max(peak[0], BenchmarkSuite._get_rss())
+
+    @staticmethod
+    def lazy_modules()-> list[str]:
+        """
+        Dependencies the library imports only when a feature needs them (plots, EDA, SHAP, model families, SMOTE, web datasets).
+        """
+        return ["matplotlib", "seaborn", "ydata_profiling", "shap", "catboost", "lightgbm", "xgboost", "imblearn", "requests"]
+
+    @staticmethod
+    def measure_import(modules: list[str] = ["AutoBioLearnClassification", "AutoBioLearnRegression"], repeat: int = 3, top: int = 10)-> dict:
+        """
+        Imports modules in fresh interpreters and returns {"wall_time": best of repeat runs (interpreter start excluded),
+        "peak_rss", "eager": lazy_modules() loaded by the import, "slowest": [(module, cumulative seconds)] from python -X importtime}.
+        """
+        src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join([src] + [path for path in [os.environ.get("PYTHONPATH")] if path])}
+        code = (f"import json, resource, sys, time\nstart = time.perf_counter()\nimport {', '.join(modules)}\n"
+                f"elapsed = time.perf_counter() - start\n"
+                f"print(json.dumps({{'wall_time': elapsed, 'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,"
+                f" 'eager': [name for name in {BenchmarkSuite.lazy_modules()!r} if name in sys.modules]}}))")
+
+        best = None
+        for n in range(repeat + 1):
+            options = ["-X", "importtime"] if n == repeat else []
+            process = subprocess.run([sys.executable, *options, "-c", code], cwd=src, env=env, capture_output=True, text=True, timeout=600)
+            if process.returncode != 0:
+                raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "import failed")
+            run = json.loads(process.stdout.strip().splitlines()[-1])
+            if n < repeat and (best is None or run["wall_time"] < best["wall_time"]):
+                best = run
+
+        slowest = []
+        for line in process.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line[len("import time:"):].split("|")
+                if cumulative.strip().isdigit() and name.strip() not in modules:
+                    slowest.append((name.strip(), int(cumulative) / 1e6))
+        best["slowest"] = sorted(slowest, key=lambda item: item[1], reverse=True)[:top]
+        return best
+
+    @staticmethod
+    def get_environment()-> dict:
+        versions = {}
+        for module_name in ["numpy", "pandas", "sklearn", "xgboost", "lightgbm", "catboost", "shap"]:
+            try:
+                versions[module_name] = __import__(module_name).__version__
+            except ImportError:
+                versions[module_name] = None
+
+        commit = None
+        try:
+            commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    capture_output=True, text=True, timeout=10).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+        return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+                "cpu_count": os.cpu_count(), "versions": versions}
+
+    def _record(self, results: dict, case: str, wall_time: float, peak_rss: int, amount: float, unit: str):
+        results[case] = {"wall_time": wall_time, "peak_rss": int(peak_rss), "throughput": amount / wall_time if wall_time > 0 else None,
+                         "unit": unit}
+        print(f"{case:<32} {wall_time:10.3f}s {peak_rss / 2**20:10.1f} MB {results[case]['throughput'] or 0:14.1f} {unit}")
+
+    def run(self, cases: list[str] = None, label: str = None)-> dict:
+        """
+        Runs the cases (all when None) and returns the run as stored in a BenchmarkHistory.
+        """
+        from AutoBioLearnClassification import AutoBioLearnClassification
+        from AutoBioLearnRegression import AutoBioLearnRegression
+        from data_treatment import DataProcessor, DatasetByFile
+
+        cases = cases if cases is not None else BenchmarkSuite.cases()
+        config = self.config
+        repeat = config["repeat"]
+        rows, cols = config["rows"], config["cols"]
+        results = {}
+
+        if "import" in cases:
+            imports = BenchmarkSuite.measure_import(repeat=max(repeat, 3))
+            self._record(results, "import", imports["wall_time"], imports["peak_rss"], 1, "imports/s")
+            if len(imports["eager"]) > 0:
+                print(f"Warning: imported eagerly: {imports['eager']}")
+
+        df = SyntheticData.generate(rows, cols, config["missing_rate"], config["categorical_share"], config["sections"],
+                                    config["task"], seed=config["seed"])
+        categorical = SyntheticData.get_categorical_columns(df)
+        header_size = 2 if config["sections"] > 1 else 1
+
+        with tempfile.TemporaryDirectory(prefix="autobiolearn_benchmark_") as directory:
+            file_path = SyntheticData.write(df, os.path.join(directory, "data.csv"))
+            del df
+
+            load = lambda: DatasetByFile(file_path=file_path, target="target", delimiter=",", header_size=header_size, cache=False)
+            dataset, wall_time, peak_rss = BenchmarkSuite.measure(load, repeat)
+            if "load" in cases:
+                self._record(results, "load", wall_time, peak_rss, rows, "rows/s")
+
+            if "load_cached" in cases:
+                cache_dir = os.path.join(directory, "cache")
+                load_cached = lambda: DatasetByFile(file_path=file_path, target="target", delimiter=",", header_size=header_size,
+                                                    cache_dir=cache_dir)
+                load_cached()
+                _, wall_time, peak_rss = BenchmarkSuite.measure(load_cached, repeat)
+                self._record(results, "load_cached", wall_time, peak_rss, rows, "rows/s")
+
+            if "load_optimized" in cases:
+                load_optimized = lambda: DatasetByFile(file_path=file_path, target="target", delimiter=",", header_size=header_size,
+                                                       cache=False, optimize_memory=True)
+                optimized, wall_time, peak_rss = BenchmarkSuite.measure(load_optimized, repeat)
+                self._record(results, "load_optimized", wall_time, peak_rss, rows, "rows/s")
+                results["load_optimized"]["memory_ratio"] = dataset.get_memory_usage()["original_data"] / optimized.get_memory_usage()["original_data"]
+                print(f"{'':<32} {results['load_optimized']['memory_ratio']:10.2f}x less memory")
+                del optimized
+
+        sections = dataset.get_sections() if dataset.get_has_many_header() else [None]
+
+        if "encode_categorical" in cases or "impute_cols_na" in cases or "execute_models" in cases:
+            _, wall_time, peak_rss = BenchmarkSuite.measure(lambda: dataset.encode_categorical(categorical))
+            if "encode_categorical" in cases:
+                self._record(results, "encode_categorical", wall_time, peak_rss, len(categorical), "columns/s")
+
+        if config["impute"] and ("impute_cols_na" in cases or "execute_models" in cases):
+            impute = lambda: [dataset.impute_cols_na(section=section) for section in sections]
+            _, wall_time, peak_rss = BenchmarkSuite.measure(impute)
+            if "impute_cols_na" in cases:
+                self._record(results, "impute_cols_na", wall_time, peak_rss, rows, "rows/s")
+
+        if "get_X" in cases:
+            _, wall_time, peak_rss = BenchmarkSuite.measure(lambda: [dataset.get_X(section) for section in sections], repeat)
+            self._record(results, "get_X", wall_time, peak_rss, rows * len(sections), "rows/s")
+
+        if not any(case in cases for case in ["execute_models", "calculate_metrics", "perform_shap_analysis"]):
+            return self._get_run(results, label)
+
+        data_processor = DataProcessor(dataset)
+        auto_bio_learn = None
+        for backend in config["backends"]:
+            auto_bio_learn = AutoBioLearnClassification() if config["task"] == "classification" else AutoBioLearnRegression()
+            auto_bio_learn.load_dataset(data_processor)
+            auto_bio_learn.set_seed(config["seed"])
+            auto_bio_learn.set_execution_backend(backend)
+
+            execute = lambda: auto_bio_learn.execute_models(models=config["models"], times_repeats=config["times_repeats"])
+            _, wall_time, peak_rss = BenchmarkSuite.measure(execute, repeat)
+            if "execute_models" in cases:
+                self._record(results, f"execute_models[{backend}]", wall_time, peak_rss, len(auto_bio_learn._models_executed), "folds/s")
+
+        if "calculate_metrics" in cases and auto_bio_learn is not None:
+            store = auto_bio_learn._models_executed
+            subset = store.get_subset(np.arange(len(store)))
+            _, wall_time, peak_rss = BenchmarkSuite.measure(lambda: auto_bio_learn._calculate_metrics(*subset), repeat)
+            self._record(results, "calculate_metrics", wall_time, peak_rss, len(store), "folds/s")
+
+        if config["shap"] and "perform_shap_analysis" in cases and auto_bio_learn is not None:
+            shap = lambda: auto_bio_learn.perform_shap_analysis(time=[0], model_name=[config["models"][0]])
+            _, wall_time, peak_rss = BenchmarkSuite.measure(shap)
+            n_models = int(auto_bio_learn._models_executed.mask(time=[0], model_name=[config["models"][0]]).sum())
+            self._record(results, "perform_shap_analysis", wall_time, peak_rss, n_models, "models/s")
+
+        return self._get_run(results, label)
+
+    def _get_run(self, results: dict, label: str)-> dict:
+        return {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "label": label,
+                "environment": BenchmarkSuite.get_environment(), "config": self.config, "results": results}
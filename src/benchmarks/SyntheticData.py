@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+class SyntheticData(object):
+    """
+    Synthetic datasets shaped like biomedical tables (few rows, many columns, missing values and coded
+    categories), used by the benchmarks. The target depends on a few informative numeric columns so
+    models have something to learn; it never has missing values.
+    """
+
+    @staticmethod
+    def generate(rows: int = 1000, cols: int = 100, missing_rate: float = 0.05, categorical_share: float = 0.1,
+                 sections: int = 1, task: str = "classification", n_categories: int = 5, target: str = "target",
+                 seed: int = 0)-> pd.DataFrame:
+        """
+        rows x cols features plus the target column. missing_rate: share of missing feature values.
+        categorical_share: share of string columns with n_categories levels. sections > 1 returns columns
+        with two header levels (section, column), the target in the last section.
+        """
+        if task not in ["classification", "regression"]:
+            raise ValueError("task only permits ['classification', 'regression']")
+
+        rng = np.random.default_rng(seed)
+        n_categorical = int(round(cols * categorical_share))
+        n_numeric = cols - n_categorical
+
+        numeric = rng.standard_normal((rows, n_numeric))
+        weights = np.zeros(n_numeric)
+        informative = rng.choice(n_numeric, size=min(n_numeric, 10), replace=False) if n_numeric > 0 else []
+        weights[informative] = rng.uniform(0.5, 1.5, size=len(informative)) * rng.choice([-1, 1], size=len(informative))
+        signal = numeric @ weights + rng.normal(0, 0.5, rows)
+        if task == "classification":
+            y = (signal > np.median(signal)).astype(np.int64)
+        else:
+            y = signal
+
+        if missing_rate > 0:
+            numeric[rng.random(numeric.shape) < missing_rate] = np.nan
+
+        data = {f"num_{n:05d}": numeric[:, n] for n in range(n_numeric)}
+
+        levels = np.array([f"level_{n}" for n in range(n_categories)], dtype=object)
+        for n in range(n_categorical):
+            values = levels[rng.integers(0, n_categories, rows)]
+            if missing_rate > 0:
+                values[rng.random(rows) < missing_rate] = None
+            data[f"cat_{n:05d}"] = values
+
+        columns = list(data.keys())
+        order = rng.permutation(len(columns))
+        df = pd.DataFrame({columns[n]: data[columns[n]] for n in order})
+        df[target] = y
+
+        if sections > 1:
+            section_names = [f"section_{n}" for n, split in enumerate(np.array_split(np.arange(len(order)), sections)) for _ in split]
+            df.columns = pd.MultiIndex.from_tuples(list(zip(section_names + [f"section_{sections - 1}"], df.columns)))
+        return df
+
+    @staticmethod
+    def get_categorical_columns(df: pd.DataFrame)-> list[str]:
+        names = df.columns.get_level_values(-1) if isinstance(df.columns, pd.MultiIndex) else df.columns
+        return [name for name in names if name.startswith("cat_")]
+
+    @staticmethod
+    def write(df: pd.DataFrame, file_path: str)-> str:
+        """
+        Writes df as CSV (two header rows when it has sections), as DatasetByFile reads it.
+        """
+        df.to_csv(file_path, index=False)
+        return file_path
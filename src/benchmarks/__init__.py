@@ -0,0 +1,3 @@
+from .SyntheticData import SyntheticData
+from .BenchmarkHistory import BenchmarkHistory
+from .BenchmarkSuite import BenchmarkSuite
@@ -0,0 +1,71 @@
+import argparse
+import sys
+
+import pandas as pd
+
+from benchmarks.BenchmarkHistory import BenchmarkHistory
+from benchmarks.BenchmarkSuite import BenchmarkSuite
+
+
+def main(args: list[str] = None)-> int:
+    """
+    python -m benchmarks run [options] | compare [--baseline N --current N --threshold T] | imports [--budget S] | list (from src)
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of AutoBioLearn on synthetic data.")
+    parser.add_argument("--history", default="benchmark_history.json", help="JSON file with the runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="runs the suite and appends the results to the history")
+    run.add_argument("--rows", type=int, default=1000)
+    run.add_argument("--cols", type=int, default=100)
+    run.add_argument("--missing-rate", type=float, default=0.05)
+    run.add_argument("--categorical-share", type=float, default=0.1)
+    run.add_argument("--sections", type=int, default=1, help="sections of a multi-header dataset (1 for a single header)")
+    run.add_argument("--task", choices=["classification", "regression"], default="classification")
+    run.add_argument("--models", nargs="+", default=["xgboost", "random_forest"])
+    run.add_argument("--backends", nargs="+", default=["serial", "thread", "process"])
+    run.add_argument("--times-repeats", type=int, default=2)
+    run.add_argument("--repeat", type=int, default=1, help="runs of each case, the best wall time is kept")
+    run.add_argument("--cases", nargs="+", choices=BenchmarkSuite.cases(), default=None)
+    run.add_argument("--no-impute", action="store_true", help="skips the KNN imputation (slow on wide data)")
+    run.add_argument("--no-shap", action="store_true")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--label", default=None, help="name of the run in the history")
+
+    compare = commands.add_parser("compare", help="compares two runs of the history")
+    compare.add_argument("--baseline", type=int, default=-2, help="index of the baseline run (default: second to last)")
+    compare.add_argument("--current", type=int, default=-1, help="index of the compared run (default: last)")
+    compare.add_argument("--threshold", type=float, default=0.1, help="relative change reported as regression or improvement")
+
+    imports = commands.add_parser("imports", help="checks the import time of the library against a budget")
+    imports.add_argument("--budget", type=float, default=2.0, help="seconds allowed to import the library (interpreter start excluded)")
+    imports.add_argument("--repeat", type=int, default=3, help="fresh interpreters timed, the best wall time is kept")
+    imports.add_argument("--modules", nargs="+", default=["AutoBioLearnClassification", "AutoBioLearnRegression"])
+
+    commands.add_parser("list", help="lists the runs of the history")
+    args = parser.parse_args(args)
+
+    history = BenchmarkHistory(args.history)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_rows", None):
+        if args.command == "run":
+            suite = BenchmarkSuite(args.rows, args.cols, args.missing_rate, args.categorical_share, args.sections, args.task, args.models,
+                                   args.backends, args.times_repeats, args.repeat, not args.no_impute, not args.no_shap, args.seed)
+            history.append(suite.run(args.cases, args.label))
+        elif args.command == "compare":
+            comparison = history.compare(args.baseline, args.current, args.threshold)
+            print(comparison.round(3).to_string(index=False))
+            return 1 if (comparison["status"] == "regression").any() else 0
+        elif args.command == "imports":
+            result = BenchmarkSuite.measure_import(args.modules, args.repeat)
+            print(pd.DataFrame(result["slowest"], columns=["module", "cumulative_s"]).round(3).to_string(index=False))
+            print(f"import {' '.join(args.modules)}: {result['wall_time']:.3f}s (budget {args.budget:.3f}s), {result['peak_rss'] / 2**20:.1f} MB")
+            if len(result["eager"]) > 0:
+                print(f"imported eagerly: {result['eager']}")
+            return 1 if result["wall_time"] > args.budget or len(result["eager"]) > 0 else 0
+        else:
+            print(history.get_runs().to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,43 @@
-from matplotlib import pyplot as plt
 import pandas as pd
 from pandas import DataFrame
-from ydata_profiling import ProfileReport
-
-from scipy import stats
-from scipy.stats.mstats import winsorize
 
 import numpy as np
 
+from decorators.DatasetDecorators import changes_data
 from helpers.DatasetHelper import DatasetHelper
 from helpers.ContentHelper import ContentHelper
 
-from sklearn.impute import KNNImputer, SimpleImputer
+# matplotlib, seaborn, ydata_profiling, scipy and sklearn.impute are imported by the methods using them,
+# so loading a dataset does not pay for plotting, profiling or imputation.
+
 
-import seaborn as sns
 class Dataset:
+    """
+    The data of a run: original data, working data and, for multi-header files, one frame per section.
+
+    The original data, the working data and the sections share their column arrays: methods changing the data
+    replace whole columns or frames instead of writing into them, so the sharing needs no copy-on-write.
+
+    Every method changing the data bumps the data version. get_X and get_Y are built once per version and
+    section (X as a read-only C-contiguous float32 or float64 matrix), repeated calls reuse them.
+    """
     
-    def __init__(self, original_data: DataFrame, target: str, verbose= False):        
-      
-        DatasetHelper.normalize_columns_name(original_data)
+    def __init__(self, original_data: DataFrame, target: str, verbose= False, optimize_memory: bool = False):        
 
-        self.__original_data = original_data.copy(deep=True)
-        self._data = original_data.copy(deep=True)      
+        self._version = 0
+        self.__features = {}
+
+        # the only deep copy: later writes of the caller to original_data do not reach the dataset
+        data = original_data.copy()
+        DatasetHelper.normalize_columns_name(data)
+
+        self.__memory_savings = Dataset._get_savings([])
+        if optimize_memory:
+            # before the original data, the working data and the sections share the columns, so all of them shrink
+            data, self.__memory_savings = Dataset._optimize_frame(data, target)
+
+        self.__original_data = data
+        self._data = Dataset._copy(data)
         self._has_many_header = isinstance(original_data.columns, pd.MultiIndex)
         self.__target = target
         self._sections = {}
@@ -50,6 +66,7 @@ class Dataset:
             #endregion
                 
     def perform_eda(self,path_to_save_report=None):
+        from ydata_profiling import ProfileReport
         profile = ProfileReport(self._data, title="Data Analysis")
         report = profile.to_html()   
         
@@ -60,15 +77,164 @@ class Dataset:
         
         return profile.to_notebook_iframe()
 
-    def _typesToX(self):
-        return ['int64', 'float64','int32']   
-    
+    @staticmethod
+    def _is_feature_dtype(dtype)-> bool:
+        """
+        Numeric (any width, nullable included), bool, and category dtypes with numeric categories (encoded values).
+        """
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtype = dtype.categories.dtype
+        return getattr(dtype, "kind", None) in ["b", "i", "u", "f"]
+
+    @staticmethod
+    def _to_feature(column: pd.Series)-> pd.Series:
+        """
+        column as a NumPy-backed series: categories by their values, nullable dtypes with missing values as float.
+        """
+        if isinstance(column.dtype, np.dtype):
+            return column
+        dtype = column.dtype.categories.dtype if isinstance(column.dtype, pd.CategoricalDtype) else column.dtype.numpy_dtype
+        if column.hasnans:
+            dtype = np.result_type(dtype, np.float32)
+        return pd.Series(column.to_numpy(dtype=dtype, na_value=np.nan) if column.hasnans else column.to_numpy(dtype=dtype),
+                         index=column.index, name=column.name)
+
+    @staticmethod
+    def _apply_dtypes(df: DataFrame, dtypes: dict)-> DataFrame:
+        """
+        df with the columns at the positions in dtypes converted, one conversion per dtype.
+        """
+        if len(dtypes) == 0:
+            return df
+        groups = {}
+        for position, dtype in dtypes.items():
+            groups.setdefault(str(dtype), (dtype, []))[1].append(position)
+        columns = [df.iloc[:, position] for position in range(df.shape[1])]
+        for dtype, positions in groups.values():
+            converted = df.iloc[:, positions].astype(dtype)
+            for n, position in enumerate(positions):
+                columns[position] = converted.iloc[:, n]
+        return Dataset._from_columns(columns, df.columns, df.index)
+
+    @staticmethod
+    def _from_columns(columns: list[pd.Series], labels: pd.Index, index: pd.Index)-> DataFrame:
+        """
+        Frame of the given columns keeping their arrays: the frame shares them instead of joining them in a copy.
+        """
+        df = pd.DataFrame(dict(enumerate(columns)), index=index, copy=False)
+        df.columns = labels
+        return df
+
+    @staticmethod
+    def _get_savings(rows: list[dict])-> DataFrame:
+        return pd.DataFrame(rows, columns=["section", "column", "dtype_before", "dtype_after", "bytes_before", "bytes_after", "bytes_saved"])
+
+    @staticmethod
+    def _optimize_frame(df: DataFrame, target: str, section: str = None, float_rtol: float = 1e-6,
+                        max_category_ratio: float = 0.5)-> tuple[DataFrame, DataFrame]:
+        """
+        (df with its columns downcast, bytes saved per column). The target keeps its type.
+        """
+        exclude = [position for position, column in enumerate(df.columns)
+                   if column == target or (isinstance(column, tuple) and target in column)]
+        dtypes = DatasetHelper.get_downcast_dtypes(df, exclude, float_rtol, max_category_ratio)
+        positions = sorted(dtypes)
+        before = df.iloc[:, positions]
+        df = Dataset._apply_dtypes(df, dtypes)
+        after = df.iloc[:, positions]
+
+        def nbytes(frame):
+            return [len(frame) * dtype.itemsize if isinstance(dtype, np.dtype) and dtype.kind != "O"
+                    else int(frame.iloc[:, n].memory_usage(index=False, deep=True)) for n, dtype in enumerate(frame.dtypes)]
+
+        bytes_before, bytes_after = nbytes(before), nbytes(after)
+        rows = [{"section": section, "column": column, "dtype_before": str(dtype_before), "dtype_after": str(dtype_after),
+                 "bytes_before": int(bytes_before[n]), "bytes_after": int(bytes_after[n]), "bytes_saved": int(bytes_before[n] - bytes_after[n])}
+                for n, (column, dtype_before, dtype_after) in enumerate(zip(before.columns, before.dtypes, after.dtypes))]
+        return df, Dataset._get_savings(rows)
+
+    @changes_data
+    def optimize_memory(self, float_rtol: float = 1e-6, max_category_ratio: float = 0.5)-> DataFrame:
+        """
+        Downcasts the working data (the sections of a multi-header dataset) to the smallest types holding the same
+        values: integers to int8/16/32, floats to float32 within float_rtol (or to integers when they hold only
+        integers) and strings with few distinct values (at most max_category_ratio per row) to category. Returns
+        the bytes saved per column, also added to get_memory_savings().
+
+        The original data keeps its types, optimize_memory=True when loading downcasts it as well.
+        """
+        if self._has_many_header and bool(self._sections):
+            savings = []
+            for section in self._sections_name:
+                self._sections[section], section_savings = Dataset._optimize_frame(self._sections[section], self.__target, section,
+                                                                                   float_rtol, max_category_ratio)
+                savings.append(section_savings)
+            savings = pd.concat(savings, ignore_index=True) if len(savings) > 0 else Dataset._get_savings([])
+        else:
+            self._data, savings = Dataset._optimize_frame(self._data, self.__target, None, float_rtol, max_category_ratio)
+
+        self.__memory_savings = pd.concat([self.__memory_savings, savings], ignore_index=True) \
+            if len(self.__memory_savings) > 0 else savings
+        return savings
+
+    def get_memory_savings(self)-> DataFrame:
+        """
+        One row per downcast column: section, column, dtype_before, dtype_after, bytes_before, bytes_after and bytes_saved.
+        """
+        return self.__memory_savings
+
+    def get_memory_usage(self)-> dict:
+        """
+        Bytes held by the original data, the working data, the sections and the feature matrices cached by get_X.
+        Columns they share are counted once, in the first of them.
+        """
+        seen = set()
+        def nbytes(df):
+            if df is None:
+                return 0
+            total = 0
+            if id(df.index) not in seen:
+                seen.add(id(df.index))
+                total += int(df.index.memory_usage(deep=True))
+            for n in range(df.shape[1]):
+                column = df.iloc[:, n]
+                if isinstance(column.dtype, np.dtype) and column.size > 0:
+                    values = column.to_numpy(copy=False)
+                    key = (values.__array_interface__["data"][0], values.strides, values.size)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                total += int(column.memory_usage(index=False, deep=True))
+            return total
+
+        return {"original_data": nbytes(self.__original_data), "data": nbytes(self._data),
+                "sections": sum(nbytes(section) for section in self._sections.values()),
+                "features": sum(int(features["values"].nbytes) for features in list(self.__features.values()) if "values" in features)}
+
+    def get_version(self)-> int:
+        """
+        Version of the data, bumped by every method changing it.
+        """
+        return self._version
+
+    def _bump_version(self):
+        self._version += 1
+        self.__features = {}
+
+    @staticmethod
+    def _copy(df: DataFrame)-> DataFrame:
+        """
+        Copy of df sharing its columns: replacing a column of one side does not change the other.
+        """
+        return df.copy(deep=False)
+
     def get_has_many_header(self)-> bool:
         return self._has_many_header
     
     def get_sections(self)-> list:
         return self._sections_name
 
+    @changes_data
     def remove_duplicates(self, use_original_data: False, section:str=None):
         if not self._has_many_header and bool(self._sections):
             if use_original_data:
@@ -103,6 +269,7 @@ class Dataset:
             self.__print_na(self._sections[section],axis=axis)              
 
     def plot_na(self, axis=1, value="percent",section:str=None):
+        from matplotlib import pyplot as plt
         df_na = pd.DataFrame
         y_label_options = {'percent':'Percent of Missing Data', 'count': 'Count of Missing Data'}
         if not self._has_many_header or not bool(self._sections):
@@ -126,18 +293,23 @@ class Dataset:
             
         return df.drop(labels=to_drop, axis=axis)
 
+    @changes_data
     def drop_na(self, axis=0, percent=30.0, show_dropped=True, section:str=None):
         if not self._has_many_header or not bool(self._sections):
            self._data = self.__drop_na(self._data, axis,percent,show_dropped)
         else:
             self._sections[section] = self.__drop_na(self._sections[section], axis,percent,show_dropped)
 
+    @changes_data
     def remove_outliers(self, method_remove= "limit_method", use_original_data= False):
         if method_remove is None:
             raise AttributeError("method_remove is not null")
+
+        from scipy import stats
+        from scipy.stats.mstats import winsorize
         
         if use_original_data:
-            self._data = self.__original_data
+            self._data = Dataset._copy(self.__original_data)
        
         for col in self.__cols_outliers:
 
@@ -158,14 +330,15 @@ class Dataset:
 
                 mean = np.mean(self._data[col])
                 df_aux= DatasetHelper.find_outliers_IQR(self._data[col]).dropna(axis=0,how='all')
-                self._data.loc[self._data[col].isin(df_aux),col] = mean
+                self._data[col] = self._data[col].mask(self._data[col].isin(df_aux), mean)
             else:
                 raise AttributeError("method_remove not exists")
    
 
+    @changes_data
     def clean_data(self,cols_to_drop:list[str] = [],cols_date:list[str] = [], try_convert_values= False, use_original_data= False):
         if use_original_data:
-            self._data = self.__original_data
+            self._data = Dataset._copy(self.__original_data)
         
         if cols_to_drop is not None and any(cols_to_drop):
             if self._has_many_header and bool(self._sections):
@@ -198,6 +371,7 @@ class Dataset:
         if try_convert_values:
             ContentHelper.try_convert_object_values(self._data)  
 
+    @changes_data
     def encode_categorical(self, cols:list[str] = [""]):
         if self._has_many_header and bool(self._sections):
             cols_filtered = [self.__find_multiindex(col) for col in cols]
@@ -207,32 +381,95 @@ class Dataset:
         else:
             ContentHelper.convert_cols_values(self._data,cols)
     
-    def get_X(self, section: str= None)->DataFrame:
+    def get_X(self, section: str= None, as_numpy: bool = False, copy: bool = True)->DataFrame:
+        """
+        Feature columns (numeric, bool and encoded categories, target excluded) of the data or of section. The
+        matrix is cached until the data changes and the frame returned is a writable copy of it. as_numpy returns
+        the cached matrix itself and copy=False a frame over it, both read-only and without a copy.
+        """
         if section is None and not self._has_many_header:
-            numeric_cols = [cname for cname in self._data.columns if self._data[cname].dtype in self._typesToX()]
-            X = self._data[numeric_cols].copy()
-        else:
-            numeric_cols = [cname for cname in self._sections[section].columns if self._sections[section][cname].dtype in self._typesToX()]
-            X = self._sections[section][numeric_cols].copy()
-        
-        if self.__target not in numeric_cols:           
-            return X 
+            return self._get_X(self._data, self.__target, section, as_numpy, copy=copy)
         else:
-            return X.drop([self.__target],axis=1,inplace=False)
+            return self._get_X(self._sections[section], self.__target, section, as_numpy, copy=copy)
+
+    def get_feature_metadata(self, section: str= None)-> dict:
+        """
+        {"version", "columns", "source_dtypes" (dtypes of the columns in the data), "dtype" (of the matrix)} of get_X(section).
+        """
+        self.get_X(section, copy=False)
+        features = self.__features[("X", section)]
+        return {key: features[key] for key in ["version", "columns", "source_dtypes", "dtype"]}
+
+    def _get_X(self, df: DataFrame, target: str, section: str = None, as_numpy: bool = False, cols: list = None,
+               copy: bool = True)-> DataFrame:
+        version = self._version
+        features = self.__features.get(("X", section))
+        if features is None or features["version"] != version:
+            dtypes = dict(zip(df.columns, df.dtypes))
+            X = df[[cname for cname in (cols if cols is not None else df.columns)
+                    if cname != target and Dataset._is_feature_dtype(dtypes[cname])]]
+            values = Dataset._get_matrix(X)
+            features = {"version": version, "columns": list(X.columns), "source_dtypes": list(X.dtypes), "dtype": values.dtype,
+                        "values": values, "X": pd.DataFrame(values, index=X.index, columns=X.columns, copy=False)}
+            if version == self._version:
+                self.__features[("X", section)] = features
+        if as_numpy:
+            return features["values"]
+        # without copy, a shallow copy: replacing its columns leaves the cache as it is, writing into them fails (read-only)
+        return features["X"].copy(deep=copy)
+
+    @staticmethod
+    def _get_matrix(X: DataFrame, block_size: int = 256)-> np.ndarray:
+        """
+        Values of X as a read-only C-contiguous matrix: float32 when every value fits it exactly (as in data
+        downcast by optimize_memory) and none is missing, float64 otherwise. Categories are converted to their values.
+        """
+        dtypes = [Dataset._to_feature(X.iloc[:, n]).dtype if not isinstance(dtype, np.dtype) else dtype
+                  for n, dtype in enumerate(X.dtypes)]
+        # columns wider than float32 are checked by value, stopping at the first block that does not fit
+        wide = [n for n, dtype in enumerate(dtypes) if (dtype.kind in ["i", "u"] and dtype.itemsize > 2) or (dtype.kind == "f" and dtype.itemsize > 4)]
+        exact = True
+        for start in range(0, len(wide), block_size):
+            block = X.iloc[:, wide[start:start + block_size]].to_numpy(dtype=np.float64, na_value=np.nan)
+            with np.errstate(over="ignore", invalid="ignore"):
+                if not ((block.astype(np.float32) == block) | np.isnan(block)).all():
+                    exact = False
+                    break
+        dtype = np.dtype(np.float32) if exact else np.dtype(np.float64)
+
+        values = np.empty((len(X), X.shape[1]), dtype=dtype)
+        for start in range(0, X.shape[1], block_size):
+            block = X.iloc[:, start:start + block_size]
+            if any(not isinstance(block_dtype, np.dtype) for block_dtype in block.dtypes):
+                block = pd.concat([Dataset._to_feature(block.iloc[:, n]) for n in range(block.shape[1])], axis=1)
+            values[:, start:start + block.shape[1]] = block.to_numpy(dtype=dtype, na_value=np.nan)
+        # scikit-learn 1.5 forests fail on read-only float32 input with missing values, float64 is copied to float32 first
+        if dtype == np.float32 and np.isnan(values).any():
+            values = values.astype(np.float64)
+        values.flags.writeable = False
+        return values
     
     def get_Y(self, section: str= None)->DataFrame:
         if self._has_many_header:
-            return self._get_Y(self._sections[section],self.__target)
+            return self._get_Y(self._sections[section],self.__target, section)
         else:   
-            return self._get_Y(self._data,self.__target)
+            return self._get_Y(self._data,self.__target, section)
     
-    def _get_Y(self, df,target)->DataFrame:
-        if df[target].dtype not in self._typesToX():
+    def _get_Y(self, df,target, section: str = None)->DataFrame:
+        if not Dataset._is_feature_dtype(df[target].dtype):
             ContentHelper.convert_cols_values(df,[target])
-            
-        return df[target]
+            self._bump_version()
+
+        version = self._version
+        features = self.__features.get(("Y", section))
+        if features is None or features["version"] != version:
+            features = {"version": version, "Y": Dataset._to_feature(df[target])}
+            if version == self._version:
+                self.__features[("Y", section)] = features
+        return features["Y"]
     
     def __impute_cols_na(self, df ,method="knn", n_neighbors=5):
+        from sklearn.impute import KNNImputer, SimpleImputer
         if method == "knn":
             imputer = KNNImputer(n_neighbors=n_neighbors)            
         else:
@@ -243,12 +480,14 @@ class Dataset:
         df_return.index = df.index
         return df_return
 
+    @changes_data
     def impute_cols_na(self, method="knn", n_neighbors=5, section: str=None):
         if not self._has_many_header or not bool(self._sections):
             self._data=self.__impute_cols_na(self._data, method, n_neighbors) 
         else:
             self._sections[section]=self.__impute_cols_na(self._sections[section], method, n_neighbors) 
 
+    @changes_data
     def drop_section(self,sections: list[str]):
         for section in sections:
             del self._sections[section]
@@ -262,30 +501,45 @@ class Dataset:
 
     def _set_sections(self): 
         if self._has_many_header:
-            mi_target = np.array(self.__find_multiindex(self.__target))        
-            
-            for col in self._data.columns.get_level_values(0).unique():
-                if col in mi_target:
-                    cols_to_filter = self._data.columns[self._data.columns.get_level_values(0) == col].values.tolist()
-                else:
-                    cols_to_filter = self._data.columns[self._data.columns.get_level_values(0) == col].values.tolist()+[mi_target]
-                
-                self._sections[col]=self._data[cols_to_filter].droplevel(0,1)
+            mi_target = self.__find_multiindex(self.__target)
+            target_position = self._data.columns.get_loc(mi_target)
+            sections = self._data.columns.get_level_values(0)
+
+            for col in sections.unique():
+                positions = np.flatnonzero(sections == col)
+                if col not in mi_target:
+                    positions = np.append(positions, target_position)
+
+                section = self.__get_columns(positions)
+                # set in place: droplevel would copy the columns
+                section.columns = section.columns.droplevel(0)
+                self._sections[col]=section
                 self._sections_name.append(col)
 
+    def __get_columns(self, positions: np.ndarray)-> DataFrame:
+        """
+        Columns of _data at positions, sharing their arrays with _data instead of copying them.
+        """
+        return Dataset._from_columns([self._data.iloc[:, position] for position in positions], self._data.columns[positions],
+                                     self._data.index)
+
     
     def plot_heatmap(self, show_values = False, remove_repetead_value = False, fig_size= (0,0), section:str=None):
+        from matplotlib import pyplot as plt
+        import seaborn as sns
         if remove_repetead_value:
             self.__generate_data_heatmap_custom(show_values=show_values,fig_size=fig_size,section=section)
         else:
             if fig_size != (0,0):
                 _, ax = plt.subplots(figsize=fig_size)
-                sns.heatmap(self.get_X(section).corr(), ax= ax,vmin=-1, vmax=1, annot=show_values,  linewidths=.5, fmt=".2f")
+                sns.heatmap(self.get_X(section, copy=False).corr(), ax= ax,vmin=-1, vmax=1, annot=show_values,  linewidths=.5, fmt=".2f")
             else:
-                sns.heatmap(self.get_X(section).corr(), vmin=-1, vmax=1, annot=show_values,  linewidths=.5, fmt=".2f")
+                sns.heatmap(self.get_X(section, copy=False).corr(), vmin=-1, vmax=1, annot=show_values,  linewidths=.5, fmt=".2f")
     
     def __generate_data_heatmap_custom(self, show_values = False, fig_size= (0,0),section:str=None):
-        X_corr = self.get_X(section).corr()
+        from matplotlib import pyplot as plt
+        import seaborn as sns
+        X_corr = self.get_X(section, copy=False).corr()
         mask = np.triu(X_corr)
         if fig_size != (0,0):
             _, ax = plt.subplots(figsize=fig_size)
@@ -299,6 +553,7 @@ class Dataset:
                 vmin=-1, vmax=1)
       
     def plot_pairplot(self, cols:list[str] = None, height=2.5,section:str = None):
+        import seaborn as sns
         
         if section is not None:
             df = self._sections[section]
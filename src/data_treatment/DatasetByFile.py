@@ -2,24 +2,159 @@ import os
 import pandas as pd
 from pandas import DataFrame
 from data_treatment.Dataset import Dataset
+from data_treatment.DatasetCache import DatasetCache
 
 class DatasetByFile(Dataset):
-    def __init__(self, file_path:str, target: str, delimiter: None, verbose=False, header_size=1):
+    """
+    Dataset read from Excel (.xls, .xlsx), OpenDocument (.odf, .ods, .odt), CSV/TXT (also compressed: .gz, .bz2, .zip,
+    .xz, .zst), Parquet (.parquet, .pq) or Feather/Arrow IPC (.feather, .arrow, .ipc) files.
+
+    header_size: header rows of text and spreadsheet files (columnar files keep their own header).
+    usecols: columns (names of the last header level) and/or sections (names of the first level) to read, the
+    target is always read. sections: sections to read from a multi-header file. dtype: {column: dtype} applied
+    while parsing. engine: CSV parser, "pyarrow" (multithreaded) by default when pyarrow is installed and the file
+    has a single header row, "c" otherwise.
+
+    cache: text and spreadsheet files are parsed once, the frame is kept in a DatasetCache (in cache_dir, the user
+    cache dir when None) and read from it while the file and the options do not change. Off by default, so no copy
+    of the data is written to disk unless asked: cache=None enables it only when cache_dir is given. optimize_memory:
+    downcasts the columns after reading (see Dataset.optimize_memory), the cache keeps the parsed types.
+    """
+
+    def __init__(self, file_path:str, target: str, delimiter: None, verbose=False, header_size=1,
+                 usecols: list[str] = None, sections: list[str] = None, dtype: dict = None, engine: str = None,
+                 cache: bool = None, cache_dir: str = None, optimize_memory: bool = False):
         df: DataFrame
 
-        header = [i for i in range(header_size)]
+        selection = None if usecols is None and sections is None else list(usecols or []) + list(sections or [])
+
+        file_format, _ = DatasetByFile.get_format(file_path)
+        read = lambda: DatasetByFile._read(file_path, file_format, target, delimiter, header_size, selection, dtype, engine)
 
-        file_extension = os.path.splitext(file_path)[1]
+        if cache is None:
+            cache = cache_dir is not None
 
-        if file_extension in [".xls",".xlsx"]:
-            df = pd.read_excel(file_path, header=header)
-        elif file_extension == ".csv":
-            df = pd.read_csv(file_path,delimiter= delimiter, header=header)
-        elif file_extension == ".txt":
-            df = pd.read_csv(file_path, sep=delimiter, header=header)
-        elif file_extension in [".odf", ".ods", ".odt"]:
-            df = pd.read_excel(file_path, header=header,engine="odf")
+        if cache and file_format not in ["parquet", "feather", None]:
+            options = {"target": target, "delimiter": delimiter, "header_size": header_size, "selection": selection, "dtype": dtype}
+            df = DatasetCache(cache_dir).get_or_read(file_path, options, read)
+        else:
+            df = read()
+
+        super().__init__(df, target,verbose, optimize_memory)
+
+    @staticmethod
+    def _read(file_path: str, file_format: str, target: str, delimiter: str, header_size: int, selection: list[str],
+              dtype: dict, engine: str)-> DataFrame:
+        header = [i for i in range(header_size)]
+
+        if file_format in ["parquet", "feather"]:
+            df = DatasetByFile._read_columnar(file_path, file_format, target, selection, dtype)
+        elif file_format in ["excel", "odf"]:
+            engine_excel = "odf" if file_format == "odf" else None
+            if selection is not None and header_size == 1:
+                columns = pd.read_excel(file_path, header=header, engine=engine_excel, nrows=0).columns
+                df = pd.read_excel(file_path, header=header, engine=engine_excel, dtype=dtype,
+                                   usecols=DatasetByFile.get_column_positions(columns, target, selection))
+            else:
+                df = pd.read_excel(file_path, header=header, engine=engine_excel, dtype=dtype)
+                if selection is not None:
+                    df = df.iloc[:, DatasetByFile.get_column_positions(df.columns, target, selection)]
+        elif file_format in ["csv", "txt"]:
+            df = DatasetByFile._read_text(file_path, file_format, delimiter, header, target, selection, dtype, engine)
         else:
             raise TypeError("Not support to this extesion")
+        return df
+
+    @staticmethod
+    def compressions()-> dict:
+        return {".gz": "gzip", ".bz2": "bz2", ".zip": "zip", ".xz": "xz", ".zst": "zstd"}
+
+    @staticmethod
+    def get_format(file_path: str)-> tuple[str, str]:
+        """
+        (format, compression) of a file from its extensions, e.g. "data.csv.gz" -> ("csv", "gzip").
+        """
+        root, file_extension = os.path.splitext(file_path.lower())
+        compression = DatasetByFile.compressions().get(file_extension)
+        if compression is not None:
+            file_extension = os.path.splitext(root)[1]
+
+        formats = {".xls": "excel", ".xlsx": "excel", ".odf": "odf", ".ods": "odf", ".odt": "odf", ".csv": "csv", ".txt": "txt",
+                   ".parquet": "parquet", ".pq": "parquet", ".feather": "feather", ".arrow": "feather", ".ipc": "feather"}
+        return formats.get(file_extension), compression
+
+    @staticmethod
+    def has_pyarrow()-> bool:
+        try:
+            import pyarrow
+            return True
+        except ImportError:
+            return False
+
+    @staticmethod
+    def get_column_positions(columns: pd.Index, target: str, selection: list[str])-> list[int]:
+        """
+        Positions of the columns matching selection (at any header level) and of the target.
+        """
+        wanted = set(selection) | {target}
+        positions = []
+        for position, column in enumerate(columns):
+            levels = column if isinstance(column, tuple) else (column,)
+            if any(str(level) in wanted for level in levels):
+                positions.append(position)
+
+        names = {str(level) for column in columns for level in (column if isinstance(column, tuple) else (column,))}
+        missing = [name for name in selection if name not in names]
+        if len(missing) > 0:
+            raise KeyError(f"Columns or sections not found: {missing}")
+        return positions
+
+    @staticmethod
+    def _read_text(file_path: str, file_format: str, delimiter: str, header: list[int], target: str, selection: list[str],
+                   dtype: dict, engine: str)-> DataFrame:
+        if delimiter is None:
+            # CSV files default to commas, the separator of TXT files is sniffed (only the python parser does it)
+            if file_format == "csv":
+                delimiter = ","
+            else:
+                engine = "python"
+        if engine is None:
+            engine = "pyarrow" if len(header) == 1 and DatasetByFile.has_pyarrow() else "c"
+
+        if selection is None:
+            return pd.read_csv(file_path, sep=delimiter, header=header[0] if len(header) == 1 else header, dtype=dtype, engine=engine)
+
+        columns = pd.read_csv(file_path, sep=delimiter, header=header, nrows=0, engine="python" if delimiter is None else "c").columns
+        usecols = DatasetByFile.get_column_positions(columns, target, selection)
+        if len(header) == 1:
+            return pd.read_csv(file_path, sep=delimiter, header=0, usecols=usecols, dtype=dtype, engine=engine)
+
+        # pandas does not select columns under a multi-row header: the rows after the header are read by position
+        # and the header levels of the selected columns are set back
+        if dtype is not None:
+            dtype = {position: dtype[columns[position][-1]] for position in usecols if columns[position][-1] in dtype}
+        df = pd.read_csv(file_path, sep=delimiter, header=None, skiprows=len(header), usecols=usecols, dtype=dtype, engine=engine)
+        df.columns = columns[usecols]
+        return df
+
+    @staticmethod
+    def _read_columnar(file_path: str, file_format: str, target: str, selection: list[str], dtype: dict)-> DataFrame:
+        read = pd.read_parquet if file_format == "parquet" else pd.read_feather
+        columns = None
+        if selection is not None and DatasetByFile.has_pyarrow():
+            if file_format == "parquet":
+                import pyarrow.parquet as pq
+                names = pq.read_schema(file_path).names
+            else:
+                import pyarrow.ipc as ipc
+                names = ipc.open_file(file_path).schema.names
+            # columns with several header levels are stored as "('section', 'column')", they are selected after reading
+            if not any(name.startswith("(") for name in names):
+                columns = [names[position] for position in DatasetByFile.get_column_positions(pd.Index(names), target, selection)]
 
-        super().__init__(df, target,verbose)
\ No newline at end of file
+        df = read(file_path, columns=columns)
+        if selection is not None and columns is None:
+            df = df.iloc[:, DatasetByFile.get_column_positions(df.columns, target, selection)]
+        if dtype is not None:
+            df = df.astype(dtype)
+        return df
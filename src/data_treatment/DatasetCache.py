@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import pickle
+import stat
+import time
+import uuid
+import warnings
+
+import pandas as pd
+from pandas import DataFrame
+
+
+class DatasetCache(object):
+    """
+    On-disk cache of the frames parsed by DatasetByFile. An entry is keyed by the source file (absolute path,
+    size, modification time and a hash of its content) and the read options, and holds the parsed frame
+    (dtypes and multi-row header included) as a pickle, which loads at disk speed. Entries whose source
+    changed are never matched and are evicted with the least recently used ones when the cache exceeds
+    max_bytes or max_entries.
+
+    Loading a pickle runs code of whoever wrote it, so the directory is created private to the user (0700), entries
+    are written 0600 and nothing is read from or written to a directory or entry other users can write: the cache
+    is then disabled with a warning.
+
+    path: cache directory (datasets in the user cache dir when None).
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = 10 * 2**30, max_entries: int = None):
+        if path is None:
+            cache_dir = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+            path = os.path.join(cache_dir, "autobiolearn", "datasets")
+        os.makedirs(path, mode=0o700, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = DatasetCache.is_private(path)
+        if not self.enabled:
+            warnings.warn(f"Dataset cache disabled: {path} is not owned by the user or is writable by other users.")
+
+    @staticmethod
+    def is_private(path: str)-> bool:
+        """
+        Whether path is owned by the user and not writable by the group or other users.
+        """
+        path_stat = os.stat(path)
+        owned = not hasattr(os, "getuid") or path_stat.st_uid == os.getuid()
+        return owned and not path_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    @staticmethod
+    def get_file_hash(file_path: str, block_size: int = 2**20, max_blocks: int = 64)-> str:
+        """
+        Hash of the file content: whole files up to max_blocks blocks, otherwise max_blocks blocks spread over the file.
+        """
+        size = os.path.getsize(file_path)
+        file_hash = hashlib.blake2b(str(size).encode(), digest_size=20)
+        with open(file_path, "rb") as file:
+            if size <= block_size * max_blocks:
+                for block in iter(lambda: file.read(block_size), b""):
+                    file_hash.update(block)
+            else:
+                step = (size - block_size) // (max_blocks - 1)
+                for n in range(max_blocks):
+                    file.seek(n * step)
+                    file_hash.update(file.read(block_size))
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def get_key(file_path: str, options: dict)-> str:
+        stat = os.stat(file_path)
+        content = json.dumps({"path": os.path.abspath(file_path), "size": stat.st_size, "mtime": stat.st_mtime_ns,
+                              "hash": DatasetCache.get_file_hash(file_path), "options": options}, sort_keys=True, default=str)
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def _get_entry_path(self, key: str)-> str:
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def load(self, key: str)-> DataFrame:
+        """
+        Frame of key, None when it is not cached.
+        """
+        entry_path = self._get_entry_path(key)
+        try:
+            if not self.enabled or not DatasetCache.is_private(entry_path):
+                return None
+            with open(entry_path, "rb") as file:
+                df = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(entry_path)
+        return df
+
+    def save(self, key: str, df: DataFrame):
+        if not self.enabled:
+            return
+        entry_path = self._get_entry_path(key)
+        temp_path = os.path.join(self.path, f".{key}.{uuid.uuid4().hex}.tmp")
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as file:
+            pickle.dump(df, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, entry_path)
+        self.evict(keep=key)
+
+    def get_or_read(self, file_path: str, options: dict, read)-> DataFrame:
+        """
+        Cached frame of file_path read with options, calling read() and caching its result on a miss.
+        """
+        key = DatasetCache.get_key(file_path, options)
+        df = self.load(key)
+        if df is None:
+            df = read()
+            self.save(key, df)
+        return df
+
+    def get_entries(self)-> pd.DataFrame:
+        """
+        One row per entry: key, bytes and last_used (timestamp), least recently used first.
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    continue
+                entries.append({"key": name[:-len(".pkl")], "bytes": stat.st_size, "last_used": stat.st_mtime})
+        return pd.DataFrame(entries, columns=["key", "bytes", "last_used"]).sort_values("last_used", kind="stable").reset_index(drop=True)
+
+    def evict(self, keep: str = None):
+        """
+        Removes the least recently used entries (except keep) until the cache fits in max_bytes and max_entries,
+        and temporary files left by interrupted writes.
+        """
+        for name in os.listdir(self.path):
+            temp_path = os.path.join(self.path, name)
+            if name.endswith(".tmp") and time.time() - os.path.getmtime(temp_path) > 3600:
+                os.remove(temp_path)
+
+        entries = self.get_entries()
+        total, count = int(entries["bytes"].sum()), len(entries)
+        for entry in entries.itertuples():
+            if total <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+                break
+            if entry.key == keep:
+                continue
+            try:
+                os.remove(self._get_entry_path(entry.key))
+            except FileNotFoundError:
+                pass
+            total -= entry.bytes
+            count -= 1
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if name.endswith(".pkl") or name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
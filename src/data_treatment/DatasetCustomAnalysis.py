@@ -1,6 +1,7 @@
 from typing import overload
 from pandas import DataFrame
 from data_treatment.Dataset import Dataset
+from decorators.DatasetDecorators import changes_data
 
 
 class DatasetCustomAnalysis(Dataset):
@@ -10,25 +11,20 @@ class DatasetCustomAnalysis(Dataset):
         self._has_many_header = len(self._sections_name) > 0
         self.__groups = groups
     
-    def get_X(self, section:str= None)->DataFrame:
+    def get_X(self, section:str= None, as_numpy: bool = False, copy: bool = True)->DataFrame:
         cols_names =self.__groups[section]["x_cols_names"]
-       
-        numeric_cols = [cname for cname in cols_names if self._data[cname].dtype in self._typesToX()]
-        X = self._data[numeric_cols].copy()
         target = self.__groups[section]["y_col_name"]
 
-        if target not in numeric_cols:           
-            return X 
-        else:
-            return X.drop([target],axis=1,inplace=False)
+        return self._get_X(self._data, target, section, as_numpy, cols_names, copy)
         
     
     def _set_sections(self):
         pass
 
     def get_Y(self, section:str = None)-> DataFrame:
-        return self._get_Y(self._data,self.__groups[section]["y_col_name"])
+        return self._get_Y(self._data,self.__groups[section]["y_col_name"], section)
     
+    @changes_data
     def drop_section(self,sections: list[str]):
         for section in sections:
             del self.__groups[section]
@@ -1,4 +1,5 @@
 from .Dataset import Dataset
+from .DatasetCache import DatasetCache
 from .DatasetByFile import DatasetByFile
 from .DatasetByWeb import DatasetByWeb
 from .DataProcessor import DataProcessor
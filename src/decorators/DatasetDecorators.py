@@ -1,7 +1,14 @@
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import wraps
 import pandas as pd
 
 def requires_dataset(func):
+    @wraps(func)
     def wrapper(self, *args, **kwargs):
         dataset = getattr(self, 'dataset', None) or getattr(getattr(self, 'data_processor', None), 'dataset', None)        
         if dataset is None:
@@ -11,6 +18,34 @@ def requires_dataset(func):
 
 
 
+def track_memory(method):
+    """
+    Records the memory of the call in the instance MemoryMonitor (set_memory_tracking).
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        monitor = getattr(self, "_memory_monitor", None)
+        if monitor is None or not monitor.enabled:
+            return method(self, *args, **kwargs)
+        with monitor.measure(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def changes_data(method):
+    """
+    Marks a Dataset method changing the data: the data version is bumped after the call (also when it fails
+    halfway), so the feature matrices cached for the previous version are rebuilt.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._bump_version()
+    return wrapper
+
+
 def apply_per_section(method):
     @wraps(method)
     def wrapper(self, df: pd.DataFrame, *args, **kwargs):
@@ -29,15 +64,110 @@ def apply_per_section(method):
             return method(self, df, *args, **kwargs)
     return wrapper
 
-def apply_per_grouping(method):
+class SectionOutput(object):
+    """
+    Thread-keyed stand-in for sys.stdout while sections run in parallel: what a section thread prints
+    inside capture() is kept in its own buffer, every other thread writes straight to the original stream.
+    One instance is shared by all the parallel runs of the process (install / uninstall count them), so
+    concurrent runs neither wrap each other nor restore a stale stream.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._buffers = {}
+        self._users = 0
+
+    @staticmethod
+    def install()-> "SectionOutput":
+        with SectionOutput._lock:
+            output = sys.stdout if isinstance(sys.stdout, SectionOutput) else SectionOutput(sys.stdout)
+            output._users += 1
+            sys.stdout = output
+            return output
+
+    def uninstall(self):
+        with SectionOutput._lock:
+            self._users -= 1
+            # leaves sys.stdout alone when someone else replaced it meanwhile
+            if self._users == 0 and sys.stdout is self:
+                sys.stdout = self.stream
+
+    @contextmanager
+    def capture(self):
+        thread = threading.get_ident()
+        self._buffers[thread] = io.StringIO()
+        try:
+            yield self._buffers[thread]
+        finally:
+            del self._buffers[thread]
+
+    def _target(self):
+        return self._buffers.get(threading.get_ident(), self.stream)
+
+    def write(self, text: str)-> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _run_sections_parallel(method, self, sections: list, max_workers: int, *args, **kwargs)-> list:
+    output = SectionOutput.install()
+
+    def run_section(section):
+        with output.capture() as buffer:
+            try:
+                return method(self, *args, **kwargs, section=section), None, buffer.getvalue()
+            except Exception as ex:
+                return None, ex, buffer.getvalue()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            runs = list(executor.map(run_section, sections))
+    finally:
+        output.uninstall()
+
+    for section, (_, _, text) in zip(sections, runs):
+        print(section)
+        sys.stdout.write(text)
+    for _, ex, _ in runs:
+        if ex is not None:
+            raise ex
+    return [result for result, _, _ in runs]
+
+
+def apply_per_grouping(method=None, parallel_safe: bool = True):
+    """
+    Runs the method once per section of a multi-header dataset and returns {section: result}.
+    With set_parallel_sections the sections of parallel_safe methods run at the same time (their tasks
+    share the resource scheduler); the output of each section is printed after all of them finish and
+    results are merged in section order. Plots and methods changing the dataset always run in sequence.
+    """
+    if method is None:
+        return lambda method: apply_per_grouping(method, parallel_safe)
+
     @wraps(method)
     def wrapper(self, *args, **kwargs):        
         if self.data_processor.dataset.get_has_many_header():
             if "section" not in kwargs:
-                results = {}             
-                for section in self.data_processor.dataset.get_sections():
-                    print(section)
-                    result = method(self, *args, **kwargs, section=section)
+                results = {}
+                sections = list(self.data_processor.dataset.get_sections())
+                if parallel_safe and getattr(self, "_parallel_sections", False) and len(sections) > 1:
+                    scheduler = getattr(self, "_resource_scheduler", None)
+                    cores = scheduler.cores if scheduler is not None else (os.cpu_count() or 1)
+                    max_workers = getattr(self, "_parallel_sections_workers", None) or min(len(sections), cores)
+                    section_results = _run_sections_parallel(method, self, sections, max_workers, *args, **kwargs)
+                else:
+                    section_results = []
+                    for section in sections:
+                        print(section)
+                        section_results.append(method(self, *args, **kwargs, section=section))
+                for section, result in zip(sections, section_results):
                     if result is not None:
                         results[section] = result
                 if len(results.keys()) > 0:
@@ -47,4 +177,4 @@ def apply_per_grouping(method):
             else:
                 print(kwargs["section"]) 
         return method(self, *args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
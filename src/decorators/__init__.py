@@ -1 +1 @@
-from .DatasetDecorators import apply_per_grouping, apply_per_section, requires_dataset
\ No newline at end of file
+from .DatasetDecorators import apply_per_grouping, apply_per_section, changes_data, requires_dataset, track_memory
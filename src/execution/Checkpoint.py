@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import joblib
+import numpy as np
+
+
+class Checkpoint(object):
+    """
+    Directory where every finished task of execute_models is committed atomically (written to a
+    temporary file and renamed), so an interrupted run can be resumed. Records are grouped by the
+    run fingerprint (split plan and feature matrix), a re-run with the same plan reads the finished
+    tasks back and only executes the missing ones. Plans built from a drawn seed are kept in the directory
+    too (split_plans), so a run without set_seed resumes in a new process.
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        self.path = os.path.join(path, fingerprint)
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def get_fingerprint(split_plan, x_hash: str, model_type: str)-> str:
+        content = json.dumps({"split_plan": split_plan.fingerprint,
+                              "x": x_hash,
+                              "model_type": model_type}, default=str)
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    @staticmethod
+    def get_split_plan_path(path: str, plan_key: str, x_hash: str)-> str:
+        """
+        File of the split plan of a run without a seed: plan_key is the plan fingerprint without the seed.
+        """
+        return os.path.join(path, "split_plans", f"{Checkpoint.get_key(plan_key, x_hash)}.npz")
+
+    @staticmethod
+    def save_split_plan(path: str, split_plan):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = os.path.join(os.path.dirname(path), f".{uuid.uuid4().hex}.tmp.npz")
+        split_plan.save(temp_path)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def get_key(*keys)-> str:
+        return hashlib.sha1(json.dumps(keys, default=str, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def get_search_key(task: dict, section: str)-> str:
+        return Checkpoint.get_key("search", section, task["model_name"], task["param_grid"],
+                                  getattr(task["param_sel_obj"], "__name__", None), task["num_folds"], task["metric"], task.get("budget"))
+
+    @staticmethod
+    def get_fold_key(task: dict)-> str:
+        return Checkpoint.get_key("fold", task["section"], task["model_name"], task["time"], task["validation"],
+                                  task["fold"], task["balancing"], task["best_params"])
+
+    def _get_path(self, key: str, extension: str = "joblib")-> str:
+        return os.path.join(self.path, f"{key}.{extension}")
+
+    def _write(self, path: str, value):
+        temp_path = os.path.join(self.path, f".{uuid.uuid4().hex}.tmp")
+        joblib.dump(value, temp_path)
+        os.replace(temp_path, path)
+
+    def has(self, key: str)-> bool:
+        return os.path.exists(self._get_path(key))
+
+    def load(self, key: str)-> dict:
+        """
+        Returns the record of key or None when the task has no (readable) record.
+        """
+        try:
+            return joblib.load(self._get_path(key))
+        except Exception:
+            return None
+
+    def save_search(self, key: str, best_params: dict, elapsed: float, history: list[dict] = None):
+        self._write(self._get_path(key), {"best_params": best_params, "elapsed": elapsed, "history": history})
+
+    def save_fold(self, key: str, task: dict, result: dict, test_index: np.ndarray, best_params: dict, model_store=None, save_model: bool = True):
+        """
+        Commits a finished fold task. The model artifact is written before the record, so a record is never
+        visible without its model. Models already spilled to model_store are copied from its file.
+        """
+        model = result["model"]
+        model_path = None
+        if save_model and model is not None:
+            model_path = self._get_path(key, "model.joblib")
+            temp_path = os.path.join(self.path, f".{uuid.uuid4().hex}.tmp")
+            if isinstance(model, str) and model_store is not None:
+                shutil.copyfile(os.path.join(model_store.path, model), temp_path)
+            else:
+                joblib.dump(model, temp_path, compress=3)
+            os.replace(temp_path, model_path)
+
+        self._write(self._get_path(key), {"model_name": task["model_name"],
+                                          "section": task["section"],
+                                          "time": task["time"],
+                                          "validation": task["validation"],
+                                          "fold": task["fold"],
+                                          "best_params": best_params,
+                                          "y_pred": np.asarray(result["y_pred"]),
+                                          "y_proba": None if result["y_proba"] is None else np.asarray(result["y_proba"]),
+                                          "x_test_index": np.asarray(test_index),
+                                          "elapsed": result.get("elapsed"),
+                                          "has_model": model_path is not None})
+
+    def load_model(self, key: str, model_store=None):
+        """
+        Model artifact of a fold record. With a model_store the artifact is copied into it and its handle is returned.
+        """
+        model_path = self._get_path(key, "model.joblib")
+        if not os.path.exists(model_path):
+            return None
+        if model_store is not None:
+            return model_store.import_file(model_path, f"checkpoint_{key[:12]}")
+        return joblib.load(model_path)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
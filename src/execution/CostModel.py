@@ -0,0 +1,124 @@
+import json
+import math
+import os
+import threading
+import uuid
+
+import numpy as np
+
+from execution.HyperparamStore import HyperparamStore
+
+
+class CostModel(object):
+    """
+    Runtime estimator of tasks, used to start the longest tasks first. A prior complexity per model
+    (rows x features, rows^2 x features for SVMs) is calibrated on past task timings: the log ratio
+    between observed and prior time is averaged per (model, kind) and shrunk to the overall ratio,
+    so models never seen keep the prior scaled by what was observed for the others.
+
+    path: JSON file the observations are loaded from on creation and saved to by save, so the
+    estimates of a session start from the timings of the previous ones (not persisted when None).
+    """
+
+    def __init__(self, max_observations: int = 10000, path: str = None):
+        self.max_observations = max_observations
+        self.path = path
+        self._observations = []
+        self._ratios = None
+        self._changed = False
+        self._lock = threading.Lock()
+        if path is not None:
+            self.load()
+
+    @staticmethod
+    def get_default_path()-> str:
+        return os.path.join(HyperparamStore.get_cache_dir(), "cost_model.json")
+
+    def load(self):
+        """
+        Reads the observations saved in path, a missing or unreadable file leaves the model empty.
+        """
+        try:
+            with open(self.path) as file:
+                observations = json.load(file)["observations"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        with self._lock:
+            self._observations = [(str(model_name), str(kind), int(rows), int(features), float(elapsed))
+                                  for model_name, kind, rows, features, elapsed in observations
+                                  if float(elapsed) > 0][-self.max_observations:]
+            self._ratios = None
+            self._changed = False
+
+    def save(self):
+        """
+        Writes the observations to path when new ones were recorded. The timings are only a hint for
+        scheduling, so a file that cannot be written is skipped.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._changed:
+                return
+            observations = list(self._observations)
+            self._changed = False
+
+        temp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if os.path.dirname(self.path) != "":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w") as file:
+                json.dump({"observations": observations}, file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def get_prior(model_name: str, rows: int, features: int)-> float:
+        rows = max(1, rows)
+        features = max(1, features)
+        if model_name == "svm":
+            return 1e-9 * rows * rows * features
+        factors = {"logistic_regression": 1e-7, "random_forest": 2e-8 * math.log2(rows + 1), "xgboost": 1e-7,
+                   "lightboost": 5e-8, "catboost": 1e-6}
+        return factors.get(model_name, 1e-7) * rows * features
+
+    def observe(self, model_name: str, kind: str, rows: int, features: int, elapsed: float, weight: float = 1):
+        """
+        Records the time of a finished task. weight is the number of fits of the task (searches run many).
+        """
+        if elapsed is None or elapsed <= 0:
+            return
+        with self._lock:
+            self._observations.append((model_name, kind, rows, features, elapsed / max(1, weight)))
+            if len(self._observations) > self.max_observations:
+                self._observations.pop(0)
+            self._ratios = None
+            self._changed = True
+
+    def _fit(self)-> dict:
+        if self._ratios is None:
+            groups = {}
+            for model_name, kind, rows, features, elapsed in self._observations:
+                groups.setdefault((model_name, kind), []).append(math.log(elapsed / CostModel.get_prior(model_name, rows, features)))
+
+            residuals = [residual for values in groups.values() for residual in values]
+            overall = float(np.mean(residuals)) if len(residuals) > 0 else 0.0
+            self._ratios = {"overall": overall}
+            for key, values in groups.items():
+                self._ratios[key] = (sum(values) + overall) / (len(values) + 1)
+        return self._ratios
+
+    def predict(self, model_name: str, kind: str, rows: int, features: int, weight: float = 1)-> float:
+        """
+        Estimated seconds of a task.
+        """
+        with self._lock:
+            ratios = self._fit()
+            ratio = ratios.get((model_name, kind), ratios["overall"])
+        return CostModel.get_prior(model_name, rows, features) * math.exp(ratio) * max(1, weight)
+
+    def get_observations(self)-> list[tuple]:
+        with self._lock:
+            return list(self._observations)
@@ -0,0 +1,225 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from execution.FoldTask import FoldTask
+from execution.ResourceScheduler import ResourceScheduler
+from execution.WorkQueue import WorkQueue
+
+
+class TaskTimeoutError(TimeoutError):
+    pass
+
+
+class ExecutionBackend(object):
+
+    def __init__(self, backend: str = "thread", max_workers: int = None, scheduler: ResourceScheduler = None, path: str = None,
+                 poll_interval: float = 0.5):
+        if backend not in ExecutionBackend.backends():
+            raise ValueError(f"backend only permits {ExecutionBackend.backends()}")
+        if backend == "queue" and path is None:
+            raise ValueError("the queue backend requires the path of a directory shared with the workers")
+
+        self.backend = backend
+        self.max_workers = max_workers
+        self.scheduler = scheduler if scheduler is not None else ResourceScheduler()
+        self.path = path
+        self.poll_interval = poll_interval
+
+    @staticmethod
+    def backends()-> list[str]:
+        return ["thread", "process", "serial", "queue"]
+
+    def start(self, shared: dict):
+        """
+        Opens a session where tasks can be run. shared is the data every task reads
+        (feature matrix and target), it is sent once per worker in the process backend.
+        """
+        return ExecutionSession(self, shared)
+
+
+class ExecutionSession(object):
+    """
+    Runs tasks under the resource scheduler. task["timeout"] (seconds) limits a task: in the process
+    backend the workers of the pool are killed, whether the task started or still waits in the pool, and
+    the other tasks of the pool are resubmitted to a new one; in the thread backend the fit cannot be
+    interrupted, so the task is reported as timed out and its result is discarded, but its cores and
+    memory stay held in the scheduler until its thread returns; in the serial backend it is reported
+    after it finishes.
+
+    In the queue backend tasks are written to a WorkQueue on a shared directory and run by workers on
+    other nodes, which set n_threads and enforce timeouts themselves; the local scheduler is not used.
+    """
+
+    def __init__(self, backend: ExecutionBackend, shared: dict):
+        self._backend = backend
+        self._shared = shared
+        self._executor = None
+        self._next_task_id = 0
+        self._queue = None
+        self._queue_session = None
+        self._queue_futures = {}
+        self._queue_stop = threading.Event()
+        self._queue_poller = None
+
+    def _get_max_workers(self)-> int:
+        max_workers = self._backend.scheduler.cores
+        if self._backend.max_workers is not None:
+            max_workers = min(max_workers, self._backend.max_workers)
+        return max_workers
+
+    def _create_executor(self):
+        if self._backend.backend == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self._get_max_workers(),
+                                                 initializer=FoldTask.init_worker,
+                                                 initargs=(self._shared,))
+        elif self._backend.backend == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self._get_max_workers())
+        elif self._backend.backend == "queue":
+            # models come back in the results, the model store of the driver may not be reachable from the workers
+            self._queue = WorkQueue(self._backend.path)
+            self._queue_session = self._queue.open_session({key: value for key, value in self._shared.items() if key != "model_store"})
+            self._queue_poller = threading.Thread(target=self._poll_queue, daemon=True)
+            self._queue_poller.start()
+
+    def _poll_queue(self):
+        while not self._queue_stop.wait(self._backend.poll_interval):
+            for task_id, result, ex in self._queue.get_results(self._queue_session):
+                future = self._queue_futures.pop(task_id, None)
+                if future is None:
+                    continue
+                if ex is not None:
+                    future.set_exception(ex)
+                else:
+                    future.set_result(result)
+
+    def __enter__(self):
+        self._create_executor()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+            self._executor = None
+        if self._queue is not None:
+            self._queue_stop.set()
+            self._queue_poller.join()
+            self._queue.close_session(self._queue_session)
+            self._queue = None
+
+    def submit(self, func, task: dict)-> Future:
+        if self._backend.backend == "queue":
+            future = Future()
+            self._queue_futures[task["task_id"]] = future
+            self._queue.put(self._queue_session, task["task_id"], func, task)
+            return future
+        if self._backend.backend == "process":
+            return self._executor.submit(FoldTask.run_in_worker, func, task)
+        if self._backend.backend == "thread":
+            return self._executor.submit(func, task, self._shared)
+
+        future = Future()
+        try:
+            future.set_result(func(task, self._shared))
+        except Exception as ex:
+            future.set_exception(ex)
+        return future
+
+    def _cancel(self, running: dict, future: Future):
+        """
+        Stops a timed out task. Returns the futures of other tasks that must be resubmitted.
+        """
+        if self._backend.backend == "thread":
+            self._executor.shutdown(wait=False)
+            self._create_executor()
+            return []
+
+        # a task handed to the pool may not have started yet, or not be visible on any worker, so every
+        # worker is killed: the timed out task cannot start later and keep the cores its slot released
+        processes = list((self._executor._processes or {}).values())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+        self._create_executor()
+        return [other for other in running.keys() if other is not future]
+
+    def run(self, func, tasks: list[dict]):
+        """
+        Runs func for every task and yields (task, result, exception) in completion order.
+        The scheduler sets task["n_threads"] and admits a task only when a worker is free and its cores
+        and task["memory"] (estimated bytes, 0 when missing) fit in what other sessions left of the budget.
+        Tasks with an estimated task["cost"] start longest first. task["wall_time"] holds the seconds it ran.
+        """
+        scheduler = self._backend.scheduler
+        local = self._backend.backend != "queue"
+        n_threads = scheduler.get_threads(len(tasks)) if local else None
+        max_running = scheduler.get_workers(len(tasks)) if local else max(1, len(tasks))
+        if self._backend.max_workers is not None:
+            max_running = min(max_running, self._backend.max_workers)
+
+        order = sorted(range(len(tasks)), key=lambda n: (tasks[n].get("cost", 0), -n))
+        pending = [tasks[n] for n in order]
+        running = {}
+        started = {}
+
+        try:
+            while len(pending) > 0 or len(running) > 0:
+                while len(pending) > 0 and len(running) < max_running:
+                    if local and len(running) == 0:
+                        scheduler.acquire(pending[-1].get("memory", 0), n_threads)
+                    elif local and not scheduler.try_acquire(pending[-1].get("memory", 0), n_threads):
+                        break
+                    task = {**pending.pop(), "n_threads": n_threads, "task_id": self._next_task_id}
+                    self._next_task_id += 1
+                    started[task["task_id"]] = time.perf_counter()
+                    running[self.submit(func, task)] = task
+
+                deadlines = [started[task["task_id"]] + task["timeout"] for task in running.values() if local and task.get("timeout") is not None]
+                timeout = max(0, min(deadlines) - time.perf_counter()) if len(deadlines) > 0 else None
+                done, _ = wait(list(running.keys()), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                now = time.perf_counter()
+                for future in done:
+                    task = running.pop(future)
+                    task["wall_time"] = now - started.pop(task["task_id"])
+                    if local:
+                        scheduler.release(task.get("memory", 0), task["n_threads"])
+                    try:
+                        result = future.result()
+                        if local and task.get("timeout") is not None and task["wall_time"] > task["timeout"]:
+                            raise TaskTimeoutError(f"{task.get('model_name')} exceeded the timeout of {task['timeout']}s")
+                        yield task, result, None
+                    except BrokenProcessPool as ex:
+                        if getattr(self._executor, "_broken", False):
+                            self._create_executor()
+                        yield task, None, ex
+                    except Exception as ex:
+                        yield task, None, ex
+
+                for future, task in list(running.items()):
+                    if not local or future not in running or task.get("timeout") is None or now - started[task["task_id"]] < task["timeout"]:
+                        continue
+
+                    for other in self._cancel(running, future):
+                        other_task = running.pop(other)
+                        started.pop(other_task["task_id"])
+                        scheduler.release(other_task.get("memory", 0), other_task["n_threads"])
+                        pending.append({key: value for key, value in other_task.items() if key not in ["n_threads", "task_id"]})
+
+                    running.pop(future)
+                    task["wall_time"] = now - started.pop(task["task_id"])
+                    if self._backend.backend == "thread":
+                        # the fit keeps running in its thread: the budget is given back only when it returns
+                        future.add_done_callback(lambda _, task=task: scheduler.release(task.get("memory", 0), task["n_threads"]))
+                    else:
+                        scheduler.release(task.get("memory", 0), task["n_threads"])
+                    yield task, None, TaskTimeoutError(f"{task.get('model_name')} exceeded the timeout of {task['timeout']}s")
+        finally:
+            # the caller stopped reading (cancelled job): tasks not started are dropped, running ones finish
+            for future, task in running.items():
+                future.cancel()
+                if local:
+                    future.add_done_callback(lambda _, task=task: scheduler.release(task.get("memory", 0), task["n_threads"]))
+                else:
+                    self._queue.cancel(self._queue_session, task["task_id"])
@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class FoldDataCache(object):
+    """
+    LRU cache of materialised fold data (train/test slices and SMOTE output) shared by every
+    model that trains on the same fold. Concurrent requests for the same key build it once.
+    In the process backend every worker keeps its own cache.
+    """
+
+    def __init__(self, max_bytes: int = 2**30):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+    @staticmethod
+    def _get_size(value)-> int:
+        size = 0
+        for item in value.values():
+            if isinstance(item, pd.DataFrame):
+                size += int(item.memory_usage(index=True, deep=False).sum())
+            elif isinstance(item, pd.Series):
+                size += int(item.memory_usage(index=True, deep=False))
+            elif hasattr(item, "nbytes"):
+                size += int(item.nbytes)
+        return size
+
+    def get(self, key: tuple, builder)-> dict:
+        """
+        Returns the entry of key, calling builder() to create it when it is not cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._hits += 1
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+
+            try:
+                value = builder()
+                size = FoldDataCache._get_size(value)
+            except BaseException:
+                # the next request of key builds it again instead of finding a dead entry in _building
+                with self._lock:
+                    self._release(key, key_lock)
+                raise
+
+            with self._lock:
+                self._misses += 1
+                self._release(key, key_lock)
+                if size <= self.max_bytes:
+                    self._entries[key] = value
+                    self._sizes[key] = size
+                    self._bytes += size
+                    while self._bytes > self.max_bytes:
+                        evicted, _ = self._entries.popitem(last=False)
+                        self._bytes -= self._sizes.pop(evicted)
+
+        return value
+
+    def _release(self, key: tuple, key_lock: threading.Lock):
+        # requests waiting on a failed build of key retry it and must not drop the lock of a newer build
+        if self._building.get(key) is key_lock:
+            del self._building[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def get_stats(self)-> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self._hits, "misses": self._misses}
@@ -0,0 +1,172 @@
+import time
+
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+
+from execution.ResourceScheduler import ResourceScheduler
+from execution.Tracer import Tracer
+from helpers.ModelHelper import ModelHelper
+from helpers.SearchHelper import SearchHelper
+
+
+class FoldTask(object):
+    """
+    Units of work sent to an ExecutionBackend. Every function receives a task dict and the
+    shared data of the run ({"x": DataFrame, "y": Series, "split_plan": SplitPlan}). In the
+    process backend the shared data is installed once per worker by init_worker and shared is
+    passed as None. With task["trace"] the spans of the task are returned in result["spans"].
+    """
+
+    _worker_shared = None
+
+    @staticmethod
+    def init_worker(shared: dict):
+        FoldTask._worker_shared = shared
+
+    @staticmethod
+    def run_in_worker(func, task: dict):
+        return func(task, None)
+
+    @staticmethod
+    def _get_shared(shared: dict)-> dict:
+        if shared is None:
+            return FoldTask._worker_shared
+        return shared
+
+    @staticmethod
+    def find_best_params(task: dict, shared: dict = None)-> dict:
+        """
+        Returns {"best_params": dict, "history": evaluated candidates with their cost, "elapsed": seconds}.
+        task["param_sel_obj"] is GridSearchCV/RandomizedSearchCV, or None for the budgeted search of SearchHelper.
+        task["warm_start"] holds params of a previous search evaluated first by the budgeted and randomized searches.
+        """
+        with Tracer.collect(task.get("trace", False), model=task["model_name"]) as spans, Tracer.span("search_task"):
+            result = FoldTask._find_best_params(task, shared)
+        if spans is not None:
+            result["spans"] = spans
+        return result
+
+    @staticmethod
+    def _find_best_params(task: dict, shared: dict)-> dict:
+        shared = FoldTask._get_shared(shared)
+        start = time.perf_counter()
+        x, y = shared["x"], shared["y"]
+        train_index = shared["split_plan"].get_best_params_split()
+
+        model_instance = task["model_object"]()
+        model_instance.set_params(**task["model_params_hidden_verbosity"])
+        ResourceScheduler.set_threads(model_instance, task.get("n_threads"))
+
+        random_state = shared["split_plan"].get_random_state("best_params_search", task["model_name"])
+        param_grid, param_sel_obj = task["param_grid"], task["param_sel_obj"]
+        if param_sel_obj is RandomizedSearchCV and bool(task.get("warm_start")):
+            # same 10 candidates (RandomizedSearchCV default n_iter), the previous best ones first
+            param_grid = SearchHelper.get_warm_start_grid(param_grid, 10, random_state, task["warm_start"])
+            param_sel_obj = GridSearchCV
+
+        with Tracer.span("search_data"):
+            x_search, y_search = x.iloc[train_index], y.iloc[train_index]
+
+        with Tracer.span("search", method=getattr(param_sel_obj, "__name__", "budget")):
+            if param_sel_obj is None:
+                best_params, history = SearchHelper.find_best_hyperparams(model_instance,
+                                                                          x_search,
+                                                                          y_search,
+                                                                          task["param_grid"],
+                                                                          task["num_folds"],
+                                                                          task["metric"],
+                                                                          random_state=random_state,
+                                                                          initial_candidates=task.get("warm_start"),
+                                                                          **task["budget"])
+            else:
+                search = ModelHelper.fit_search(model_instance,
+                                                x_search,
+                                                y_search,
+                                                param_grid,
+                                                param_sel_obj,
+                                                task["num_folds"],
+                                                task["metric"],
+                                                random_state)
+                best_params, history = search.best_params_, SearchHelper.get_history(search)
+
+        return {"best_params": best_params, "history": history, "elapsed": time.perf_counter() - start}
+
+    @staticmethod
+    def _build_fold_data(task: dict, shared: dict)-> dict:
+        x, y = shared["x"], shared["y"]
+        train_index, test_index = shared["split_plan"].get_split(task["time"], task["validation"], task["fold"])
+
+        with Tracer.span("fold_data"):
+            x_train = x.iloc[train_index]
+            y_train = y.iloc[train_index]
+            x_test = x.iloc[test_index]
+
+        if task["balancing"]:
+            random_state = shared["split_plan"].get_random_state("smote", task["time"], task["validation"], task["fold"])
+            from imblearn.over_sampling import SMOTE
+            with Tracer.span("smote"):
+                x_train,y_train=SMOTE(random_state=random_state).fit_resample(x_train,y_train)
+
+        return {"x_train": x_train, "y_train": y_train, "x_test": x_test}
+
+    @staticmethod
+    def get_fold_data(task: dict, shared: dict = None)-> dict:
+        shared = FoldTask._get_shared(shared)
+        key = (task["section"], task["time"], task["validation"], task["fold"], task["balancing"])
+
+        fold_cache = shared.get("fold_cache")
+        if fold_cache is None:
+            return FoldTask._build_fold_data(task, shared)
+        return fold_cache.get(key, lambda: FoldTask._build_fold_data(task, shared))
+
+    @staticmethod
+    def get_scores(model_instance, x_test):
+        """
+        Class probabilities of x_test, or decision_function when the model has no predict_proba (SVC).
+        """
+        if hasattr(model_instance, "predict_proba"):
+            try:
+                return model_instance.predict_proba(x_test)
+            except AttributeError:
+                pass
+        if hasattr(model_instance, "decision_function"):
+            return model_instance.decision_function(x_test)
+        return None
+
+    @staticmethod
+    def train_fold(task: dict, shared: dict = None)-> dict:
+        with Tracer.collect(task.get("trace", False), model=task["model_name"], section=task["section"], repeat=task["time"],
+                            validation=task["validation"], fold=task["fold"]) as spans, Tracer.span("fold_task"):
+            result = FoldTask._train_fold(task, shared)
+        if spans is not None:
+            result["spans"] = spans
+        return result
+
+    @staticmethod
+    def _train_fold(task: dict, shared: dict)-> dict:
+        shared = FoldTask._get_shared(shared)
+        start = time.perf_counter()
+        fold_data = FoldTask.get_fold_data(task, shared)
+
+        model_instance = task["model_object"]()
+        merged_params = {**task["best_params"], **task["model_params_hidden_verbosity"]}
+
+        model_instance.set_params(**merged_params)
+        ResourceScheduler.set_threads(model_instance, task.get("n_threads"))
+        with Tracer.span("fit"):
+            model_instance.fit(fold_data["x_train"], fold_data["y_train"])
+
+        with Tracer.span("predict"):
+            y_pred = model_instance.predict(fold_data["x_test"])
+        with Tracer.span("predict_scores"):
+            y_proba = FoldTask.get_scores(model_instance, fold_data["x_test"]) if task["model_type"] == "classifier" else None
+
+        elapsed = time.perf_counter() - start
+
+        model_store = shared.get("model_store")
+        if model_store is not None:
+            name = "_".join(str(key) for key in [task["section"], task["model_name"], task["time"], task["validation"], task["fold"]] if key is not None)
+            with Tracer.span("save_model"):
+                handle = model_store.save(model_instance, name)
+            return {"model": handle, "y_pred": y_pred, "y_proba": y_proba, "elapsed": elapsed}
+
+        return {"model": model_instance, "y_pred": y_pred, "y_proba": y_proba, "elapsed": elapsed}
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+class HyperparamStore(object):
+    """
+    Persistent SQLite store of hyperparameter search results (best params and every evaluated
+    candidate with its score and cost). Entries are keyed by the fingerprint of the data and the
+    search (feature matrix, target, section, model, space, metric and search settings); an exact
+    match skips the search and an entry with the same search on different data warm-starts it.
+    """
+
+    def __init__(self, path: str = None):
+        if path is None:
+            path = os.path.join(HyperparamStore.get_cache_dir(), "hyperparams.sqlite")
+        if os.path.dirname(path) != "":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("""CREATE TABLE IF NOT EXISTS searches (
+                                      key TEXT PRIMARY KEY, space_key TEXT, model_name TEXT, section TEXT,
+                                      best_params TEXT, elapsed REAL, created REAL)""")
+            connection.execute("""CREATE TABLE IF NOT EXISTS candidates (
+                                      key TEXT, params TEXT, round INTEGER, resource TEXT, resource_value REAL,
+                                      score REAL, fit_time REAL, n_fits INTEGER, best_iteration INTEGER)""")
+            connection.execute("CREATE INDEX IF NOT EXISTS searches_space_key ON searches (space_key)")
+            connection.execute("CREATE INDEX IF NOT EXISTS candidates_key ON candidates (key)")
+
+    @staticmethod
+    def get_cache_dir()-> str:
+        cache_dir = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+        return os.path.join(cache_dir, "autobiolearn")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _to_json(value)-> str:
+        return json.dumps(value, sort_keys=True, default=lambda item: item.item() if isinstance(item, np.generic) else str(item))
+
+    @staticmethod
+    def get_space_key(model_type: str, section: str, task: dict)-> str:
+        """
+        Fingerprint of the search alone (model, space, metric and settings), shared by runs on different data.
+        """
+        content = HyperparamStore._to_json([model_type, section, task["model_name"], task["param_grid"],
+                                            getattr(task["param_sel_obj"], "__name__", None), task["num_folds"],
+                                            task["metric"], task.get("budget"), task.get("train_size")])
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    @staticmethod
+    def get_key(space_key: str, x_hash: str, y_hash: str)-> str:
+        return hashlib.sha1(f"{space_key}{x_hash}{y_hash}".encode()).hexdigest()
+
+    def load(self, key: str)-> dict:
+        """
+        Returns {"best_params", "history", "elapsed"} of an exact match or None.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT best_params, elapsed FROM searches WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            return {"best_params": json.loads(row[0]), "history": self._load_history(connection, key), "elapsed": row[1]}
+
+    def get_warm_start(self, space_key: str, n_candidates: int = 3)-> list[dict]:
+        """
+        Best candidates of the latest search with the same space_key (on other data), best first.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT key FROM searches WHERE space_key = ? ORDER BY created DESC LIMIT 1", (space_key,)).fetchone()
+            if row is None:
+                return []
+            rows = connection.execute("""SELECT params FROM candidates WHERE key = ?
+                                         ORDER BY round DESC, score DESC""", (row[0],)).fetchall()
+
+        candidates = []
+        for (params,) in rows:
+            params = json.loads(params)
+            if params not in candidates:
+                candidates.append(params)
+            if len(candidates) == n_candidates:
+                break
+        return candidates
+
+    def _load_history(self, connection, key: str)-> list[dict]:
+        rows = connection.execute("""SELECT params, round, resource, resource_value, score, fit_time, n_fits, best_iteration
+                                     FROM candidates WHERE key = ? ORDER BY rowid""", (key,)).fetchall()
+        return [{"params": json.loads(params), "round": round_number, "resource": resource, "resource_value": resource_value,
+                 "score": score, "fit_time": fit_time, "n_fits": n_fits, "best_iteration": best_iteration}
+                for params, round_number, resource, resource_value, score, fit_time, n_fits, best_iteration in rows]
+
+    def save(self, key: str, space_key: str, model_name: str, section: str, best_params: dict, history: list[dict], elapsed: float)-> bool:
+        """
+        Stores a search result. Best params that do not survive a JSON round trip (objects as values) are not stored.
+        """
+        if json.loads(HyperparamStore._to_json(best_params)) != best_params:
+            return False
+
+        with self._connect() as connection:
+            connection.execute("DELETE FROM candidates WHERE key = ?", (key,))
+            connection.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (key, space_key, model_name, section, HyperparamStore._to_json(best_params), elapsed, time.time()))
+            connection.executemany("INSERT INTO candidates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   [(key, HyperparamStore._to_json(record["params"]), record["round"], record["resource"],
+                                     None if record["resource_value"] is None else float(record["resource_value"]),
+                                     float(record["score"]), float(record["fit_time"]), int(record["n_fits"]),
+                                     None if record["best_iteration"] is None else int(record["best_iteration"]))
+                                    for record in history])
+        return True
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM candidates")
+            connection.execute("DELETE FROM searches")
@@ -0,0 +1,114 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+
+
+class Job(object):
+    """
+    Handle of a run started in the background (submit_models, submit_shap_analysis). The run reports its
+    tasks as they finish: progress() counts them, iteration yields the record of every completed task and
+    cancel() stops starting new tasks (tasks already running finish). result() waits for the end of the run
+    and the job can be awaited from asyncio. Results stored so far can be evaluated while the job runs.
+    """
+
+    def __init__(self, target, name: str = None):
+        """
+        target: function called with the job in a background thread by start(), its return value is the job result.
+        """
+        self._future = Future()
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._records = queue.Queue()
+        self._total = 0
+        self._done = 0
+        self._failed = 0
+        self._errors = []
+        self._start = time.perf_counter()
+        self._end = None
+        self._thread = threading.Thread(target=self._run, args=(target,), name=name, daemon=True)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread.start()
+
+    def _run(self, target):
+        self._future.set_running_or_notify_cancel()
+        try:
+            result = target(self)
+        except BaseException as ex:
+            self._end = time.perf_counter()
+            self._future.set_exception(ex)
+        else:
+            self._end = time.perf_counter()
+            if self._cancel_event.is_set():
+                self._future.set_exception(CancelledError("job cancelled"))
+            else:
+                self._future.set_result(result)
+        finally:
+            self._records.put(None)
+
+    def add_total(self, n_tasks: int):
+        with self._lock:
+            self._total += n_tasks
+
+    def report(self, record: dict, ex: Exception = None):
+        """
+        Called by the run for every finished task (ex is its exception), record describes the task.
+        """
+        with self._lock:
+            self._done += 1
+            if ex is not None:
+                self._failed += 1
+                self._errors.append({**record, "error": ex})
+        self._records.put({**record, "error": ex})
+
+    def cancelled(self)-> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def done(self)-> bool:
+        return self._future.done()
+
+    def progress(self)-> dict:
+        """
+        {"status", "total", "done", "failed", "fraction", "elapsed"}. total grows as sections and stages are planned.
+        """
+        with self._lock:
+            total, done, failed = self._total, self._done, self._failed
+        if not self._future.done():
+            status = "cancelling" if self._cancel_event.is_set() else "running"
+        elif self._cancel_event.is_set():
+            status = "cancelled"
+        else:
+            status = "failed" if self._future.exception() is not None else "finished"
+        elapsed = (self._end if self._end is not None else time.perf_counter()) - self._start
+        return {"status": status, "total": total, "done": done, "failed": failed,
+                "fraction": done / total if total > 0 else 0.0, "elapsed": elapsed}
+
+    def get_errors(self)-> list[dict]:
+        with self._lock:
+            return list(self._errors)
+
+    def result(self, timeout: float = None):
+        return self._future.result(timeout)
+
+    def exception(self, timeout: float = None)-> BaseException:
+        return self._future.exception(timeout)
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def __iter__(self):
+        """
+        Yields the record of every task as it completes, until the job ends.
+        """
+        while True:
+            record = self._records.get()
+            if record is None:
+                self._records.put(None)
+                return
+            yield record
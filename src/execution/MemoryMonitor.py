@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+class MemoryCeilingWarning(UserWarning):
+    pass
+
+
+class MemoryMonitor(object):
+    """
+    Memory used by the public methods of a run: RSS of the process (and of its worker processes) before and
+    after each call, the peak RSS sampled while it runs and, with use_tracemalloc, the Python allocations it
+    made (tracemalloc current delta and peak). Nested calls in the same thread are part of the outer call.
+    The tracemalloc peak is shared by the process, so it is approximate for calls overlapping in time.
+
+    ceiling_bytes: a MemoryCeilingWarning is issued (once per call) when the sampled RSS reaches
+    warn_fraction of it.
+    """
+
+    def __init__(self, enabled: bool = False, ceiling_bytes: int = None, warn_fraction: float = 0.9,
+                 use_tracemalloc: bool = True, interval: float = 0.05):
+        self.enabled = enabled
+        self.ceiling_bytes = ceiling_bytes
+        self.warn_fraction = warn_fraction
+        self.use_tracemalloc = use_tracemalloc
+        self.interval = interval
+        self._records = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._started_tracemalloc = False
+
+    @staticmethod
+    def get_rss()-> tuple[int, int]:
+        """
+        (RSS of this process, RSS of its child processes) in bytes. Children are 0 without psutil.
+        """
+        try:
+            import psutil
+            process = psutil.Process()
+            children = 0
+            for child in process.children(recursive=True):
+                try:
+                    children += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return process.memory_info().rss, children
+        except ImportError:
+            with open(f"/proc/{os.getpid()}/statm") as file:
+                return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"), 0
+
+    @staticmethod
+    def get_nbytes(value, seen: set = None)-> int:
+        """
+        Bytes held by the arrays and frames in value (nested lists, tuples, dicts and SHAP explanations), each object counted once.
+        """
+        seen = set() if seen is None else seen
+        if value is None or id(value) in seen:
+            return 0
+        seen.add(id(value))
+
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(index=True, deep=True))
+        if isinstance(value, np.ndarray):
+            return int(value.nbytes)
+        if isinstance(value, dict):
+            return sum(MemoryMonitor.get_nbytes(item, seen) for item in value.values())
+        if isinstance(value, (list, tuple)):
+            return sum(MemoryMonitor.get_nbytes(item, seen) for item in value)
+        if hasattr(value, "values") and hasattr(value, "base_values"):
+            return sum(MemoryMonitor.get_nbytes(getattr(value, name, None), seen) for name in ["values", "base_values", "data"])
+        return 0
+
+    def _check_ceiling(self, rss: int, stage: str, state: dict):
+        if self.ceiling_bytes is None or state["warned"] or rss < self.warn_fraction * self.ceiling_bytes:
+            return
+        state["warned"] = True
+        warnings.warn(MemoryCeilingWarning(f"{stage}: memory at {rss / 2**20:.0f} MB, "
+                                           f"{rss / self.ceiling_bytes:.0%} of the {self.ceiling_bytes / 2**20:.0f} MB ceiling"),
+                      stacklevel=4)
+
+    @contextmanager
+    def measure(self, stage: str):
+        """
+        Records the memory of the block as one call of stage (only the outermost block of a thread is recorded).
+        """
+        if not self.enabled or getattr(self._local, "depth", 0) > 0:
+            yield
+            return
+
+        self._local.depth = 1
+        with self._lock:
+            self._active += 1
+            if self.use_tracemalloc:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracemalloc = True
+                if self._active == 1:
+                    tracemalloc.reset_peak()
+        traced_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+        rss_start, children_start = MemoryMonitor.get_rss()
+        state = {"peak": rss_start + children_start, "warned": False}
+        self._check_ceiling(state["peak"], stage, state)
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(self.interval):
+                rss, children = MemoryMonitor.get_rss()
+                state["peak"] = max(state["peak"], rss + children)
+                self._check_ceiling(rss + children, stage, state)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as ex:
+            error = type(ex).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stop.set()
+            sampler.join()
+            rss_end, children_end = MemoryMonitor.get_rss()
+            state["peak"] = max(state["peak"], rss_end + children_end)
+
+            record = {"stage": stage, "thread": threading.current_thread().name, "elapsed": elapsed, "error": error,
+                      "rss_start": rss_start, "rss_end": rss_end, "rss_delta": rss_end - rss_start,
+                      "children_rss_end": children_end, "peak_rss": state["peak"], "peak_delta": state["peak"] - rss_start - children_start,
+                      "traced_delta": None, "traced_peak": None}
+            with self._lock:
+                if traced_start is not None and tracemalloc.is_tracing():
+                    current, peak = tracemalloc.get_traced_memory()
+                    record["traced_delta"] = current - traced_start
+                    record["traced_peak"] = max(0, peak - traced_start)
+                self._active -= 1
+                if self._active == 0 and self._started_tracemalloc:
+                    tracemalloc.stop()
+                    self._started_tracemalloc = False
+                self._records.append(record)
+            self._local.depth = 0
+
+    def get_records(self)-> pd.DataFrame:
+        """
+        One row per call: stage, thread, elapsed, error, rss_start, rss_end, rss_delta, children_rss_end, peak_rss,
+        peak_delta, traced_delta and traced_peak (bytes).
+        """
+        with self._lock:
+            records = list(self._records)
+        return pd.DataFrame(records, columns=["stage", "thread", "elapsed", "error", "rss_start", "rss_end", "rss_delta",
+                                              "children_rss_end", "peak_rss", "peak_delta", "traced_delta", "traced_peak"])
+
+    def clear(self):
+        with self._lock:
+            self._records = []
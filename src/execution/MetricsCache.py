@@ -0,0 +1,120 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from execution.ResultsStore import ResultsStore
+
+
+class MetricsCache(object):
+    """
+    Metrics of a ResultsStore kept up to date incrementally. When the store version changes only
+    the new rows are scored and appended, rows no longer in the store are dropped, and the
+    describe() summaries of the (model, section) groups touched by the change are recomputed.
+    The row ids of each (model, section) group, and of each model over all sections as (model, None),
+    are updated with the rows, so reading a summary never scans the whole metrics table.
+
+    calculate receives (table, y_test, y_pred, y_proba) and returns one row of metrics per table row.
+    """
+
+    def __init__(self, calculate):
+        self._calculate = calculate
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._store = None
+            self._version = None
+            self._metrics = None
+            self._groups = {}
+            self._summaries = {}
+
+    @staticmethod
+    def metadata_columns()-> list[str]:
+        return ["Model", "Section", "Validation", "Time_of_execution", "Fold"]
+
+    def get_metrics(self, store: ResultsStore)-> pd.DataFrame:
+        """
+        Metrics of every row of store indexed by row_id, with columns Model, Section, Validation, Time_of_execution, Fold and the metrics.
+        """
+        with self._lock:
+            if self._store is not store:
+                self.clear()
+                self._store = store
+
+            if self._version == store.version:
+                return self._metrics
+
+            table = store.get_table()
+            cached_ids = self._metrics.index.to_numpy() if self._metrics is not None else np.empty(0, dtype=np.int64)
+            current_ids = table["row_id"].to_numpy()
+
+            removed = ~np.isin(cached_ids, current_ids)
+            new_rows = np.flatnonzero(~np.isin(current_ids, cached_ids))
+
+            parts = []
+            if self._metrics is not None:
+                self._update_groups(self._metrics[removed], added=False)
+                parts.append(self._metrics[~removed])
+
+            if len(new_rows) > 0:
+                subset, y_test, y_pred, y_proba = store.get_subset(new_rows)
+                values = self._calculate(subset, y_test, y_pred, y_proba).reset_index(drop=True)
+                metadata = pd.DataFrame({"Model": subset["model_name"].to_numpy(dtype=object),
+                                         "Section": subset["section"].to_numpy(dtype=object),
+                                         "Validation": subset["validation"].to_numpy(dtype=object),
+                                         "Time_of_execution": subset["time"].to_numpy(),
+                                         "Fold": subset["fold"].to_numpy()})
+                scored = pd.concat([metadata, values], axis=1)
+                scored.index = pd.Index(subset["row_id"].to_numpy(), name="row_id")
+                self._update_groups(scored, added=True)
+                parts.append(scored)
+
+            if len(parts) == 0:
+                self._metrics = pd.DataFrame(columns=MetricsCache.metadata_columns(), index=pd.Index([], name="row_id"))
+            else:
+                self._metrics = pd.concat(parts) if len(parts) > 1 else parts[0]
+
+            self._version = store.version
+            return self._metrics
+
+    def _update_groups(self, rows: pd.DataFrame, added: bool):
+        groups = {(model, section): ids for (model, section), ids in rows.groupby(["Model", "Section"]).groups.items()}
+        groups.update({(model, None): ids for model, ids in rows.groupby("Model").groups.items()})
+        for key, ids in groups.items():
+            current = self._groups.get(key, ids[:0])
+            current = current.append(ids) if added else current.difference(ids)
+            if len(current) > 0:
+                self._groups[key] = current
+            else:
+                self._groups.pop(key, None)
+            self._summaries.pop(key, None)
+
+    def get_nbytes(self)-> int:
+        with self._lock:
+            nbytes = int(self._metrics.memory_usage(index=True, deep=True).sum()) if self._metrics is not None else 0
+            nbytes += sum(ids.nbytes for ids in self._groups.values())
+            return nbytes + sum(int(summary.memory_usage(index=True, deep=True).sum()) for summary in self._summaries.values())
+
+    def get_summary(self, store: ResultsStore, metric: str, section: str = None)-> pd.DataFrame:
+        """
+        Same layout as metrics[["Model", metric]].groupby("Model").describe() over one section or all of them.
+        Only groups changed since the last call are described again.
+        """
+        with self._lock:
+            metrics = self.get_metrics(store)
+
+            rows = {}
+            for model in sorted(model for model, group_section in self._groups if group_section == section):
+                key = (model, section)
+                if key not in self._summaries:
+                    group = metrics.loc[self._groups[key]]
+                    metric_columns = [column for column in group.columns if column not in MetricsCache.metadata_columns()]
+                    self._summaries[key] = group[metric_columns].apply(pd.to_numeric).describe()
+                rows[model] = self._summaries[key][metric]
+
+            summary = pd.DataFrame(rows, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"]).T
+            summary.index.name = "Model"
+            summary.columns = pd.MultiIndex.from_product([[metric], summary.columns])
+            return summary
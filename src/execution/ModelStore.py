@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+
+import joblib
+
+
+class ModelStore(object):
+    """
+    Compressed on-disk store of fitted fold models. save returns a small handle (the artifact
+    file name) and load reads it back through a bounded LRU cache, so only the models in flight
+    and the cached ones are kept in memory.
+    """
+
+    def __init__(self, path: str = None, compress: int = 3, cache_size: int = 8):
+        if path is None:
+            path = tempfile.mkdtemp(prefix="autobiolearn_models_")
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self.compress = compress
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._handles = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"path": self.path, "compress": self.compress, "cache_size": self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["compress"], state["cache_size"])
+
+    def save(self, model, name: str = "model")-> str:
+        handle = f"{name}_{uuid.uuid4().hex}.joblib"
+        temp_path = os.path.join(self.path, f".{handle}.tmp")
+
+        joblib.dump(model, temp_path, compress=self.compress)
+        os.replace(temp_path, os.path.join(self.path, handle))
+
+        self.register(handle)
+        return handle
+
+    def import_file(self, file_path: str, name: str = "model")-> str:
+        """
+        Copies an artifact written elsewhere (a checkpoint) into the store and returns its handle.
+        """
+        handle = f"{name}_{uuid.uuid4().hex}.joblib"
+        temp_path = os.path.join(self.path, f".{handle}.tmp")
+
+        shutil.copyfile(file_path, temp_path)
+        os.replace(temp_path, os.path.join(self.path, handle))
+
+        self.register(handle)
+        return handle
+
+    def register(self, handle: str):
+        with self._lock:
+            self._handles.add(handle)
+
+    def load(self, handle: str):
+        with self._lock:
+            if handle in self._cache:
+                self._cache.move_to_end(handle)
+                return self._cache[handle]
+
+        model = joblib.load(os.path.join(self.path, handle))
+
+        with self._lock:
+            if self.cache_size > 0:
+                self._cache[handle] = model
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return model
+
+    def delete(self, handle: str):
+        with self._lock:
+            self._cache.pop(handle, None)
+            self._handles.discard(handle)
+
+        file_path = os.path.join(self.path, handle)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def clear(self):
+        """
+        Removes the artifacts written or registered by this store, other files in path are kept.
+        """
+        with self._lock:
+            handles = list(self._handles)
+
+        for handle in handles:
+            self.delete(handle)
+
+    def get_nbytes(self)-> int:
+        with self._lock:
+            handles = list(self._handles)
+        return int(sum(os.path.getsize(os.path.join(self.path, handle)) for handle in handles
+                       if os.path.exists(os.path.join(self.path, handle))))
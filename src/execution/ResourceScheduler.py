@@ -0,0 +1,109 @@
+import os
+import threading
+
+import pandas as pd
+
+
+class ResourceScheduler(object):
+    """
+    Core and memory budget shared by the tasks of a run (hyperparameter search, fold training and SHAP).
+    Each task gets threads_per_task cores, which are written to the model as n_jobs (thread_count in CatBoost).
+    A task is admitted only when its cores and its estimated memory fit in what is left of the budget, which
+    is shared by every session using the scheduler (sections run in parallel); a task larger than the whole
+    budget runs alone.
+
+    cores: total cores (all cores when None). memory_bytes: memory budget (80% of the available memory when None).
+    threads_per_task: cores of each task, when None the cores are split evenly over the tasks of each stage.
+    """
+
+    def __init__(self, cores: int = None, memory_bytes: int = None, threads_per_task: int = None):
+        self.cores = max(1, cores if cores is not None else (os.cpu_count() or 1))
+        self.memory_bytes = memory_bytes if memory_bytes is not None else ResourceScheduler.get_available_memory()
+        self.threads_per_task = threads_per_task
+        self._used = 0
+        self._cores_used = 0
+        self._running = 0
+        self._condition = threading.Condition()
+
+    def __getstate__(self):
+        return {"cores": self.cores, "memory_bytes": self.memory_bytes, "threads_per_task": self.threads_per_task}
+
+    def __setstate__(self, state):
+        self.__init__(state["cores"], state["memory_bytes"], state["threads_per_task"])
+
+    @staticmethod
+    def get_available_memory()-> int:
+        try:
+            import psutil
+            return int(psutil.virtual_memory().available * 0.8)
+        except ImportError:
+            return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") * 0.8)
+
+    @staticmethod
+    def estimate_memory(x, factor: float = 3.0)-> int:
+        """
+        Peak memory estimate of a task reading x: its copies (slices, resampling) and the model working set.
+        """
+        if isinstance(x, pd.DataFrame):
+            nbytes = int(x.memory_usage(index=True, deep=False).sum())
+        elif isinstance(x, pd.Series):
+            nbytes = int(x.memory_usage(index=True, deep=False))
+        else:
+            nbytes = int(getattr(x, "nbytes", 0))
+        return int(nbytes * factor)
+
+    def get_threads(self, n_tasks: int)-> int:
+        if self.threads_per_task is not None:
+            return max(1, min(self.threads_per_task, self.cores))
+        return max(1, self.cores // max(1, min(n_tasks, self.cores)))
+
+    def get_workers(self, n_tasks: int)-> int:
+        return max(1, self.cores // self.get_threads(n_tasks))
+
+    @staticmethod
+    def set_threads(model_instance, n_threads: int):
+        """
+        Limits the threads of a model: n_jobs (scikit-learn, XGBoost, LightGBM) or thread_count (CatBoost).
+        """
+        if n_threads is None:
+            return model_instance
+
+        if type(model_instance).__module__.startswith("catboost"):
+            model_instance.set_params(thread_count=n_threads)
+            return model_instance
+
+        if "n_jobs" in model_instance.get_params(deep=False):
+            model_instance.set_params(n_jobs=n_threads)
+        return model_instance
+
+    def _fits(self, memory: int, threads: int)-> bool:
+        return self._running == 0 or (self._used + memory <= self.memory_bytes and self._cores_used + threads <= self.cores)
+
+    def try_acquire(self, memory: int = 0, threads: int = 1)-> bool:
+        with self._condition:
+            if not self._fits(memory, threads):
+                return False
+            self._used += memory
+            self._cores_used += threads
+            self._running += 1
+            return True
+
+    def acquire(self, memory: int = 0, threads: int = 1):
+        with self._condition:
+            while not self._fits(memory, threads):
+                self._condition.wait()
+            self._used += memory
+            self._cores_used += threads
+            self._running += 1
+
+    def release(self, memory: int = 0, threads: int = 1):
+        with self._condition:
+            self._used -= memory
+            self._cores_used -= threads
+            self._running -= 1
+            self._condition.notify_all()
+
+    def get_stats(self)-> dict:
+        with self._condition:
+            return {"cores": self.cores, "memory_bytes": self.memory_bytes, "used_bytes": self._used, "used_cores": self._cores_used,
+                    "running": self._running}
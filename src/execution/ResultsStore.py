@@ -0,0 +1,348 @@
+import hashlib
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from execution.ModelStore import ModelStore
+
+
+class ResultsStore(object):
+    """
+    Columnar store of the fold results of execute_models. Predictions, probabilities, true labels
+    and test indices are kept in flat arrays addressed by per-row offsets (int32 labels and indices,
+    float32 probabilities, regression values in float64), and the run metadata (model, section,
+    validation, repeat, fold) in categorical columns.
+
+    model_retention: "all" keeps every fitted model, "none" keeps no model, "best" keeps only the
+    best scored fold per (model, section) and "disk" spills every model to a ModelStore in path.
+    """
+
+    def __init__(self, model_retention: str = "all", path: str = None, compress: int = 3, cache_size: int = 8):
+        if model_retention not in ResultsStore.retention_policies():
+            raise ValueError(f"model_retention only permits {ResultsStore.retention_policies()}")
+
+        self.model_retention = model_retention
+        self.path = path
+        self.model_store = None
+        if model_retention == "disk":
+            self.model_store = ModelStore(path, compress, cache_size)
+            self.path = self.model_store.path
+        self._lock = threading.RLock()
+        self._next_row_id = 0
+        self.version = 0
+        self.clear()
+
+    @staticmethod
+    def retention_policies()-> list[str]:
+        return ["all", "none", "best", "disk"]
+
+    @staticmethod
+    def metadata_columns()-> list[str]:
+        return ["model_name", "section", "validation", "time", "fold"]
+
+    @staticmethod
+    def _compact(values)-> np.ndarray:
+        """
+        Integer valued labels as int32, anything else (regression values) as float64 so no precision is lost.
+        """
+        values = np.asarray(values)
+        if values.dtype.kind in "biuf":
+            with np.errstate(invalid="ignore"):
+                values_int = values.astype(np.int32)
+            if np.array_equal(values, values_int):
+                return values_int
+        return values.astype(np.float64)
+
+    @staticmethod
+    def _concatenate(chunks: list)-> np.ndarray:
+        if len(chunks) == 0:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate(chunks)
+
+    def clear(self):
+        with self._lock:
+            if self.model_store is not None:
+                self.model_store.clear()
+            self._metadata = {column: [] for column in ResultsStore.metadata_columns() + ["score", "length", "config"]}
+            self._arrays = {"y_pred": [], "y_test": [], "x_test_index": [], "y_proba": []}
+            self._proba_width = []
+            self._models = []
+            self._row_ids = []
+            self._best = {}
+            self._table = None
+            self.version += 1
+
+    def __len__(self)-> int:
+        return len(self._models)
+
+    def __iter__(self):
+        return iter(self.get_rows())
+
+    def add(self, time: int, validation: str, fold: int, model_name: str, model, y_pred, y_test, x_test_index,
+            section: str = None, y_proba = None, score: float = None, config: str = None):
+        y_pred = ResultsStore._compact(y_pred)
+        y_test = ResultsStore._compact(y_test)
+        x_test_index = np.asarray(x_test_index, dtype=np.int32)
+
+        if y_proba is not None:
+            y_proba = np.asarray(y_proba, dtype=np.float32).reshape(len(x_test_index), -1)
+
+        with self._lock:
+            row = len(self._models)
+            for column, value in zip(ResultsStore.metadata_columns() + ["score", "length", "config"],
+                                     [model_name, section, validation, time, fold, score, len(x_test_index), config]):
+                self._metadata[column].append(value)
+
+            self._arrays["y_pred"].append(y_pred)
+            self._arrays["y_test"].append(y_test)
+            self._arrays["x_test_index"].append(x_test_index)
+            self._arrays["y_proba"].append(y_proba.ravel() if y_proba is not None else np.empty(0, dtype=np.float32))
+            self._proba_width.append(y_proba.shape[1] if y_proba is not None else 0)
+            self._models.append(self._retain_model(row, model_name, section, model, score))
+            self._row_ids.append(self._next_row_id)
+            self._next_row_id += 1
+            self._table = None
+            self.version += 1
+
+    def _retain_model(self, row: int, model_name: str, section: str, model, score: float):
+        if self.model_retention == "none":
+            return None
+
+        if self.model_retention == "disk":
+            if isinstance(model, str):
+                self.model_store.register(model)
+                return model
+            return self.model_store.save(model, f"{model_name}_{row}")
+
+        if self.model_retention == "best":
+            key = (model_name, section)
+            best_row, best_score = self._best.get(key, (None, None))
+            if best_row is not None and ResultsStore._rank(score) <= ResultsStore._rank(best_score):
+                return None
+            if best_row is not None:
+                self._models[best_row] = None
+            self._best[key] = (row, score)
+
+        return model
+
+    @staticmethod
+    def _rank(score: float)-> float:
+        """
+        score for the "best" retention, a missing score ranks below any other.
+        """
+        return -np.inf if score is None or np.isnan(score) else score
+
+    @staticmethod
+    def get_config(*keys)-> str:
+        """
+        Configuration key of a cell (model settings, data and fold), used to tell whether a recorded result is still valid.
+        """
+        return hashlib.sha1(json.dumps(keys, default=str, sort_keys=True).encode()).hexdigest()
+
+    def get_configs(self, section: str = None)-> dict:
+        """
+        {(model_name, time, validation, fold): config} of the rows of section.
+        """
+        with self._lock:
+            table = self.get_table()
+        in_section = table["section"].isna() if section is None else (table["section"] == section)
+        table = table[in_section.to_numpy()]
+        return {(model_name, int(time), validation, int(fold)): config
+                for model_name, time, validation, fold, config in zip(table["model_name"], table["time"], table["validation"],
+                                                                     table["fold"], table["config"])}
+
+    def remove_cells(self, section: str, cells: list[tuple]):
+        """
+        Drops the rows of section whose (model_name, time, validation, fold) is in cells, atomically
+        with respect to rows added by other sections running at the same time.
+        """
+        with self._lock:
+            table = self.get_table()
+            in_section = table["section"].isna() if section is None else (table["section"] == section)
+            keys = pd.Series(list(zip(table["model_name"], table["time"], table["validation"], table["fold"])), dtype=object)
+            self.remove(in_section.to_numpy() & keys.isin(cells).to_numpy())
+
+    def remove(self, mask: np.ndarray):
+        """
+        Drops the rows of mask and their models, the row_id of the remaining rows is kept.
+        """
+        with self._lock:
+            table = self.get_table()
+            removed = np.flatnonzero(mask)
+            if len(removed) == 0:
+                return
+
+            for row in removed:
+                if self.model_retention == "disk" and self._models[row] is not None:
+                    self.model_store.delete(self._models[row])
+
+            keep = np.flatnonzero(~np.asarray(mask, dtype=bool))
+            lengths = table["length"].to_numpy()[keep].astype(np.int64)
+            index = np.repeat(table["offset"].to_numpy()[keep], lengths) + ResultsStore._get_ranges(lengths)
+            proba_lengths = lengths * table["proba_width"].to_numpy()[keep]
+            proba_index = np.repeat(table["proba_offset"].to_numpy()[keep], proba_lengths) + ResultsStore._get_ranges(proba_lengths)
+
+            for name in ["y_pred", "y_test", "x_test_index"]:
+                self._arrays[name] = [self._arrays[name][0][index]]
+            self._arrays["y_proba"] = [self._arrays["y_proba"][0][proba_index]]
+
+            for column in self._metadata.keys():
+                self._metadata[column] = [self._metadata[column][row] for row in keep]
+            self._proba_width = [self._proba_width[row] for row in keep]
+            self._models = [self._models[row] for row in keep]
+            self._row_ids = [self._row_ids[row] for row in keep]
+
+            position = {int(row): n for n, row in enumerate(keep)}
+            self._best = {key: (position[row], score) for key, (row, score) in self._best.items() if row in position}
+            self._table = None
+            self.version += 1
+
+    def has_model(self, row: int)-> bool:
+        return self._models[row] is not None
+
+    def get_model(self, row: int):
+        model = self._models[row]
+        if self.model_retention == "disk" and model is not None:
+            return self.model_store.load(model)
+        return model
+
+    def get_table(self)-> pd.DataFrame:
+        """
+        One row per fold result with categorical metadata and the offsets of its values in the flat arrays.
+        """
+        with self._lock:
+            if self._table is None:
+                table = pd.DataFrame({
+                    "row_id": np.asarray(self._row_ids, dtype=np.int64),
+                    "model_name": pd.Categorical(self._metadata["model_name"]),
+                    "section": pd.Categorical(self._metadata["section"]),
+                    "validation": pd.Categorical(self._metadata["validation"]),
+                    "time": np.asarray(self._metadata["time"], dtype=np.int32),
+                    "fold": np.asarray(self._metadata["fold"], dtype=np.int32),
+                    "score": np.asarray(self._metadata["score"], dtype=np.float32),
+                    "length": np.asarray(self._metadata["length"], dtype=np.int32),
+                    "config": pd.Categorical(self._metadata["config"])})
+                table["offset"] = np.concatenate(([0], np.cumsum(table["length"].to_numpy(), dtype=np.int64)[:-1])) \
+                                  if len(table) > 0 else np.empty(0, dtype=np.int64)
+                proba_width = np.asarray(self._proba_width, dtype=np.int64)
+                table["proba_width"] = proba_width.astype(np.int32)
+                table["proba_offset"] = np.concatenate(([0], np.cumsum(proba_width * table["length"].to_numpy())[:-1])) \
+                                        if len(table) > 0 else np.empty(0, dtype=np.int64)
+
+                for name in self._arrays.keys():
+                    self._arrays[name] = [ResultsStore._concatenate(self._arrays[name])]
+                self._table = table
+
+            return self._table
+
+    def get_array(self, name: str)-> np.ndarray:
+        """
+        Flat array of name ("y_pred", "y_test", "x_test_index" or "y_proba") of every row.
+        """
+        with self._lock:
+            self.get_table()
+            return self._arrays[name][0]
+
+    def get_subset(self, rows: np.ndarray)-> tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Table and value arrays of the given row positions, with offsets renumbered over the gathered arrays.
+        """
+        with self._lock:
+            table = self.get_table().iloc[rows].reset_index(drop=True)
+            lengths = table["length"].to_numpy().astype(np.int64)
+            index = np.repeat(table["offset"].to_numpy(), lengths) + ResultsStore._get_ranges(lengths)
+
+            proba_lengths = lengths * table["proba_width"].to_numpy()
+            proba_index = np.repeat(table["proba_offset"].to_numpy(), proba_lengths) + ResultsStore._get_ranges(proba_lengths)
+
+            y_test = self.get_array("y_test")[index]
+            y_pred = self.get_array("y_pred")[index]
+            y_proba = self.get_array("y_proba")[proba_index]
+
+        table["offset"] = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(table) > 0 else np.empty(0, dtype=np.int64)
+        table["proba_offset"] = np.concatenate(([0], np.cumsum(proba_lengths)[:-1])) if len(table) > 0 else np.empty(0, dtype=np.int64)
+        return table, y_test, y_pred, y_proba
+
+    @staticmethod
+    def _get_ranges(lengths: np.ndarray)-> np.ndarray:
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.arange(total) - np.repeat(starts, lengths)
+
+    def mask(self, **kwargs)-> np.ndarray:
+        """
+        kwargs use a list to filter by key, where each key receives a list of values that will be kept.
+        kwargs params: time, validation, model_name, fold, section.
+        """
+        table = self.get_table()
+        mask = np.ones(len(table), dtype=bool)
+
+        for key, value in kwargs.items():
+            if not isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+                value = [value]
+            mask &= table[key].isin(list(value)).to_numpy()
+
+        return mask
+
+    @staticmethod
+    def filter_records(records: list[dict], **kwargs)-> list[dict]:
+        """
+        Vectorized version of filtering a list of result dicts by kwargs, as in mask.
+        """
+        if len(records) == 0 or len(kwargs) == 0:
+            return list(records)
+
+        metadata = pd.DataFrame({key: [record.get(key) for record in records] for key in kwargs.keys()})
+        mask = np.ones(len(records), dtype=bool)
+        for key, value in kwargs.items():
+            if not isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+                value = [value]
+            mask &= metadata[key].isin(list(value)).to_numpy()
+
+        return [records[row] for row in np.flatnonzero(mask)]
+
+    def get_rows(self, mask: np.ndarray = None, load_models: bool = True)-> list[dict]:
+        """
+        Rows in the dict layout used by the rest of the library, the value arrays are views on the store.
+        With load_models=False "model" is None and the model can be loaded on demand with get_model(row["row"]).
+        """
+        with self._lock:
+            table = self.get_table()
+            y_pred, y_test = self.get_array("y_pred"), self.get_array("y_test")
+            x_test_index, y_proba = self.get_array("x_test_index"), self.get_array("y_proba")
+
+            rows = []
+            selected = np.arange(len(table)) if mask is None else np.flatnonzero(mask)
+            for row in selected:
+                start = table["offset"].iat[row]
+                end = start + table["length"].iat[row]
+                instance = {"row": int(row),
+                            "time": int(table["time"].iat[row]),
+                            "validation": table["validation"].iat[row],
+                            "fold": int(table["fold"].iat[row]),
+                            "model_name": table["model_name"].iat[row],
+                            "model": self.get_model(row) if load_models else None,
+                            "y_pred": y_pred[start:end],
+                            "y_test": y_test[start:end],
+                            "x_test_index": x_test_index[start:end],
+                            "y_proba": None}
+
+                width = table["proba_width"].iat[row]
+                if width > 0:
+                    proba_start = table["proba_offset"].iat[row]
+                    instance["y_proba"] = y_proba[proba_start:proba_start + width * (end - start)].reshape(-1, width)
+
+                section = table["section"].iat[row]
+                if isinstance(section, str):
+                    instance["section"] = section
+
+                rows.append(instance)
+
+            return rows
+
+    def get_nbytes(self)-> int:
+        return int(sum(array.nbytes for chunks in self._arrays.values() for array in chunks))
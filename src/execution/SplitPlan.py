@@ -0,0 +1,131 @@
+import hashlib
+import json
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from helpers.ModelHelper import ModelHelper
+
+
+class SplitPlan(object):
+    """
+    Train/test indices of every (repeat, validation, fold) of a run plus the split used by the
+    hyperparameter search. All of them are derived from one master seed, so every model reads
+    the same folds and the plan can be saved and loaded with a run.
+    """
+
+    def __init__(self, seed: int, fingerprint: str, best_params_train_index: np.ndarray, splits: dict):
+        self.seed = seed
+        self.fingerprint = fingerprint
+        self._best_params_train_index = best_params_train_index
+        self._splits = splits
+
+    @staticmethod
+    def get_fingerprint(validations_execution: dict, times_repeats: int, best_params_train_size: float, model_type: str, y, seed: int)-> str:
+        validations = sorted([(validation, validation_params["num_folds"], validation_params["train_size"])
+                              for validation, validation_params in validations_execution.items()])
+        y_hash = hashlib.sha1(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).values.tobytes()).hexdigest()
+
+        content = json.dumps({"validations": validations,
+                              "times_repeats": times_repeats,
+                              "best_params_train_size": best_params_train_size,
+                              "model_type": model_type,
+                              "n_rows": len(y),
+                              "y": y_hash,
+                              "seed": seed}, default=str)
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    @staticmethod
+    def _get_random_state(seed: int, *keys)-> int:
+        spawn_key = tuple(zlib.crc32(str(key).encode()) for key in keys)
+        return int(np.random.SeedSequence(seed, spawn_key=spawn_key).generate_state(1)[0])
+
+    @staticmethod
+    def build(validations_execution: dict, times_repeats: int, best_params_train_size: float, model_type: str, y, seed: int = None):
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+
+        ix_list_best_params = ModelHelper.initialize_validation(ModelHelper.get_validations("split", model_type), \
+                                                                0, \
+                                                                best_params_train_size, \
+                                                                y, y, \
+                                                                random_state=SplitPlan._get_random_state(seed, "best_params"))
+        best_params_train_index = ix_list_best_params[0][0].astype(np.int32)
+
+        splits = {}
+        for i in range(times_repeats):
+            for validation, validation_params in validations_execution.items():
+                ix_list = ModelHelper.initialize_validation(validation_params['validation'], \
+                                                            validation_params['num_folds'], \
+                                                            validation_params['train_size'], \
+                                                            y, y, \
+                                                            random_state=SplitPlan._get_random_state(seed, i, validation))
+                splits[(i, validation)] = [(train_index.astype(np.int32), test_index.astype(np.int32))
+                                           for train_index, test_index in ix_list]
+
+        fingerprint = SplitPlan.get_fingerprint(validations_execution, times_repeats, best_params_train_size, model_type, y, seed)
+        return SplitPlan(seed, fingerprint, best_params_train_index, splits)
+
+    def get_random_state(self, *keys)-> int:
+        return SplitPlan._get_random_state(self.seed, *keys)
+
+    def get_best_params_split(self)-> np.ndarray:
+        return self._best_params_train_index
+
+    def get_folds(self, time: int, validation: str)-> list[tuple[np.ndarray, np.ndarray]]:
+        return self._splits[(time, validation)]
+
+    def get_split(self, time: int, validation: str, fold: int)-> tuple[np.ndarray, np.ndarray]:
+        return self._splits[(time, validation)][fold]
+
+    def get_split_hash(self, time: int, validation: str, fold: int)-> str:
+        """
+        Hash of the train/test indices of a fold. It only changes when that fold changes, so adding repeats or
+        validations keeps the hash of the existing folds.
+        """
+        train_index, test_index = self.get_split(time, validation, fold)
+        content = np.concatenate((np.asarray(train_index, dtype=np.int64), [-1], np.asarray(test_index, dtype=np.int64)))
+        return hashlib.sha1(content.tobytes()).hexdigest()
+
+    @staticmethod
+    def get_data_hash(data)-> str:
+        """
+        Hash of the values (and column names) of a DataFrame or Series.
+        """
+        data_hash = hashlib.sha1(str(data.shape).encode())
+        if isinstance(data, pd.Series) or data.shape[1] > 0:
+            data_hash.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+        if isinstance(data, pd.DataFrame):
+            data_hash.update(json.dumps([str(column) for column in data.columns]).encode())
+        return data_hash.hexdigest()
+
+    def keys(self)-> list[tuple[int, str, int]]:
+        return [(time, validation, fold) for (time, validation), folds in self._splits.items() for fold in range(len(folds))]
+
+    def get_nbytes(self)-> int:
+        return int(self._best_params_train_index.nbytes + sum(index.nbytes for folds in self._splits.values()
+                                                               for fold in folds for index in fold))
+
+    def save(self, path: str):
+        arrays = {"best_params_train_index": self._best_params_train_index}
+        layout = []
+        for n, ((time, validation), folds) in enumerate(self._splits.items()):
+            layout.append([time, validation, len(folds)])
+            for fold, (train_index, test_index) in enumerate(folds):
+                arrays[f"train_{n}_{fold}"] = train_index
+                arrays[f"test_{n}_{fold}"] = test_index
+
+        metadata = json.dumps({"seed": self.seed, "fingerprint": self.fingerprint, "layout": layout})
+        np.savez_compressed(path, metadata=np.array(metadata), **arrays)
+
+    @staticmethod
+    def load(path: str):
+        with np.load(path) as content:
+            metadata = json.loads(str(content["metadata"]))
+            splits = {}
+            for n, (time, validation, num_folds) in enumerate(metadata["layout"]):
+                splits[(time, validation)] = [(content[f"train_{n}_{fold}"], content[f"test_{n}_{fold}"])
+                                              for fold in range(num_folds)]
+
+            return SplitPlan(metadata["seed"], metadata["fingerprint"], content["best_params_train_index"], splits)
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class _Span(object):
+
+    __slots__ = ("name", "tags", "spans", "start", "start_counter", "parent_tags")
+
+    def __init__(self, name: str, tags: dict, spans: list):
+        self.name = name
+        self.tags = tags
+        self.spans = spans
+
+    def __enter__(self):
+        self.parent_tags = getattr(Tracer._local, "tags", {})
+        self.tags = {**self.parent_tags, **self.tags}
+        Tracer._local.tags = self.tags
+        self.start = time.time_ns()
+        self.start_counter = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter_ns() - self.start_counter
+        Tracer._local.tags = self.parent_tags
+        thread = threading.current_thread()
+        self.spans.append({"name": self.name, "start": self.start // 1000, "duration": duration // 1000, "pid": os.getpid(),
+                           "tid": thread.ident, "thread": thread.name, "error": exc_type.__name__ if exc_type is not None else None,
+                           **self.tags})
+        return False
+
+
+class _NullSpan(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class Tracer(object):
+    """
+    Spans of the stages of a run (data access, splits, search, fit, predict, SMOTE, metrics and SHAP), with the
+    tags of the enclosing spans (model, section, repeat, fold) and the process and thread that ran them.
+
+    Spans are recorded only in threads where a collector is active (record() in the driver, collect() in the
+    tasks, whose spans come back with their result), otherwise span() returns a shared no-op context, so a
+    disabled tracer costs one thread-local lookup per stage.
+    """
+
+    _local = threading.local()
+    _null_span = _NullSpan()
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._spans = []
+
+    @staticmethod
+    def span(name: str, **tags):
+        spans = getattr(Tracer._local, "spans", None)
+        if spans is None:
+            return Tracer._null_span
+        return _Span(name, tags, spans)
+
+    @staticmethod
+    @contextmanager
+    def collect(enabled: bool = True, **tags):
+        """
+        Records the spans of the current thread in a new list (yielded, None when disabled) with tags on all of them.
+        """
+        if not enabled:
+            yield None
+            return
+
+        previous_spans, previous_tags = getattr(Tracer._local, "spans", None), getattr(Tracer._local, "tags", {})
+        spans = []
+        Tracer._local.spans, Tracer._local.tags = spans, {**previous_tags, **tags}
+        try:
+            yield spans
+        finally:
+            Tracer._local.spans, Tracer._local.tags = previous_spans, previous_tags
+
+    @contextmanager
+    def record(self, **tags):
+        """
+        Records the spans of the current thread in this tracer while enabled.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        previous_spans, previous_tags = getattr(Tracer._local, "spans", None), getattr(Tracer._local, "tags", {})
+        Tracer._local.spans, Tracer._local.tags = self._spans, {**previous_tags, **tags}
+        try:
+            yield
+        finally:
+            Tracer._local.spans, Tracer._local.tags = previous_spans, previous_tags
+
+    def add(self, spans: list[dict], **tags):
+        """
+        Adds spans collected elsewhere (the result of a task), with tags on the ones missing them.
+        """
+        if spans is None or not self.enabled:
+            return
+        self._spans.extend({**tags, **span} for span in spans)
+
+    def clear(self):
+        self._spans = []
+
+    def get_spans(self)-> pd.DataFrame:
+        """
+        One row per span: name, start (microseconds since the epoch), duration (microseconds), pid, tid, thread, error and the tags.
+        """
+        spans = pd.DataFrame(list(self._spans))
+        if len(spans) == 0:
+            return pd.DataFrame(columns=["name", "start", "duration", "pid", "tid", "thread", "error"])
+        return spans.sort_values("start", kind="stable").reset_index(drop=True)
+
+    def export_chrome_trace(self, path: str)-> str:
+        """
+        Writes the spans as a Chrome/Perfetto trace (chrome://tracing, ui.perfetto.dev).
+        """
+        spans = list(self._spans)
+        events = [{"name": span["name"], "cat": "autobiolearn", "ph": "X", "ts": span["start"], "dur": span["duration"],
+                   "pid": span["pid"], "tid": span["tid"],
+                   "args": {key: value for key, value in span.items() if key not in ["name", "start", "duration", "pid", "tid", "thread"]}}
+                  for span in spans]
+        threads = {(span["pid"], span["tid"]): span["thread"] for span in spans}
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}} for (pid, tid), name in threads.items()]
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, default=str)
+        return path
@@ -0,0 +1,188 @@
+import fcntl
+import os
+import pickle
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import multiprocessing
+
+import joblib
+
+from execution.FoldTask import FoldTask
+
+
+class WorkQueue(object):
+    """
+    Task queue on a directory every node mounts (NFS or any shared filesystem), used by the "queue" backend.
+    The driver opens a session with the shared data of a run and writes one file per task; workers started on
+    any node with `python -m execution <path>` (from src) claim a task by holding an fcntl lock on it,
+    run it and write the result back, which the driver reads. The lock is released by the kernel when a worker
+    dies, so its task is claimed again by another worker.
+
+    Layout: path/<session>/shared.joblib, tasks/<task>.joblib, locks/<task>.lock and results/<task>.joblib.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._shared = (None, None)
+
+    @staticmethod
+    def _dump(value, file_path: str):
+        temp_path = os.path.join(os.path.dirname(file_path), f".{os.path.basename(file_path)}.{uuid.uuid4().hex}.tmp")
+        joblib.dump(value, temp_path)
+        os.replace(temp_path, file_path)
+
+    @staticmethod
+    def _get_name(task_id: int)-> str:
+        return f"{task_id:08d}"
+
+    def _get_dir(self, session_id: str, *names)-> str:
+        return os.path.join(self.path, session_id, *names)
+
+    def open_session(self, shared: dict)-> str:
+        session_id = f"{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        os.makedirs(self._get_dir(session_id))
+        WorkQueue._dump(shared, self._get_dir(session_id, "shared.joblib"))
+        for name in ["results", "locks", "tasks"]:
+            os.makedirs(self._get_dir(session_id, name))
+        return session_id
+
+    def close_session(self, session_id: str):
+        shutil.rmtree(self._get_dir(session_id), ignore_errors=True)
+
+    def put(self, session_id: str, task_id: int, func, task: dict):
+        WorkQueue._dump({"func": func, "task": task}, self._get_dir(session_id, "tasks", f"{WorkQueue._get_name(task_id)}.joblib"))
+
+    def cancel(self, session_id: str, task_id: int):
+        """
+        Removes a task not finished yet. A worker already running it finishes, but its result is discarded.
+        """
+        try:
+            os.remove(self._get_dir(session_id, "tasks", f"{WorkQueue._get_name(task_id)}.joblib"))
+        except FileNotFoundError:
+            pass
+
+    def get_results(self, session_id: str)-> list[tuple]:
+        """
+        Reads and removes the results written so far as (task_id, result, exception).
+        """
+        results = []
+        results_dir = self._get_dir(session_id, "results")
+        for file_name in sorted(os.listdir(results_dir)):
+            if file_name.startswith("."):
+                continue
+            file_path = os.path.join(results_dir, file_name)
+            record = joblib.load(file_path)
+            os.remove(file_path)
+            results.append((int(file_name.split(".")[0]), record["result"], record["error"]))
+        return results
+
+    def _load_shared(self, session_id: str)-> dict:
+        if self._shared[0] != session_id:
+            self._shared = (session_id, joblib.load(self._get_dir(session_id, "shared.joblib")))
+        return self._shared[1]
+
+    def claim(self)-> tuple:
+        """
+        Locks the first pending task of the oldest session and returns (session_id, name, lock_file), or None.
+        """
+        try:
+            sessions = sorted(os.listdir(self.path))
+        except FileNotFoundError:
+            return None
+
+        for session_id in sessions:
+            try:
+                names = sorted(file_name.split(".")[0] for file_name in os.listdir(self._get_dir(session_id, "tasks"))
+                               if not file_name.startswith("."))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            for name in names:
+                try:
+                    lock_file = open(self._get_dir(session_id, "locks", f"{name}.lock"), "a")
+                except FileNotFoundError:
+                    break
+                try:
+                    fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    continue
+
+                if os.path.exists(self._get_dir(session_id, "tasks", f"{name}.joblib")) and \
+                        not os.path.exists(self._get_dir(session_id, "results", f"{name}.joblib")):
+                    return session_id, name, lock_file
+                lock_file.close()
+        return None
+
+    @staticmethod
+    def _run_with_timeout(func, task: dict, shared: dict, timeout: float):
+        """
+        Runs the task in a forked process killed after timeout seconds, as the process backend does.
+        """
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"),
+                                       initializer=FoldTask.init_worker, initargs=(shared,))
+        try:
+            return executor.submit(FoldTask.run_in_worker, func, task).result(timeout=timeout)
+        except FutureTimeoutError:
+            from execution.ExecutionBackend import TaskTimeoutError
+            for process in list(executor._processes.values()):
+                process.kill()
+            raise TaskTimeoutError(f"{task.get('model_name')} exceeded the timeout of {task['timeout']}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run_task(self, session_id: str, name: str, n_threads: int = None):
+        try:
+            record = joblib.load(self._get_dir(session_id, "tasks", f"{name}.joblib"))
+            shared = self._load_shared(session_id)
+        except FileNotFoundError:
+            return
+
+        func, task = record["func"], {**record["task"], "n_threads": n_threads or os.cpu_count() or 1}
+        result, error = None, None
+        try:
+            if task.get("timeout") is not None:
+                result = WorkQueue._run_with_timeout(func, task, shared, task["timeout"])
+            else:
+                result = func(task, shared)
+        except Exception as ex:
+            try:
+                pickle.dumps(ex)
+                error = ex
+            except Exception:
+                error = RuntimeError(f"{type(ex).__name__}: {ex}")
+
+        try:
+            WorkQueue._dump({"result": result, "error": error}, self._get_dir(session_id, "results", f"{name}.joblib"))
+            os.remove(self._get_dir(session_id, "tasks", f"{name}.joblib"))
+        except FileNotFoundError:
+            pass
+
+    def run_worker(self, n_threads: int = None, poll_interval: float = 0.5, idle_timeout: float = None, max_tasks: int = None)-> int:
+        """
+        Claims and runs tasks until idle_timeout seconds pass without tasks (forever when None) or max_tasks ran.
+        n_threads: cores of each task (all cores of the node when None). Returns the number of tasks run.
+        """
+        n_tasks = 0
+        idle_since = time.monotonic()
+        while max_tasks is None or n_tasks < max_tasks:
+            claimed = self.claim()
+            if claimed is None:
+                if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            session_id, name, lock_file = claimed
+            try:
+                self.run_task(session_id, name, n_threads)
+            finally:
+                lock_file.close()
+            n_tasks += 1
+            idle_since = time.monotonic()
+        return n_tasks
+
@@ -0,0 +1,15 @@
+from .FoldTask import FoldTask
+from .SplitPlan import SplitPlan
+from .FoldDataCache import FoldDataCache
+from .ModelStore import ModelStore
+from .ResultsStore import ResultsStore
+from .MetricsCache import MetricsCache
+from .ResourceScheduler import ResourceScheduler
+from .CostModel import CostModel
+from .ExecutionBackend import ExecutionBackend, ExecutionSession, TaskTimeoutError
+from .Checkpoint import Checkpoint
+from .HyperparamStore import HyperparamStore
+from .WorkQueue import WorkQueue
+from .Job import Job
+from .Tracer import Tracer
+from .MemoryMonitor import MemoryMonitor, MemoryCeilingWarning
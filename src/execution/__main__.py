@@ -0,0 +1,25 @@
+import argparse
+import os
+import socket
+
+from execution.WorkQueue import WorkQueue
+
+
+def main(args: list[str] = None):
+    """
+    Worker of the "queue" backend: python -m execution <path> [--threads N] [--idle-timeout S]
+    """
+    parser = argparse.ArgumentParser(prog="python -m execution", description="Runs AutoBioLearn tasks of a shared directory queue.")
+    parser.add_argument("path", help="queue directory given to set_execution_backend('queue', path=...)")
+    parser.add_argument("--threads", type=int, default=None, help="cores of each task (all cores of the node when omitted)")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="seconds between scans of the queue")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="exit after these seconds without tasks")
+    parser.add_argument("--max-tasks", type=int, default=None, help="exit after running these tasks")
+    args = parser.parse_args(args)
+
+    n_tasks = WorkQueue(args.path).run_worker(args.threads, args.poll_interval, args.idle_timeout, args.max_tasks)
+    print(f"{socket.gethostname()}:{os.getpid()} ran {n_tasks} tasks")
+
+
+if __name__ == "__main__":
+    main()
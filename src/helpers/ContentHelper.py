@@ -23,7 +23,8 @@ class ContentHelper(object):
         """
         Try execute this after run convert_datetime
         """ 
-        ContentHelper.convert_cols_values(df, df.select_dtypes("O").columns)   
+        ContentHelper.convert_cols_values(df, [col for col, dtype in df.dtypes.items() if dtype == object or
+                                               (isinstance(dtype, pd.CategoricalDtype) and dtype.categories.dtype == object)])   
     
     @staticmethod
     def convert_cols_values(df: DataFrame, columns=list):
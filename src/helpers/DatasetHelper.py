@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from pandas import DataFrame, MultiIndex
 
@@ -47,4 +48,58 @@ class DatasetHelper(object):
                     df.columns = df.columns.set_levels(df.columns.levels[i].str.replace(key, value), level=i)
         else:
             for key,value in dict_of_str.items():
-                df.columns = df.columns.str.replace(key, value)       
\ No newline at end of file
+                df.columns = df.columns.str.replace(key, value)
+
+    @staticmethod
+    def get_downcast_dtypes(df: DataFrame, exclude: list = [], float_rtol: float = 1e-6, max_category_ratio: float = 0.5,
+                            block_size: int = 256)-> dict:
+        """
+        {column position: dtype} of the columns of df that fit a smaller type without losing values: integers
+        (and floats holding only integers) in the smallest signed integer covering their range, other floats in
+        float32 when every value round-trips within float_rtol, and strings with at most max_category_ratio
+        unique values per row as category. Columns at the positions in exclude are kept.
+        """
+        integer_types = [np.int8, np.int16, np.int32]
+        exclude = set(exclude)
+        dtypes = {}
+
+        def smallest_integer(minimum, maximum):
+            for integer_type in integer_types:
+                info = np.iinfo(integer_type)
+                if info.min <= minimum and maximum <= info.max:
+                    return np.dtype(integer_type)
+            return None
+
+        for start in range(0, df.shape[1], block_size):
+            block = df.iloc[:, start:start + block_size]
+            block_dtypes = list(block.dtypes)
+            kinds = [dtype.kind if isinstance(dtype, np.dtype) else None for dtype in block_dtypes]
+            positions = [position for position in range(block.shape[1]) if start + position not in exclude]
+
+            integers = [position for position in positions if kinds[position] in ["i", "u"] and block_dtypes[position].itemsize > 1]
+            if len(integers) > 0 and len(block) > 0:
+                values = block.iloc[:, integers].to_numpy()
+                for position, minimum, maximum in zip(integers, values.min(axis=0), values.max(axis=0)):
+                    dtype = smallest_integer(minimum, maximum)
+                    if dtype is not None and dtype.itemsize < block_dtypes[position].itemsize:
+                        dtypes[start + position] = dtype
+
+            floats = [position for position in positions if kinds[position] == "f" and block_dtypes[position].itemsize > 4]
+            if len(floats) > 0 and len(block) > 0:
+                values = block.iloc[:, floats].to_numpy(dtype=np.float64)
+                missing = np.isnan(values)
+                with np.errstate(invalid="ignore", over="ignore"):
+                    integral = (~missing.any(axis=0)) & (values == np.round(values)).all(axis=0)
+                    round_trip = ((np.abs(values.astype(np.float32) - values) <= float_rtol * np.abs(values)) | missing).all(axis=0)
+                minimums, maximums = np.nanmin(np.where(missing, 0, values), axis=0), np.nanmax(np.where(missing, 0, values), axis=0)
+                for n, position in enumerate(floats):
+                    dtype = smallest_integer(minimums[n], maximums[n]) if integral[n] else None
+                    if dtype is None and round_trip[n]:
+                        dtype = np.dtype(np.float32)
+                    if dtype is not None:
+                        dtypes[start + position] = dtype
+
+            for position in [position for position in positions if kinds[position] == "O" and len(block) > 0]:
+                if block.iloc[:, position].nunique() <= max_category_ratio * len(block):
+                    dtypes[start + position] = "category"
+        return dtypes
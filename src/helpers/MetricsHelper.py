@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+
+class MetricsHelper(object):
+    """
+    Batched metric engine. Every function receives the table of a ResultsStore (one row per fold
+    with the offset and length of its values) and the flat value arrays, and scores all folds of
+    all models at once with NumPy.
+    """
+
+    @staticmethod
+    def get_groups(table: pd.DataFrame)-> np.ndarray:
+        return np.repeat(np.arange(len(table)), table["length"].to_numpy())
+
+    @staticmethod
+    def _divide(numerator, denominator, fill=0.0)-> np.ndarray:
+        numerator = np.asarray(numerator, dtype=np.float64)
+        denominator = np.asarray(denominator, dtype=np.float64)
+        result = np.full(np.broadcast(numerator, denominator).shape, fill, dtype=np.float64)
+        np.divide(numerator, denominator, out=result, where=denominator != 0)
+        return result
+
+    @staticmethod
+    def get_confusion_counts(groups: np.ndarray, n_groups: int, y_true: np.ndarray, y_pred: np.ndarray)-> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the classes and an array (n_groups, n_classes, n_classes) with the confusion matrix of every group.
+        """
+        classes = np.unique(np.concatenate((y_true, y_pred)))
+        n_classes = len(classes)
+        true_index = np.searchsorted(classes, y_true)
+        pred_index = np.searchsorted(classes, y_pred)
+
+        counts = np.bincount((groups * n_classes + true_index) * n_classes + pred_index,
+                             minlength=n_groups * n_classes * n_classes)
+        return classes, counts.reshape(n_groups, n_classes, n_classes)
+
+    @staticmethod
+    def get_grouped_roc_auc(groups: np.ndarray, n_groups: int, scores: np.ndarray, positives: np.ndarray)-> np.ndarray:
+        """
+        Binary ROC-AUC of every group from the Mann-Whitney rank statistic, ties get their average rank.
+        Groups with a single class are NaN.
+        """
+        if len(groups) == 0:
+            return np.full(n_groups, np.nan)
+
+        order = np.lexsort((scores, groups))
+        sorted_groups = groups[order]
+        sorted_scores = scores[order]
+        sorted_positives = positives[order].astype(np.float64)
+
+        group_start = np.searchsorted(sorted_groups, np.arange(n_groups))
+        position = np.arange(len(sorted_groups)) - group_start[sorted_groups] + 1
+
+        new_block = np.ones(len(sorted_groups), dtype=bool)
+        new_block[1:] = (sorted_groups[1:] != sorted_groups[:-1]) | (sorted_scores[1:] != sorted_scores[:-1])
+        block_id = np.cumsum(new_block) - 1
+        ranks = (np.bincount(block_id, weights=position) / np.bincount(block_id))[block_id]
+
+        n_total = np.bincount(sorted_groups, minlength=n_groups).astype(np.float64)
+        n_positives = np.bincount(sorted_groups, weights=sorted_positives, minlength=n_groups)
+        n_negatives = n_total - n_positives
+        rank_sum = np.bincount(sorted_groups, weights=ranks * sorted_positives, minlength=n_groups)
+
+        return MetricsHelper._divide(rank_sum - n_positives * (n_positives + 1) / 2, n_positives * n_negatives, fill=np.nan)
+
+    @staticmethod
+    def calculate_classification_metrics(table: pd.DataFrame, y_true: np.ndarray, y_pred: np.ndarray, y_proba: np.ndarray)-> pd.DataFrame:
+        """
+        Precision, Recall and F1 use the positive class (label 1) on binary problems and the macro average over the
+        classes present in each fold on multiclass problems. ROC-AUC uses the scores captured at fit time.
+        """
+        n_groups = len(table)
+        groups = MetricsHelper.get_groups(table)
+        classes, counts = MetricsHelper.get_confusion_counts(groups, n_groups, y_true, y_pred)
+
+        true_positives = np.diagonal(counts, axis1=1, axis2=2).astype(np.float64)
+        predicted = counts.sum(axis=1)
+        actual = counts.sum(axis=2)
+        total = counts.sum(axis=(1, 2))
+
+        accuracy = MetricsHelper._divide(true_positives.sum(axis=1), total)
+        precision_per_class = MetricsHelper._divide(true_positives, predicted)
+        recall_per_class = MetricsHelper._divide(true_positives, actual)
+        f1_per_class = MetricsHelper._divide(2 * true_positives, predicted + actual)
+
+        if len(classes) <= 2:
+            positive = int(np.flatnonzero(classes == 1)[0]) if 1 in classes else len(classes) - 1
+            precision = precision_per_class[:, positive]
+            recall = recall_per_class[:, positive]
+            f1 = f1_per_class[:, positive]
+        else:
+            present = (predicted + actual) > 0
+            n_present = present.sum(axis=1)
+            precision = MetricsHelper._divide((precision_per_class * present).sum(axis=1), n_present)
+            recall = MetricsHelper._divide((recall_per_class * present).sum(axis=1), n_present)
+            f1 = MetricsHelper._divide((f1_per_class * present).sum(axis=1), n_present)
+
+        roc_auc = MetricsHelper.calculate_roc_auc(table, groups, classes, y_true, y_proba)
+
+        return pd.DataFrame({"Precision": precision, "Accuracy": accuracy, "Recall": recall, "F1": f1, "ROC-AUC": roc_auc})
+
+    @staticmethod
+    def calculate_roc_auc(table: pd.DataFrame, groups: np.ndarray, classes: np.ndarray, y_true: np.ndarray, y_proba: np.ndarray)-> np.ndarray:
+        """
+        Binary AUC from the positive column (or the single decision_function column) and one-vs-rest macro AUC on
+        multiclass scores. Folds without scores or where a class is missing from y_true are NaN.
+        """
+        n_groups = len(table)
+        roc_auc = np.full(n_groups, np.nan)
+        widths = table["proba_width"].to_numpy()
+
+        for width in np.unique(widths[widths > 0]):
+            rows = np.flatnonzero(widths == width)
+            selected = np.isin(groups, rows)
+            starts = table["proba_offset"].to_numpy()[rows]
+            lengths = table["length"].to_numpy()[rows]
+
+            proba_index = np.repeat(starts, lengths * width) + MetricsHelper._get_ranges(lengths * width)
+            scores = y_proba[proba_index].reshape(-1, width).astype(np.float64)
+            group_ids = groups[selected]
+            labels = y_true[selected]
+
+            if width <= 2:
+                roc_auc[rows] = MetricsHelper.get_grouped_roc_auc(group_ids, n_groups, scores[:, -1], labels == classes[-1])[rows]
+            else:
+                per_class = np.column_stack([MetricsHelper.get_grouped_roc_auc(group_ids, n_groups, scores[:, k], labels == classes[k])
+                                             for k in range(min(width, len(classes)))])
+                roc_auc[rows] = per_class.mean(axis=1)[rows]
+
+        return roc_auc
+
+    @staticmethod
+    def _get_ranges(lengths: np.ndarray)-> np.ndarray:
+        """
+        Concatenation of arange(length) for every length.
+        """
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.arange(total) - np.repeat(starts, lengths)
+
+    @staticmethod
+    def calculate_regression_metrics(table: pd.DataFrame, y_true: np.ndarray, y_pred: np.ndarray)-> pd.DataFrame:
+        """
+        MSE, RMSE, R2, MAE (median absolute error, as before) and MAPE of every fold.
+        """
+        n_groups = len(table)
+        groups = MetricsHelper.get_groups(table)
+        y_true = y_true.astype(np.float64)
+        error = y_pred.astype(np.float64) - y_true
+
+        n_total = np.bincount(groups, minlength=n_groups).astype(np.float64)
+        sse = np.bincount(groups, weights=error ** 2, minlength=n_groups)
+        mse = MetricsHelper._divide(sse, n_total, fill=np.nan)
+
+        y_mean = MetricsHelper._divide(np.bincount(groups, weights=y_true, minlength=n_groups), n_total, fill=np.nan)
+        sst = np.bincount(groups, weights=(y_true - y_mean[groups]) ** 2, minlength=n_groups) if len(groups) > 0 else np.zeros(n_groups)
+        r2 = np.where(sst != 0, 1 - MetricsHelper._divide(sse, sst), np.where(sse == 0, 1.0, 0.0))
+        r2[n_total < 2] = np.nan
+
+        absolute_error = np.abs(error)
+        order = np.lexsort((absolute_error, groups))
+        sorted_error = absolute_error[order]
+        group_start = np.concatenate(([0], np.cumsum(n_total)[:-1])).astype(np.int64)
+        lengths = n_total.astype(np.int64)
+        median = np.full(n_groups, np.nan)
+        not_empty = lengths > 0
+        median[not_empty] = (sorted_error[group_start[not_empty] + (lengths[not_empty] - 1) // 2] +
+                             sorted_error[group_start[not_empty] + lengths[not_empty] // 2]) / 2
+
+        percentage_error = absolute_error / np.maximum(np.abs(y_true), np.finfo(np.float64).eps)
+        mape = MetricsHelper._divide(np.bincount(groups, weights=percentage_error, minlength=n_groups), n_total, fill=np.nan)
+
+        return pd.DataFrame({"MSE": mse, "RMSE": np.sqrt(mse), "R2": r2, "MAE": median, "MAPE": mape})
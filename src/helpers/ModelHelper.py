@@ -1,10 +1,6 @@
-from catboost import CatBoostClassifier,CatBoostRegressor
-from lightgbm import LGBMClassifier, LGBMRegressor
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC, SVR
-from sklearn.model_selection import KFold, ShuffleSplit, StratifiedKFold,LeaveOneOut, StratifiedShuffleSplit, train_test_split
-from xgboost import XGBClassifier,XGBRegressor
+import importlib
+
+from sklearn.model_selection import KFold, ShuffleSplit, StratifiedKFold,LeaveOneOut, StratifiedShuffleSplit, train_test_split, RandomizedSearchCV
 
 
 class ModelHelper(object):
@@ -37,31 +33,53 @@ class ModelHelper(object):
     def const_svm()-> str: 
         return "svm"
     
+    # Model classes by type and name as "module:Class" (imported on first use by get_model) or as the class itself,
+    # with the params that hide their output.
+    _models = {
+        "classifier": {
+            "xgboost": ("xgboost:XGBClassifier", {}),
+            "catboost": ("catboost:CatBoostClassifier", {"allow_writing_files": False, "verbose": False}),
+            "lightboost": ("lightgbm:LGBMClassifier", {"verbosity": -1}),
+            "random_forest": ("sklearn.ensemble:RandomForestClassifier", {}),
+            "logistic_regression": ("sklearn.linear_model:LogisticRegression", {}),
+            "svm": ("sklearn.svm:SVC", {})
+        },
+        "regressor": {
+            "xgboost": ("xgboost:XGBRegressor", {}),
+            "catboost": ("catboost:CatBoostRegressor", {"allow_writing_files": False, "verbose": False}),
+            "lightboost": ("lightgbm:LGBMRegressor", {"verbosity": -1}),
+            "svm": ("sklearn.svm:SVR", {}),
+            "random_forest": ("sklearn.ensemble:RandomForestRegressor", {})
+        }
+    }
+
+    @staticmethod
+    def register_model(model: str, model_type: str, model_object, params_hidden_verbosity: dict = {}):
+        """
+        Adds (or replaces) a model usable by name in execute_models. model_object: the estimator class or its
+        "module:Class" path, imported the first time the model is used.
+        """
+        ModelHelper._models.setdefault(model_type.lower(), {})[model.lower()] = (model_object, dict(params_hidden_verbosity))
+
+    @staticmethod
+    def get_models(model_type: str = "classifier")-> list[str]:
+        return list(ModelHelper._models.get(model_type.lower(), {}).keys())
+
     @staticmethod  
     def get_model(model, model_type="classifier"):
         if model is None or model_type is None:
             raise AttributeError()
-        
-        classifiers ={  ModelHelper.const_xgboost():  (XGBClassifier, {}),
-                        ModelHelper.const_catboost(): (CatBoostClassifier,{"allow_writing_files":False, "verbose": False}),
-                        ModelHelper.const_lightboost():(LGBMClassifier,{"verbosity":-1}),
-                        ModelHelper.const_random_forest(): (RandomForestClassifier,{}),
-                        ModelHelper.const_logistic_regression():(LogisticRegression,{}),
-                        ModelHelper.const_svm():(SVC,{})
-                    }
-        
-        regressors ={
-                        ModelHelper.const_xgboost():  (XGBRegressor,{}),
-                        ModelHelper.const_catboost(): (CatBoostRegressor,{"allow_writing_files":False, "verbose": False}),
-                        ModelHelper.const_lightboost():(LGBMRegressor,{"verbosity":-1}),
-                        ModelHelper.const_svm():(SVR,{}),
-                        ModelHelper.const_random_forest(): (RandomForestRegressor,{}),
-                    }
-        
-        if model_type.lower() == 'classifier':
-            return classifiers[model.lower()]
-        elif model_type.lower() == 'regressor':
-            return regressors[model.lower()]
+
+        models = ModelHelper._models.get(model_type.lower())
+        if models is None:
+            return None
+
+        model_object, params_hidden_verbosity = models[model.lower()]
+        if isinstance(model_object, str):
+            module_name, class_name = model_object.split(":")
+            model_object = getattr(importlib.import_module(module_name), class_name)
+            models[model.lower()] = (model_object, params_hidden_verbosity)
+        return model_object, dict(params_hidden_verbosity)
         
 
     @staticmethod  
@@ -85,14 +103,14 @@ class ModelHelper(object):
             return validations_regression[validation.lower()]  
 
     @staticmethod  
-    def initialize_validation(validation_object, num_folds: int,train_size:float, X, y):
+    def initialize_validation(validation_object, num_folds: int,train_size:float, X, y, random_state:int = None):
         validation_name = str(validation_object).lower()
         if 'kfold' in validation_name:
-            return list(validation_object(n_splits= num_folds,shuffle=True).split(X,y))
+            return list(validation_object(n_splits= num_folds,shuffle=True,random_state=random_state).split(X,y))
         elif "leaveoneout" in validation_name:
             return list(validation_object().split(X,y))
         else:
-            return list([next(validation_object(train_size=(train_size/100)).split(X,y))])
+            return list([next(validation_object(train_size=(train_size/100),random_state=random_state).split(X,y))])
            
     
     @staticmethod  
@@ -104,3 +122,23 @@ class ModelHelper(object):
                 model_param[k.replace(model+"_","")]= v
 
         return model_param
+
+    @staticmethod
+    def find_best_hyperparams(clf_model, X, y, param_grid, param_sel_obj, num_folds, metric, random_state:int = None)-> dict:
+        return ModelHelper.fit_search(clf_model, X, y, param_grid, param_sel_obj, num_folds, metric, random_state).best_params_
+
+    @staticmethod
+    def fit_search(clf_model, X, y, param_grid, param_sel_obj, num_folds, metric, random_state:int = None):
+        """
+        random_state: seed of the candidates sampled by RandomizedSearchCV, so a seeded run searches the same ones.
+        """
+        search_params = {"random_state": random_state} if param_sel_obj is RandomizedSearchCV else {}
+        clf_grid = param_sel_obj(clf_model,
+                                 param_grid,
+                                 cv=num_folds,
+                                 scoring = metric,
+                                 **search_params
+                                 )
+
+        clf_grid.fit(X, y)
+        return clf_grid
@@ -0,0 +1,233 @@
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv, train_test_split
+from sklearn.utils import resample
+
+
+class SearchHelper(object):
+    """
+    Budgeted multi-fidelity hyperparameter search (best_params_method="budget"). Candidates are
+    sampled from the grid and evaluated by successive halving: every round scores the survivors on
+    more samples (or boosting rounds) and keeps the best 1/factor of them, until the fit or time
+    budget runs out. XGBoost, LightGBM and CatBoost stop early on a validation slice of each fold.
+    """
+
+    @staticmethod
+    def resources()-> list[str]:
+        return ["n_samples", "n_estimators"]
+
+    @staticmethod
+    def get_library(model_instance)-> str:
+        module = type(model_instance).__module__
+        for library in ["xgboost", "lightgbm", "catboost"]:
+            if module.startswith(library):
+                return library
+        return None
+
+    @staticmethod
+    def get_n_estimators_param(model_instance, params: dict)-> str:
+        if SearchHelper.get_library(model_instance) == "catboost" and "n_estimators" not in params:
+            return "iterations"
+        return "n_estimators"
+
+    @staticmethod
+    def get_max_n_estimators(model_instance, params: dict)-> int:
+        name = SearchHelper.get_n_estimators_param(model_instance, params)
+        value = params.get(name, model_instance.get_params().get(name))
+        if value is None:
+            return 1000 if SearchHelper.get_library(model_instance) == "catboost" else 100
+        return int(value)
+
+    @staticmethod
+    def _fit(model_instance, x_train, y_train, early_stopping_rounds: int, validation_size: float, random_state: int):
+        """
+        Fits the model, using native early stopping on a validation slice of the training data for the boosting
+        libraries. Returns the number of boosting rounds kept (None without early stopping).
+        """
+        library = SearchHelper.get_library(model_instance)
+        if library is None or early_stopping_rounds is None or len(x_train) < 10:
+            model_instance.fit(x_train, y_train)
+            return None
+
+        stratify = y_train if is_classifier(model_instance) and pd.Series(y_train).value_counts().min() >= 2 else None
+        try:
+            x_fit, x_val, y_fit, y_val = train_test_split(x_train, y_train, test_size=validation_size, stratify=stratify, random_state=random_state)
+        except ValueError:
+            x_fit, x_val, y_fit, y_val = train_test_split(x_train, y_train, test_size=validation_size, random_state=random_state)
+
+        if library == "xgboost":
+            model_instance.set_params(early_stopping_rounds=early_stopping_rounds)
+            model_instance.fit(x_fit, y_fit, eval_set=[(x_val, y_val)], verbose=False)
+            return int(model_instance.best_iteration) + 1
+        if library == "lightgbm":
+            import lightgbm
+            model_instance.fit(x_fit, y_fit, eval_set=[(x_val, y_val)], callbacks=[lightgbm.early_stopping(early_stopping_rounds, verbose=False)])
+            return int(model_instance.best_iteration_) if model_instance.best_iteration_ else None
+
+        model_instance.fit(x_fit, y_fit, eval_set=(x_val, y_val), early_stopping_rounds=early_stopping_rounds)
+        return int(model_instance.get_best_iteration()) + 1
+
+    @staticmethod
+    def _evaluate_fold(clf_model, params: dict, x, y, train_index, test_index, scoring, early_stopping_rounds, validation_size, random_state):
+        model_instance = clone(clf_model).set_params(**params)
+        start = time.perf_counter()
+        best_iteration = SearchHelper._fit(model_instance, x.iloc[train_index], y.iloc[train_index], early_stopping_rounds, validation_size, random_state)
+        fit_time = time.perf_counter() - start
+        return scoring(model_instance, x.iloc[test_index], y.iloc[test_index]), fit_time, best_iteration
+
+    @staticmethod
+    def _get_n_candidates(grid_size: int, num_folds: int, factor: int, max_fits: int)-> int:
+        if max_fits is None:
+            return min(grid_size, factor ** 3)
+        n_candidates = int(max_fits * (factor - 1) / (factor * num_folds))
+        return max(1, min(grid_size, n_candidates))
+
+    @staticmethod
+    def find_best_hyperparams(clf_model, X, y, param_grid: dict, num_folds: int, metric, max_fits: int = None, max_time: float = None,
+                              resource: str = "n_samples", factor: int = 3, n_jobs: int = 1, early_stopping_rounds: int = 20,
+                              validation_size: float = 0.1, random_state: int = None, initial_candidates: list[dict] = None)-> tuple[dict, list[dict]]:
+        """
+        Returns the best params and the history of every evaluated candidate (params, round, resource, score,
+        fit_time in seconds, n_fits and the boosting rounds kept by early stopping).
+
+        max_fits: budget of model fits, max_time: wall-clock budget in seconds (both unlimited when None).
+        resource: "n_samples" (rows of the search split) or "n_estimators" (trees/boosting rounds).
+        initial_candidates: params evaluated in the first round in place of sampled ones (warm start).
+        """
+        if resource not in SearchHelper.resources():
+            raise ValueError(f"resource only permits {SearchHelper.resources()}")
+        if factor < 2:
+            raise ValueError("factor must be at least 2")
+
+        start = time.perf_counter()
+        X = X.reset_index(drop=True)
+        y = pd.Series(np.asarray(y))
+        scoring = check_scoring(clf_model, scoring=metric)
+        cv = check_cv(num_folds, y, classifier=is_classifier(clf_model))
+
+        grid_size = len(ParameterGrid(param_grid)) if SearchHelper.is_discrete(param_grid) else factor ** 3
+        n_candidates = SearchHelper._get_n_candidates(grid_size, cv.get_n_splits(), factor, max_fits)
+        candidates = SearchHelper.get_candidates(param_grid, n_candidates, random_state, initial_candidates)
+
+        if resource == "n_estimators" and any("n_estimators" in params or "iterations" in params for params in candidates):
+            resource = "n_samples"
+
+        n_rounds = math.ceil(math.log(len(candidates), factor)) + 1 if len(candidates) > 1 else 1
+        n_classes = y.nunique() if is_classifier(clf_model) else 1
+        min_samples = min(len(y), max(2 * cv.get_n_splits() * n_classes, 20))
+
+        history = []
+        best = None
+        exhausted = False
+        for round_number in range(n_rounds):
+            scale = factor ** (round_number - n_rounds + 1)
+            x_round, y_round = X, y
+            level = None
+            if resource == "n_samples":
+                level = max(min_samples, int(len(y) * scale))
+                if level < len(y):
+                    sample = np.sort(resample(np.arange(len(y)), n_samples=level, replace=False,
+                                              stratify=y if n_classes > 1 else None, random_state=random_state))
+                    x_round, y_round = X.iloc[sample].reset_index(drop=True), y.iloc[sample].reset_index(drop=True)
+            splits = list(cv.split(x_round, y_round))
+
+            round_results = []
+            for params in candidates:
+                n_fits = sum(record["n_fits"] for record in history)
+                exhausted = len(history) > 0 and ((max_fits is not None and n_fits + len(splits) > max_fits) or
+                                                  (max_time is not None and time.perf_counter() - start > max_time))
+                if exhausted:
+                    break
+
+                round_params = dict(params)
+                if resource == "n_estimators":
+                    level = max(1, int(SearchHelper.get_max_n_estimators(clf_model, params) * scale))
+                    round_params[SearchHelper.get_n_estimators_param(clf_model, params)] = level
+
+                folds = Parallel(n_jobs=n_jobs, prefer="threads")(
+                    delayed(SearchHelper._evaluate_fold)(clf_model, round_params, x_round, y_round, train_index, test_index, scoring,
+                                                         early_stopping_rounds, validation_size, random_state)
+                    for train_index, test_index in splits)
+
+                scores = np.array([fold[0] for fold in folds], dtype=np.float64)
+                best_iterations = [fold[2] for fold in folds if fold[2] is not None]
+                record = {"params": params,
+                          "round": round_number,
+                          "resource": resource,
+                          "resource_value": level,
+                          "score": float(np.nanmean(scores)) if not np.all(np.isnan(scores)) else -np.inf,
+                          "fit_time": float(sum(fold[1] for fold in folds)),
+                          "n_fits": len(folds),
+                          "best_iteration": int(np.median(best_iterations)) if len(best_iterations) > 0 else None}
+                history.append(record)
+                round_results.append(record)
+
+            if len(round_results) > 0:
+                ranked = sorted(round_results, key=lambda record: record["score"], reverse=True)
+                best = ranked[0]
+                candidates = [record["params"] for record in ranked[:math.ceil(len(ranked) / factor)]]
+            if exhausted:
+                break
+
+        best_params = dict(best["params"])
+        if best["best_iteration"] is not None:
+            max_n_estimators = SearchHelper.get_max_n_estimators(clf_model, best_params)
+            if best["best_iteration"] < max_n_estimators:
+                best_params[SearchHelper.get_n_estimators_param(clf_model, best_params)] = best["best_iteration"]
+
+        return best_params, history
+
+    @staticmethod
+    def is_discrete(param_grid: dict)-> bool:
+        return all(isinstance(values, (list, tuple, np.ndarray)) for values in param_grid.values())
+
+    @staticmethod
+    def get_candidates(param_grid: dict, n_candidates: int, random_state: int = None, initial_candidates: list[dict] = None)-> list[dict]:
+        """
+        n_candidates params sampled from param_grid, starting with the initial_candidates that belong to the grid.
+        """
+        if SearchHelper.is_discrete(param_grid):
+            grid = list(ParameterGrid(param_grid))
+            candidates = [params for params in (initial_candidates or []) if params in grid][:n_candidates]
+            n_iter = min(len(grid), n_candidates + len(candidates))
+        else:
+            candidates = [params for params in (initial_candidates or []) if set(params.keys()) == set(param_grid.keys())][:n_candidates]
+            n_iter = n_candidates + len(candidates)
+
+        for params in ParameterSampler(param_grid, n_iter=n_iter, random_state=random_state):
+            if len(candidates) == n_candidates:
+                break
+            if params not in candidates:
+                candidates.append(params)
+        return candidates
+
+    @staticmethod
+    def get_warm_start_grid(param_grid: dict, n_candidates: int, random_state: int = None, initial_candidates: list[dict] = None)-> list[dict]:
+        """
+        GridSearchCV grid with the candidates of get_candidates, used to warm-start a randomized search with the same number of fits.
+        """
+        return [{key: [value] for key, value in params.items()}
+                for params in SearchHelper.get_candidates(param_grid, n_candidates, random_state, initial_candidates)]
+
+    @staticmethod
+    def get_history(search)-> list[dict]:
+        """
+        History of a fitted GridSearchCV/RandomizedSearchCV in the layout of find_best_hyperparams.
+        """
+        results = search.cv_results_
+        n_splits = search.n_splits_
+        return [{"params": params,
+                 "round": 0,
+                 "resource": "n_samples",
+                 "resource_value": None,
+                 "score": float(score),
+                 "fit_time": float(fit_time * n_splits),
+                 "n_fits": n_splits,
+                 "best_iteration": None}
+                for params, score, fit_time in zip(results["params"], results["mean_test_score"], results["mean_fit_time"])]
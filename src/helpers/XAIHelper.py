@@ -1,7 +1,5 @@
 import numpy as np
 import pandas as pd
-import shap
-from matplotlib import pyplot as plt
 
 from helpers.ModelHelper import ModelHelper
 class XAIHelper(object):
@@ -12,6 +10,7 @@ class XAIHelper(object):
     
     @staticmethod
     def get_explainer(model,X):       
+        import shap
         if model["model_name"] in [ModelHelper.const_xgboost(), ModelHelper.const_catboost(), ModelHelper.const_lightboost(), ModelHelper.const_random_forest()]:
             return shap.TreeExplainer(model["model"])      
         else:
@@ -71,6 +70,9 @@ class XAIHelper(object):
 
     @staticmethod
     def get_chart_type_local(graph_type, expected_value,shap_values,X,params, show_all_features = True):
+            import shap
+            from matplotlib import pyplot as plt
+
             max_features = XAIHelper.default_max_features()
 
             if(show_all_features):
@@ -91,6 +93,9 @@ class XAIHelper(object):
 
     @staticmethod
     def get_chart_type_global(graph_type,shap_values,X,params, show_all_features = True):
+            import shap
+            from matplotlib import pyplot as plt
+
             max_features = XAIHelper.default_max_features()
 
             if(show_all_features):
@@ -1,4 +1,6 @@
 from .XAIHelper import XAIHelper
 from .ModelHelper import ModelHelper
 from .ContentHelper import ContentHelper
-from .DatasetHelper import DatasetHelper
\ No newline at end of file
+from .DatasetHelper import DatasetHelper
+from .MetricsHelper import MetricsHelper
+from .SearchHelper import SearchHelper
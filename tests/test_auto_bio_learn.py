@@ -0,0 +1,45 @@
+import os
+import threading
+
+import pytest
+
+from AutoBioLearnClassification import AutoBioLearnClassification
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "datasets",
+                    "heart_failure_clinical_records_dataset.csv")
+
+
+def make_auto_bio_learn():
+    auto_bio_learn = AutoBioLearnClassification()
+    auto_bio_learn.load_dataset_by_file(DATA, target="DEATH_EVENT", cache=False)
+    auto_bio_learn.set_execution_backend("serial")
+    auto_bio_learn.set_cost_model(enabled=False)
+    auto_bio_learn.set_validations(["kfold"], params={"kfold_num_folds": 2, "kfold_train_size": 70})
+    return auto_bio_learn
+
+
+def test_second_submit_is_rejected_while_a_job_runs():
+    auto_bio_learn = make_auto_bio_learn()
+    release = threading.Event()
+
+    job = auto_bio_learn._submit(lambda job: release.wait())
+    with pytest.raises(RuntimeError):
+        auto_bio_learn.submit_models(models=["logistic_regression"], times_repeats=1)
+    release.set()
+    job.result()
+
+    auto_bio_learn.submit_models(models=["logistic_regression"], times_repeats=1).result()
+    assert len(auto_bio_learn._models_executed) == 2
+
+
+def test_direct_call_during_a_job_is_not_reported_in_it():
+    auto_bio_learn = make_auto_bio_learn()
+    release = threading.Event()
+    job = auto_bio_learn._submit(lambda job: release.wait())
+
+    auto_bio_learn.execute_models(models=["logistic_regression"], times_repeats=1)
+    release.set()
+    job.result()
+
+    assert len(auto_bio_learn._models_executed) == 2
+    assert job.progress()["total"] == 0
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+DATA = os.path.join(os.path.dirname(SRC), "examples", "datasets", "heart_failure_clinical_records_dataset.csv")
+
+RUN = """
+import sys, warnings
+warnings.filterwarnings("ignore")
+from AutoBioLearnClassification import AutoBioLearnClassification
+auto_bio_learn = AutoBioLearnClassification()
+auto_bio_learn.load_dataset_by_file(sys.argv[1], target="DEATH_EVENT", cache=False)
+auto_bio_learn.set_execution_backend("serial")
+auto_bio_learn.set_validations(["kfold"], params={"kfold_num_folds": 2, "kfold_train_size": 70})
+auto_bio_learn.execute_models(models=["random_forest"], times_repeats=2,
+                              params={"params_models": {"random_forest_n_estimators": [5, 10]}, "best_params_n_folds": 2,
+                                      "checkpoint_dir": sys.argv[2]})
+task_log = auto_bio_learn.get_task_log()
+print(len(auto_bio_learn._models_executed), int((task_log["Task"] == "fold").sum()))
+"""
+
+
+def run(checkpoint_dir):
+    process = subprocess.run([sys.executable, "-c", RUN, DATA, checkpoint_dir], cwd=SRC, capture_output=True, text=True, timeout=600)
+    assert process.returncode == 0, process.stderr
+    return [int(value) for value in process.stdout.strip().splitlines()[-1].split()]
+
+
+def test_run_without_seed_resumes_in_a_new_process(tmp_path):
+    checkpoint_dir = str(tmp_path / "checkpoint")
+
+    executed, trained = run(checkpoint_dir)
+    assert (executed, trained) == (4, 4)
+
+    executed, trained = run(checkpoint_dir)
+    assert (executed, trained) == (4, 0)
+    assert len([name for name in os.listdir(checkpoint_dir) if name != "split_plans"]) == 1
@@ -0,0 +1,21 @@
+from execution import CostModel
+
+
+def test_observations_are_loaded_by_the_next_session(tmp_path):
+    path = str(tmp_path / "cost_model.json")
+    cost_model = CostModel(path=path)
+    prior = cost_model.predict("xgboost", "fold", 1000, 10)
+
+    cost_model.observe("xgboost", "fold", 1000, 10, 100 * prior)
+    cost_model.save()
+
+    next_session = CostModel(path=path)
+    assert next_session.get_observations() == cost_model.get_observations()
+    assert next_session.predict("xgboost", "fold", 1000, 10) == cost_model.predict("xgboost", "fold", 1000, 10) > prior
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "cost_model.json"
+    path.write_text("{")
+
+    assert CostModel(path=str(path)).get_observations() == []
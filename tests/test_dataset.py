@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from data_treatment import Dataset
+
+
+def make_data():
+    columns = pd.MultiIndex.from_tuples([("clinical", "age"), ("clinical", "sodium"), ("lab", "creatinine"), ("lab", "death")])
+    return pd.DataFrame([[75, 130.0, 1.9, 1], [55, 136.0, 1.1, 0], [65, 129.0, 1.3, 1], [50, 137.0, 0.9, 0]], columns=columns)
+
+
+def test_loading_keeps_the_pandas_options():
+    copy_on_write = pd.get_option("mode.copy_on_write")
+
+    Dataset(make_data(), "death")
+
+    assert pd.get_option("mode.copy_on_write") == copy_on_write
+
+
+def test_data_and_sections_share_columns_but_not_with_the_caller():
+    df = make_data()
+    dataset = Dataset(df, "death")
+    df.iloc[0, 0] = 0
+
+    section = dataset._sections["clinical"]
+    assert dataset._data.iloc[0, 0] == 75
+    assert np.shares_memory(section["age"].to_numpy(), dataset._data.iloc[:, 0].to_numpy())
+
+
+def test_removing_outliers_leaves_the_original_data():
+    df = pd.DataFrame({"age": [50.0, 52.0, 51.0, 53.0, 50.0, 52.0, 51.0, 400.0], "death": [1, 0, 1, 0, 1, 0, 1, 0]})
+    dataset = Dataset(df, "death", verbose=True)
+
+    dataset.remove_outliers("mean_value")
+
+    assert dataset._data["age"].iloc[-1] != 400.0
+    assert dataset._Dataset__original_data["age"].iloc[-1] == 400.0
+
+
+def test_writing_to_get_x_leaves_later_calls_unchanged():
+    dataset = Dataset(make_data(), "death")
+
+    X = dataset.get_X("clinical")
+    X.iloc[0, 0] = 9
+    X["sodium"] = 0.0
+
+    assert dataset.get_X("clinical").iloc[0].tolist() == [75, 130.0]
+    assert not dataset.get_X("clinical", as_numpy=True).flags.writeable
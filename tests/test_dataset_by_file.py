@@ -0,0 +1,37 @@
+import pandas as pd
+
+from AutoBioLearnClassification import AutoBioLearnClassification
+from data_treatment import DatasetByFile
+
+
+def write_data(path, sep=","):
+    df = pd.DataFrame({"age": [75, 55, 65, 50], "sodium": [130.0, 136.0, 129.0, 137.0], "death": [1, 0, 1, 0]})
+    df.to_csv(path, sep=sep, index=False)
+    return df
+
+
+def test_load_csv_with_default_arguments(tmp_path):
+    df = write_data(tmp_path / "data.csv")
+
+    auto_bio_learn = AutoBioLearnClassification()
+    auto_bio_learn.load_dataset_by_file(str(tmp_path / "data.csv"), "death", cache_dir=str(tmp_path / "cache"))
+
+    X = auto_bio_learn.data_processor.dataset.get_X()
+    assert list(X.columns) == ["age", "sodium"]
+    assert X.to_numpy().tolist() == df[["age", "sodium"]].to_numpy().tolist()
+
+
+def test_load_compressed_csv_and_usecols_with_default_delimiter(tmp_path):
+    write_data(tmp_path / "data.csv.gz")
+
+    dataset = DatasetByFile(str(tmp_path / "data.csv.gz"), "death", None, usecols=["age"], cache=False)
+
+    assert list(dataset.get_X().columns) == ["age"]
+
+
+def test_load_txt_sniffs_the_delimiter(tmp_path):
+    write_data(tmp_path / "data.txt", sep=";")
+
+    dataset = DatasetByFile(str(tmp_path / "data.txt"), "death", None, cache=False)
+
+    assert list(dataset.get_X().columns) == ["age", "sodium"]
@@ -0,0 +1,47 @@
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from data_treatment import DatasetByFile, DatasetCache
+
+
+def write_data(path):
+    pd.DataFrame({"age": [75, 55, 65, 50], "death": [1, 0, 1, 0]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_nothing_is_cached_by_default(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    DatasetByFile(write_data(tmp_path / "data.csv"), "death", None)
+
+    assert not os.path.exists(tmp_path / "cache")
+
+
+def test_cache_dir_is_private(tmp_path):
+    cache_dir = tmp_path / "cache"
+
+    DatasetByFile(write_data(tmp_path / "data.csv"), "death", None, cache_dir=str(cache_dir))
+
+    entries = os.listdir(cache_dir)
+    assert len(entries) == 1
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(cache_dir / entries[0]).st_mode) == 0o600
+
+
+def test_shared_writable_cache_dir_is_not_loaded(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    os.chmod(cache_dir, 0o777)
+    reads = []
+
+    with pytest.warns(UserWarning):
+        cache = DatasetCache(str(cache_dir))
+    file_path = write_data(tmp_path / "data.csv")
+    for _ in range(2):
+        cache.get_or_read(file_path, {}, lambda: reads.append(1) or pd.read_csv(file_path))
+
+    assert len(reads) == 2
+    assert os.listdir(cache_dir) == []
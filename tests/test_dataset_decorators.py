@@ -0,0 +1,58 @@
+import sys
+import threading
+from types import SimpleNamespace
+
+from decorators import apply_per_grouping
+
+
+class Sections(object):
+
+    def __init__(self, sections, started=None, release=None):
+        dataset = SimpleNamespace(get_has_many_header=lambda: True, get_sections=lambda: sections)
+        self.data_processor = SimpleNamespace(dataset=dataset)
+        self._parallel_sections = True
+        self._parallel_sections_workers = len(sections)
+        self._started = started
+        self._release = release
+
+    @apply_per_grouping
+    def run(self, section=None):
+        print(f"inside {section}")
+        if self._started is not None:
+            self._started.set()
+            self._release.wait()
+        return section
+
+
+def test_an_unrelated_thread_prints_straight_through_during_parallel_sections(capsys):
+    started, release = threading.Event(), threading.Event()
+    sections = Sections(["a", "b"], started, release)
+
+    def print_outside():
+        started.wait()
+        print("outside")
+        release.set()
+
+    thread = threading.Thread(target=print_outside)
+    thread.start()
+    assert sections.run() == {"a": "a", "b": "b"}
+    thread.join()
+
+    assert capsys.readouterr().out == "outside\na\ninside a\nb\ninside b\n"
+
+
+def test_concurrent_parallel_runs_restore_stdout():
+    stdout = sys.stdout
+    runs = []
+    for sections in (["a", "b"], ["c", "d"]):
+        started, release = threading.Event(), threading.Event()
+        thread = threading.Thread(target=Sections(sections, started, release).run)
+        thread.start()
+        started.wait()
+        runs.append((thread, release))
+
+    for thread, release in runs:
+        release.set()
+        thread.join()
+
+    assert sys.stdout is stdout
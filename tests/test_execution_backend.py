@@ -0,0 +1,42 @@
+import time
+
+from execution import ExecutionBackend, ResourceScheduler, TaskTimeoutError
+
+
+def sleep_task(task, shared):
+    time.sleep(task["seconds"])
+    return {"model_name": task["model_name"]}
+
+
+def test_process_timeout_stops_the_task_and_runs_the_others():
+    backend = ExecutionBackend("process", max_workers=2)
+    tasks = [{"model_name": "slow", "seconds": 60, "timeout": 1}, {"model_name": "fast", "seconds": 0.5, "timeout": 30},
+             {"model_name": "queued", "seconds": 0, "timeout": 30}]
+
+    start = time.perf_counter()
+    with backend.start({}) as session:
+        outcomes = {task["model_name"]: (result, ex) for task, result, ex in session.run(sleep_task, tasks)}
+
+    assert time.perf_counter() - start < 30
+    assert isinstance(outcomes["slow"][1], TaskTimeoutError)
+    assert outcomes["fast"] == ({"model_name": "fast"}, None)
+    assert outcomes["queued"] == ({"model_name": "queued"}, None)
+
+
+def test_thread_timeout_holds_the_slot_until_the_fit_returns():
+    scheduler = ResourceScheduler(cores=1)
+    backend = ExecutionBackend("thread", scheduler=scheduler)
+    tasks = [{"model_name": "slow", "seconds": 2, "timeout": 0.2, "cost": 2}, {"model_name": "fast", "seconds": 0, "cost": 1}]
+
+    start = time.perf_counter()
+    finished = {}
+    with backend.start({}) as session:
+        for task, result, ex in session.run(sleep_task, tasks):
+            finished[task["model_name"]] = time.perf_counter() - start
+            if task["model_name"] == "slow":
+                assert isinstance(ex, TaskTimeoutError)
+                assert scheduler.get_stats()["running"] == 1
+
+    # the fast task waits for the cores the timed out fit still uses
+    assert finished["slow"] < 1 <= finished["fast"]
+    assert scheduler.get_stats()["running"] == 0
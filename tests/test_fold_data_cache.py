@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from execution import FoldDataCache
+
+
+def test_failed_build_is_not_left_building():
+    cache = FoldDataCache()
+
+    def fail():
+        raise MemoryError("fold does not fit")
+
+    with pytest.raises(MemoryError):
+        cache.get(("fold", 0), fail)
+
+    assert cache._building == {}
+    value = cache.get(("fold", 0), lambda: {"x": np.zeros(4)})
+    assert cache.get(("fold", 0), lambda: {"x": np.ones(4)}) is value
+    assert cache.get_stats()["entries"] == 1
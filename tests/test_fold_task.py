@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.tree import DecisionTreeClassifier
+
+from execution import FoldTask, SplitPlan
+
+
+def make_data():
+    rng = np.random.default_rng(0)
+    x = pd.DataFrame(rng.normal(size=(120, 4)), columns=["a", "b", "c", "d"])
+    y = pd.Series((x["a"] + rng.normal(scale=0.5, size=120) > 0).astype(int))
+    return x, y
+
+
+def search(seed):
+    x, y = make_data()
+    split_plan = SplitPlan.build({}, 1, 70, "classifier", y, seed)
+    task = {"model_name": "decision_tree", "model_object": DecisionTreeClassifier, "model_params_hidden_verbosity": {},
+            "param_grid": {"max_depth": list(range(1, 21)), "min_samples_leaf": list(range(1, 21))},
+            "param_sel_obj": RandomizedSearchCV, "num_folds": 2, "metric": "accuracy", "budget": {}}
+    return [candidate["params"] for candidate in FoldTask.find_best_params(task, {"x": x, "y": y, "split_plan": split_plan})["history"]]
+
+
+def test_randomized_search_samples_the_same_candidates_for_a_seed():
+    assert search(7) == search(7)
+    assert search(7) != search(8)
@@ -0,0 +1,58 @@
+import os
+
+from AutoBioLearnClassification import AutoBioLearnClassification
+from execution import HyperparamStore
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "datasets",
+                    "heart_failure_clinical_records_dataset.csv")
+
+
+def record(params, round_number, score):
+    return {"params": params, "round": round_number, "resource": "n_samples", "resource_value": 100, "score": score,
+            "fit_time": 0.1, "n_fits": 3, "best_iteration": None}
+
+
+def test_load_returns_the_exact_search_only(tmp_path):
+    store = HyperparamStore(str(tmp_path / "hyperparams.sqlite"))
+    history = [record({"max_depth": 2}, 0, 0.7), record({"max_depth": 4}, 0, 0.8)]
+
+    assert store.save("key", "space", "random_forest", None, {"max_depth": 4}, history, 1.5)
+
+    reopened = HyperparamStore(str(tmp_path / "hyperparams.sqlite"))
+    assert reopened.load("key") == {"best_params": {"max_depth": 4}, "history": history, "elapsed": 1.5}
+    assert reopened.load("other key") is None
+    assert not store.save("key", "space", "random_forest", None, {"model": object()}, history, 1.5)
+
+
+def test_warm_start_takes_the_best_candidates_of_the_latest_search(tmp_path):
+    store = HyperparamStore(str(tmp_path / "hyperparams.sqlite"))
+    store.save("old data", "space", "random_forest", None, {"max_depth": 8}, [record({"max_depth": 8}, 0, 0.99)], 1)
+    store.save("new data", "space", "random_forest", None, {"max_depth": 4},
+               [record({"max_depth": 2}, 0, 0.6), record({"max_depth": 4}, 0, 0.7), record({"max_depth": 6}, 0, 0.65),
+                record({"max_depth": 4}, 1, 0.75), record({"max_depth": 6}, 1, 0.72)], 1)
+    store.save("other space", "other", "random_forest", None, {"max_depth": 1}, [record({"max_depth": 1}, 0, 1.0)], 1)
+
+    assert store.get_warm_start("space", 2) == [{"max_depth": 4}, {"max_depth": 6}]
+    assert store.get_warm_start("space") == [{"max_depth": 4}, {"max_depth": 6}, {"max_depth": 2}]
+    assert store.get_warm_start("unknown") == []
+
+
+def run_searches(path):
+    auto_bio_learn = AutoBioLearnClassification()
+    auto_bio_learn.load_dataset_by_file(DATA, target="DEATH_EVENT")
+    auto_bio_learn.set_execution_backend("serial")
+    auto_bio_learn.set_cost_model(enabled=False)
+    auto_bio_learn.set_seed(0)
+    auto_bio_learn.set_hyperparam_store(path)
+    auto_bio_learn.set_validations(["kfold"], params={"kfold_num_folds": 2, "kfold_train_size": 70})
+    auto_bio_learn.execute_models(models=["random_forest"], times_repeats=1,
+                                  params={"params_models": {"random_forest_n_estimators": [5, 10]}, "best_params_n_folds": 2})
+    task_log = auto_bio_learn.get_task_log()
+    return int((task_log["Task"] == "search").sum()), int((task_log["Task"] == "fold").sum())
+
+
+def test_stored_search_is_skipped_by_the_next_session(tmp_path):
+    path = str(tmp_path / "hyperparams.sqlite")
+
+    assert run_searches(path) == (1, 2)
+    assert run_searches(path) == (0, 2)
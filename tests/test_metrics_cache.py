@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from execution import MetricsCache, ResultsStore
+
+
+def accuracy(table, y_test, y_pred, y_proba):
+    return pd.DataFrame({"accuracy": [float(np.mean(y_test[offset:offset + length] == y_pred[offset:offset + length]))
+                                      for offset, length in zip(table["offset"], table["length"])]})
+
+
+def add_fold(store, model, section, fold, y_pred):
+    store.add(0, "kfold", fold, model, None, y_pred, [0, 1, 1, 0], [0, 1, 2, 3], section=section)
+
+
+def describe(cache, store, section=None):
+    metrics = cache.get_metrics(store)
+    if section is not None:
+        metrics = metrics[metrics["Section"] == section]
+    return metrics[["Model", "accuracy"]].astype({"accuracy": float}).groupby("Model").describe()
+
+
+def test_summaries_follow_added_and_removed_rows():
+    store, cache = ResultsStore(), MetricsCache(accuracy)
+    add_fold(store, "random_forest", "clinical", 0, [0, 1, 1, 0])
+    add_fold(store, "random_forest", "lab", 0, [1, 1, 1, 0])
+    add_fold(store, "xgboost", "lab", 0, [1, 0, 0, 1])
+    add_fold(store, "xgboost", None, 0, [0, 1, 0, 0])
+
+    for section in (None, "clinical", "lab"):
+        pd.testing.assert_frame_equal(cache.get_summary(store, "accuracy", section), describe(cache, store, section),
+                                      check_names=False)
+
+    random_forest = cache._summaries[("random_forest", "lab")]
+    add_fold(store, "xgboost", "lab", 1, [0, 1, 1, 1])
+    pd.testing.assert_frame_equal(cache.get_summary(store, "accuracy", "lab"), describe(cache, store, "lab"),
+                                  check_names=False)
+    assert cache._summaries[("random_forest", "lab")] is random_forest
+
+    store.remove(store.get_table()["model_name"].to_numpy() == "random_forest")
+    pd.testing.assert_frame_equal(cache.get_summary(store, "accuracy"), describe(cache, store), check_names=False)
+    assert cache.get_summary(store, "accuracy", "clinical").empty
+    assert ("random_forest", "clinical") not in cache._groups
+    assert cache._groups[("xgboost", None)].tolist() == [2, 3, 4]
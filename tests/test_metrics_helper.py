@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.metrics import (accuracy_score, f1_score, mean_absolute_percentage_error, mean_squared_error, median_absolute_error,
+                             precision_score, r2_score, recall_score, roc_auc_score)
+from sklearn.svm import SVC
+
+from execution import FoldTask, ResultsStore
+from helpers import MetricsHelper
+
+
+def store_folds(folds: list[tuple])-> tuple:
+    store = ResultsStore()
+    for fold, (y_true, y_pred, y_proba) in enumerate(folds):
+        store.add(0, "kfold", fold, "model", None, y_pred, y_true, np.arange(len(y_true)), y_proba=y_proba)
+    return store.get_table(), store.get_array("y_test"), store.get_array("y_pred"), store.get_array("y_proba")
+
+
+def classification_folds(n_classes: int, n_folds: int = 3, size: int = 40)-> list[tuple]:
+    rng = np.random.default_rng(n_classes)
+    folds = []
+    for _ in range(n_folds):
+        y_true = rng.integers(0, n_classes, size)
+        y_pred = np.where(rng.random(size) < 0.7, y_true, rng.integers(0, n_classes, size))
+        y_proba = rng.dirichlet(np.ones(n_classes), size)
+        folds.append((y_true, y_pred, y_proba))
+    return folds
+
+
+def test_binary_metrics_match_sklearn():
+    folds = classification_folds(2)
+
+    metrics = MetricsHelper.calculate_classification_metrics(*store_folds(folds))
+
+    for fold, (y_true, y_pred, y_proba) in enumerate(folds):
+        row = metrics.iloc[fold]
+        assert row["Accuracy"] == pytest.approx(accuracy_score(y_true, y_pred))
+        assert row["Precision"] == pytest.approx(precision_score(y_true, y_pred, zero_division=0))
+        assert row["Recall"] == pytest.approx(recall_score(y_true, y_pred, zero_division=0))
+        assert row["F1"] == pytest.approx(f1_score(y_true, y_pred, zero_division=0))
+        assert row["ROC-AUC"] == pytest.approx(roc_auc_score(y_true, y_proba[:, 1].astype(np.float32)))
+
+
+def test_multiclass_metrics_match_sklearn_macro_average():
+    folds = classification_folds(3)
+
+    metrics = MetricsHelper.calculate_classification_metrics(*store_folds(folds))
+
+    for fold, (y_true, y_pred, y_proba) in enumerate(folds):
+        row = metrics.iloc[fold]
+        assert row["Accuracy"] == pytest.approx(accuracy_score(y_true, y_pred))
+        assert row["Precision"] == pytest.approx(precision_score(y_true, y_pred, average="macro", zero_division=0))
+        assert row["Recall"] == pytest.approx(recall_score(y_true, y_pred, average="macro", zero_division=0))
+        assert row["F1"] == pytest.approx(f1_score(y_true, y_pred, average="macro", zero_division=0))
+        y_proba = y_proba.astype(np.float32).astype(np.float64)
+        assert row["ROC-AUC"] == pytest.approx(roc_auc_score(y_true, y_proba / y_proba.sum(axis=1, keepdims=True), multi_class="ovr"))
+
+
+def test_single_class_fold_has_undefined_roc_auc():
+    folds = classification_folds(2, n_folds=1)
+    folds.append((np.ones(5, dtype=int), np.array([1, 1, 0, 1, 1]), np.full((5, 2), 0.5)))
+
+    metrics = MetricsHelper.calculate_classification_metrics(*store_folds(folds))
+
+    assert not np.isnan(metrics["ROC-AUC"].iloc[0])
+    assert np.isnan(metrics["ROC-AUC"].iloc[1])
+    assert metrics["Precision"].iloc[1] == pytest.approx(precision_score(folds[1][0], folds[1][1], zero_division=0))
+    assert metrics["Recall"].iloc[1] == pytest.approx(recall_score(folds[1][0], folds[1][1], zero_division=0))
+
+
+def test_roc_auc_uses_the_decision_function_without_predict_proba():
+    x, y = make_classification(n_samples=80, n_features=5, random_state=0)
+    model = SVC().fit(x[:50], y[:50])
+
+    scores = FoldTask.get_scores(model, x[50:])
+    metrics = MetricsHelper.calculate_classification_metrics(*store_folds([(y[50:], model.predict(x[50:]), scores)]))
+
+    assert scores.ndim == 1
+    assert metrics["ROC-AUC"].iloc[0] == pytest.approx(roc_auc_score(y[50:], scores.astype(np.float32)))
+
+
+def test_regression_metrics_match_sklearn():
+    rng = np.random.default_rng(0)
+    folds = [(y_true, y_true + rng.normal(size=30), None) for y_true in rng.normal(10, 3, size=(3, 30))]
+
+    metrics = MetricsHelper.calculate_regression_metrics(*store_folds(folds)[:3])
+
+    for fold, (y_true, y_pred, _) in enumerate(folds):
+        row = metrics.iloc[fold]
+        assert row["MSE"] == pytest.approx(mean_squared_error(y_true, y_pred))
+        assert row["RMSE"] == pytest.approx(np.sqrt(mean_squared_error(y_true, y_pred)))
+        assert row["R2"] == pytest.approx(r2_score(y_true, y_pred))
+        assert row["MAE"] == pytest.approx(median_absolute_error(y_true, y_pred))
+        assert row["MAPE"] == pytest.approx(mean_absolute_percentage_error(y_true, y_pred))
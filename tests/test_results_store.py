@@ -0,0 +1,27 @@
+import numpy as np
+
+from execution import ResultsStore
+
+
+def test_best_retention_ranks_a_missing_score_lowest():
+    store = ResultsStore("best")
+
+    store.add(0, "kfold", 0, "random_forest", "unscored", [0, 1], [0, 1], [0, 1], score=None)
+    store.add(0, "kfold", 1, "random_forest", "scored", [0, 1], [0, 1], [2, 3], score=0.5)
+    store.add(0, "kfold", 2, "random_forest", "unscored again", [0, 1], [0, 1], [4, 5], score=None)
+
+    assert [store.get_model(row) for row in range(len(store))] == [None, "scored", None]
+
+
+def test_regression_values_keep_float64_and_labels_are_compacted():
+    store = ResultsStore()
+    y_test = np.array([1.123456789, 250000.0001])
+
+    store.add(0, "kfold", 0, "linear_regression", None, [1.5, 2.25], y_test, [0, 1])
+    store.add(0, "kfold", 1, "random_forest", None, [0, 1], [1, 0], [0, 1], y_proba=[[0.2, 0.8], [0.9, 0.1]])
+
+    rows = store.get_rows()
+    assert rows[0]["y_test"].tolist() == y_test.tolist()
+    assert rows[1]["y_pred"].tolist() == [0, 1]
+    assert ResultsStore._compact([0, 1]).dtype == np.int32
+    assert store.get_array("y_proba").dtype == np.float32
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from helpers import SearchHelper
+
+
+def make_data(n_samples=300):
+    x, y = make_classification(n_samples=n_samples, n_features=6, n_informative=4, random_state=0)
+    return pd.DataFrame(x), pd.Series(y)
+
+
+GRID = {"max_depth": [1, 2, 3, 4, 5, 6], "min_samples_leaf": [1, 5, 10]}
+
+
+def test_history_respects_max_fits():
+    x, y = make_data()
+
+    best_params, history = SearchHelper.find_best_hyperparams(DecisionTreeClassifier(random_state=0), x, y, GRID, 3, "accuracy",
+                                                              max_fits=20, random_state=0)
+
+    assert sum(record["n_fits"] for record in history) <= 20
+    assert best_params in [record["params"] for record in history]
+
+
+def test_search_is_deterministic_for_a_random_state():
+    x, y = make_data()
+    search = lambda: SearchHelper.find_best_hyperparams(DecisionTreeClassifier(random_state=0), x, y, GRID, 3, "accuracy",
+                                                        max_fits=60, random_state=3)
+
+    (best_params, history), (best_params_again, history_again) = search(), search()
+
+    assert best_params == best_params_again
+    assert [(record["params"], record["round"], record["score"]) for record in history] == \
+           [(record["params"], record["round"], record["score"]) for record in history_again]
+
+
+def test_successive_halving_on_n_estimators():
+    x, y = make_data()
+
+    _, history = SearchHelper.find_best_hyperparams(RandomForestClassifier(n_estimators=27, random_state=0), x, y, {"max_depth": [2, 4, 6]},
+                                                    2, "accuracy", resource="n_estimators", factor=3, random_state=0)
+
+    assert {record["resource"] for record in history} == {"n_estimators"}
+    assert [record["resource_value"] for record in history] == [9, 9, 9, 27]
+    assert [record["round"] for record in history] == [0, 0, 0, 1]
+
+
+def test_n_estimators_in_the_grid_falls_back_to_n_samples():
+    x, y = make_data()
+
+    _, history = SearchHelper.find_best_hyperparams(RandomForestClassifier(random_state=0), x, y, {"n_estimators": [5, 10, 20]},
+                                                    2, "accuracy", resource="n_estimators", factor=3, random_state=0)
+
+    assert {record["resource"] for record in history} == {"n_samples"}
+    assert history[0]["resource_value"] < history[-1]["resource_value"] == len(y)
+
+
+def test_early_stopping_sets_n_estimators_to_the_rounds_kept():
+    from xgboost import XGBClassifier
+    x, y = make_data(600)
+
+    best_params, history = SearchHelper.find_best_hyperparams(XGBClassifier(n_estimators=500, learning_rate=0.5, random_state=0), x, y,
+                                                              {"max_depth": [2, 3]}, 2, "accuracy", early_stopping_rounds=5,
+                                                              random_state=0)
+
+    best = [record for record in history if record["params"] == {"max_depth": best_params["max_depth"]}][-1]
+    assert best["best_iteration"] < 500
+    assert best_params["n_estimators"] == best["best_iteration"]
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+from execution import WorkQueue
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+CLAIM = """
+import sys, time
+from execution import WorkQueue
+claimed = WorkQueue(sys.argv[1]).claim()
+print(claimed[1], flush=True)
+time.sleep(600)
+"""
+
+
+def add_offset(task, shared):
+    return task["value"] + shared["offset"]
+
+
+def test_worker_runs_the_tasks_of_a_session(tmp_path):
+    queue = WorkQueue(str(tmp_path))
+    session_id = queue.open_session({"offset": 10})
+    for task_id in range(3):
+        queue.put(session_id, task_id, add_offset, {"value": task_id})
+
+    assert queue.run_worker(poll_interval=0.01, max_tasks=3) == 3
+    assert queue.get_results(session_id) == [(0, 10, None), (1, 11, None), (2, 12, None)]
+    assert queue.claim() is None
+
+
+def test_claimed_task_is_skipped_and_reclaimed_when_its_worker_dies(tmp_path):
+    queue = WorkQueue(str(tmp_path))
+    session_id = queue.open_session({"offset": 10})
+    for task_id in range(2):
+        queue.put(session_id, task_id, add_offset, {"value": task_id})
+
+    worker = subprocess.Popen([sys.executable, "-c", CLAIM, str(tmp_path)], cwd=SRC, stdout=subprocess.PIPE, text=True)
+    try:
+        assert worker.stdout.readline().strip() == "00000000"
+        claimed = queue.claim()
+        assert claimed[1] == "00000001"
+        claimed[2].close()
+    finally:
+        worker.kill()
+        worker.wait()
+
+    # the kernel released the lock of the dead worker
+    session, name, lock_file = queue.claim()
+    lock_file.close()
+    assert (session, name) == (session_id, "00000000")